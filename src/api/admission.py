@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+API 入口准入控制与过载保护
+- 分舱（bulkhead）：问答接口（可能调用大模型，耗时秒级）与只读接口（植物列表、详情等，毫秒级）
+  各自拥有并发上限与有界等待队列，问答请求再多也不会占满只读接口的并发额度
+- 排队超过 SLO 即拒绝：按当前排队人数与该舱近期平均处理时间估算等待时间，
+  预计超过 SLO 或队列已满时立即返回 503 + Retry-After，不让请求在服务端排到客户端超时
+- 按客户端限流：每个客户端（IP）在每个分舱一个令牌桶，超出速率返回 429 + Retry-After
+所有参数均为单个 worker 的取值（环境变量可覆盖），多 worker 部署时总容量为 worker 数倍。
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.api.http_cache import dumps
+
+# ========== 分舱参数：并发上限、等待队列长度、排队等待 SLO（秒） ==========
+ANSWER_CONCURRENCY = int(os.environ.get("ADMISSION_ANSWER_CONCURRENCY", "16"))
+ANSWER_QUEUE = int(os.environ.get("ADMISSION_ANSWER_QUEUE", "32"))
+ANSWER_QUEUE_SLO = float(os.environ.get("ADMISSION_ANSWER_QUEUE_SLO", "5"))
+READ_CONCURRENCY = int(os.environ.get("ADMISSION_READ_CONCURRENCY", "64"))
+READ_QUEUE = int(os.environ.get("ADMISSION_READ_QUEUE", "256"))
+READ_QUEUE_SLO = float(os.environ.get("ADMISSION_READ_QUEUE_SLO", "0.5"))
+
+# ========== 按客户端限流：每秒请求数与突发容量（0 表示不限流） ==========
+ANSWER_RATE = float(os.environ.get("RATE_LIMIT_ANSWER", "1"))
+ANSWER_BURST = float(os.environ.get("RATE_LIMIT_ANSWER_BURST", "5"))
+READ_RATE = float(os.environ.get("RATE_LIMIT_READ", "20"))
+READ_BURST = float(os.environ.get("RATE_LIMIT_READ_BURST", "40"))
+# 同时跟踪的客户端数（超出时淘汰最久未访问的客户端）
+RATE_LIMIT_CLIENTS = 10000
+# 部署在反向代理之后时，按 X-Forwarded-For 的第一个地址识别客户端
+TRUST_FORWARDED = os.environ.get("ADMISSION_TRUST_FORWARDED", "").lower() in ("1", "true", "yes")
+
+# 不做准入控制的路径（健康检查与接口文档）
+EXEMPT_PATHS = ("/api/health", "/docs", "/redoc", "/openapi.json")
+# 走问答分舱的路径，其余 /api/ 路径走只读分舱
+ANSWER_PATHS = ("/api/answer",)
+
+
+class Rejected(Exception):
+    """请求被拒绝：status 为 HTTP 状态码（429 / 503），retry_after 为建议重试间隔（秒）"""
+
+    def __init__(self, status: int, retry_after: float, msg: str):
+        super().__init__(msg)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.msg = msg
+
+
+class Bulkhead:
+    """一个分舱：并发上限 + 有界等待队列；按近期平均处理时间估算排队等待"""
+
+    # 平均处理时间的指数滑动平均系数
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_slo: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = queue_size
+        self.queue_slo = queue_slo
+        self.active = 0
+        self.waiting = 0
+        self.avg_seconds: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # 在事件循环内首次使用时创建（每个 worker 一个事件循环）
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    def estimated_wait(self) -> float:
+        """新请求预计排队时间：前面需要腾出的并发轮数 × 平均处理时间"""
+        ahead = self.active + self.waiting - self.limit + 1
+        if ahead <= 0:
+            return 0.0
+        rounds = math.ceil(ahead / self.limit)
+        return rounds * (self.avg_seconds or 0.0)
+
+    async def acquire(self):
+        wait = self.estimated_wait()
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            raise Rejected(503, wait or self.queue_slo, f"服务繁忙（{self.name} 等待队列已满），请稍后重试")
+        if wait > self.queue_slo:
+            self.rejected += 1
+            raise Rejected(503, wait, f"服务繁忙（{self.name} 预计排队 {wait:.1f} 秒），请稍后重试")
+        if not self.semaphore.locked():
+            # 有空闲并发额度：直接获取，不经过排队
+            await self.semaphore.acquire()
+            self.active += 1
+            self.admitted += 1
+            return
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_slo)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Rejected(503, self.estimated_wait() or self.queue_slo,
+                           f"服务繁忙（{self.name} 排队超时），请稍后重试")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+
+    def release(self, seconds: float):
+        self.active -= 1
+        self.semaphore.release()
+        if self.avg_seconds is None:
+            self.avg_seconds = seconds
+        else:
+            self.avg_seconds += self.EWMA_ALPHA * (seconds - self.avg_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit, "active": self.active, "waiting": self.waiting,
+            "queue_size": self.queue_size, "queue_slo_s": self.queue_slo,
+            "avg_ms": round(self.avg_seconds * 1000, 1) if self.avg_seconds is not None else None,
+            "estimated_wait_ms": round(self.estimated_wait() * 1000, 1),
+            "admitted": self.admitted, "rejected": self.rejected,
+        }
+
+
+class RateLimiter:
+    """按客户端的令牌桶：rate 为每秒补充的令牌数，burst 为桶容量"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = RATE_LIMIT_CLIENTS):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str):
+        """消耗一个令牌；令牌不足时抛出 Rejected(429)"""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if tokens < 1:
+            self.limited += 1
+            raise Rejected(429, (1 - tokens) / self.rate, "请求过于频繁，请稍后重试")
+
+    def stats(self) -> dict:
+        return {"rate": self.rate, "burst": self.burst, "clients": len(self._buckets), "limited": self.limited}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI 中间件：先按客户端限流，再进入对应分舱排队；被拒绝的请求直接返回
+    {"code": 429/503, "data": None, "msg": ...} 与 Retry-After 头，不进入接口函数
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.bulkheads: Dict[str, Bulkhead] = {
+            "answer": Bulkhead("answer", ANSWER_CONCURRENCY, ANSWER_QUEUE, ANSWER_QUEUE_SLO),
+            "read": Bulkhead("read", READ_CONCURRENCY, READ_QUEUE, READ_QUEUE_SLO),
+        }
+        self.limiters: Dict[str, RateLimiter] = {
+            "answer": RateLimiter(ANSWER_RATE, ANSWER_BURST),
+            "read": RateLimiter(READ_RATE, READ_BURST),
+        }
+        set_admission(self)
+
+    @staticmethod
+    def classify(path: str) -> Optional[str]:
+        if not path.startswith("/api/") or path in EXEMPT_PATHS:
+            return None
+        return "answer" if path in ANSWER_PATHS else "read"
+
+    @staticmethod
+    def client_key(scope) -> str:
+        if TRUST_FORWARDED:
+            for name, value in scope.get("headers") or []:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        kind = self.classify(scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+        bulkhead = self.bulkheads[kind]
+        # 请求到达时刻：接口计算请求时限（src/api/deadline.py）时包含排队时间
+        scope.setdefault("state", {})["arrived_at"] = time.monotonic()
+        try:
+            self.limiters[kind].check(self.client_key(scope))
+            await bulkhead.acquire()
+        except Rejected as e:
+            await self._reject(send, e)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            bulkhead.release(time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(send, rejected: Rejected):
+        body = dumps({"code": rejected.status, "data": None, "msg": rejected.msg})
+        await send({
+            "type": "http.response.start",
+            "status": rejected.status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejected.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        return {
+            kind: dict(self.bulkheads[kind].stats(), rate_limit=self.limiters[kind].stats())
+            for kind in self.bulkheads
+        }
+
+
+# ========== 当前进程的中间件实例（供健康检查读取统计） ==========
+_admission: Optional[AdmissionMiddleware] = None
+
+
+def set_admission(middleware: AdmissionMiddleware):
+    global _admission
+    _admission = middleware
+
+
+def admission_stats() -> Optional[dict]:
+    return _admission.stats() if _admission is not None else None
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+问答路由：能直接查知识库的问题不调用大模型
+    识别出植物且问题类型明确（象征、药用、分布、民俗、节日、文献、分类）-> 知识库查询（PlantQASystem）
+    同时提到多种植物（如“梅和兰的象征有什么不同”）                    -> 知识库批量查询，生成对比表
+    未识别植物但属于植物列表 / 节日 -> 植物 / 文献 -> 植物等通用问题          -> 知识库查询
+    其余（开放式问题、只问植物本身、无法识别植物）                            -> 大模型（LangChainPlantQA）
+两条路径共用同一个知识库仓库；路由判定只涉及本地分词与关键词匹配，不增加网络往返。
+RouteStats 记录各路径的请求数与耗时，用于报告分流比例和节省的延迟；大模型调用失败单独计数，不计入耗时统计；
+每次问答同时返回追踪信息（植物、问题类型、路径、各阶段耗时、缓存命中），供问题日志记录；
+大模型调用失败时回答为提示文字，路径为 llm_error，追踪信息的 error 字段记录失败原因。
+请求带时限（src/api/deadline.py）时，各阶段开始前检查剩余时间，超时抛出 DeadlineExceeded。
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.api.deadline import DeadlineExceeded, check_deadline
+
+GRAPH = "graph"
+LLM = "llm"
+# 走大模型路径但调用失败（回答为提示文字）
+LLM_ERROR = "llm_error"
+
+
+class RouteStats:
+    """
+    各路由的请求数、累计耗时与知识库路径的问题类型分布（线程安全）
+    失败的请求只计入 failures：失败往往很快返回（或耗尽超时），计入耗时会扭曲平均耗时与节省延迟的估算
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {GRAPH: 0, LLM: 0}
+        self.seconds = {GRAPH: 0.0, LLM: 0.0}
+        self.failures = {GRAPH: 0, LLM: 0}
+        self.intents: Dict[str, int] = {}
+
+    def record(self, route: str, seconds: float, intent: Optional[str] = None):
+        with self._lock:
+            self.counts[route] += 1
+            self.seconds[route] += seconds
+            if intent:
+                self.intents[intent] = self.intents.get(intent, 0) + 1
+
+    def record_failure(self, route: str):
+        with self._lock:
+            self.failures[route] += 1
+
+    def report(self) -> dict:
+        """分流比例（含失败的请求）、成功请求的平均耗时，以及按大模型平均耗时估算的知识库路径节省时间"""
+        with self._lock:
+            counts, seconds, intents = dict(self.counts), dict(self.seconds), dict(self.intents)
+            failures = dict(self.failures)
+        routed = {r: counts[r] + failures[r] for r in counts}
+        total = sum(routed.values())
+        avg_ms = {r: round(seconds[r] / counts[r] * 1000, 2) if counts[r] else None for r in counts}
+        saved_ms = None
+        if counts[GRAPH] and counts[LLM]:
+            saved_ms = round((avg_ms[LLM] - avg_ms[GRAPH]) * counts[GRAPH], 1)
+        return {
+            "total": total,
+            "routes": {r: {
+                "count": routed[r],
+                "fraction": round(routed[r] / total, 4) if total else 0.0,
+                "failures": failures[r],
+                "avg_ms": avg_ms[r],
+            } for r in counts},
+            "graph_intents": intents,
+            "estimated_saved_ms": saved_ms,
+        }
+
+
+class AnswerRouter:
+    """structured：PlantQASystem（知识库规则问答）；llm：LangChainPlantQA（大模型问答）"""
+
+    def __init__(self, structured, llm):
+        self.structured = structured
+        self.llm = llm
+        self.stats = RouteStats()
+
+    def structured_answer(self, question: str) -> Tuple[Optional[str], dict]:
+        """
+        返回 (知识库回答, 追踪信息)；需要交给大模型时回答为 None
+        追踪信息：plant（第一个提到的植物）、plants（提到的全部植物）、intent、各阶段耗时 stages（毫秒）、cache_hit（本次知识库访问是否全部命中缓存）
+        """
+        qa = self.structured
+        trace = {"plant": None, "plants": [], "intent": None, "stages": {}, "cache_hit": None}
+        if not qa.plant_names:
+            return None, trace  # 知识库暂不可用，由大模型兜底
+        counters = getattr(qa.repo, "thread_counters", None)
+        before = counters() if counters else None
+        start = time.perf_counter()
+        check_deadline("resolve")
+        plants = qa.resolve_plants(question)
+        plant = plants[0] if plants else None
+        intent = qa.identify_intent(question) if plant else None
+        resolved = time.perf_counter()
+        trace.update(plant=plant, plants=plants, intent=intent)
+        trace["stages"]["resolve_ms"] = (resolved - start) * 1000
+
+        check_deadline("graph")
+        answer = None
+        if len(plants) > 1:
+            answer = qa.answer_comparison(plants, intent)
+        elif plant and intent != "basic":
+            answer = qa.answer_intent(plant, intent)
+        elif not plant:
+            answer = qa.answer_general(question)
+            if answer is not None:
+                trace["intent"] = "general"
+        if answer is not None:
+            trace["stages"]["graph_ms"] = (time.perf_counter() - resolved) * 1000
+        if before is not None:
+            hits, misses = (after - b for after, b in zip(counters(), before))
+            trace["cache_hit"] = (misses == 0) if hits + misses else None
+        return answer, trace
+
+    def _finish(self, answer: Optional[str], trace: dict, start: float, route: str) -> Tuple[str, dict]:
+        trace["route"] = route
+        trace["stages"]["total_ms"] = (time.perf_counter() - start) * 1000
+        self.stats.record(route, time.perf_counter() - start, trace["intent"] if route == GRAPH else None)
+        return answer, trace
+
+    def _fail(self, error: Exception, trace: dict, start: float) -> Tuple[str, dict]:
+        """大模型调用失败：返回提示文字，路径记为 llm_error，不计入耗时统计"""
+        trace["route"] = LLM_ERROR
+        trace["error"] = str(error)[:100]
+        trace["stages"]["total_ms"] = (time.perf_counter() - start) * 1000
+        self.stats.record_failure(LLM)
+        return self.llm.failure_message(error), trace
+
+    def answer(self, question: str) -> Tuple[str, dict]:
+        """同步问答，返回 (回答, 追踪信息)；追踪信息含 route（graph / llm / llm_error）"""
+        start = time.perf_counter()
+        answer, trace = self.structured_answer(question)
+        if answer is not None:
+            return self._finish(answer, trace, start, GRAPH)
+        check_deadline("llm")
+        llm_start = time.perf_counter()
+        try:
+            answer = self.llm.generate_answer(question)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            return self._fail(e, trace, start)
+        finally:
+            trace["stages"]["llm_ms"] = (time.perf_counter() - llm_start) * 1000
+        return self._finish(answer, trace, start, LLM)
+
+    async def answer_async(self, question: str) -> Tuple[str, dict]:
+        """异步问答：知识库路径放到线程池（Neo4j 查询会阻塞），大模型路径走异步客户端"""
+        start = time.perf_counter()
+        answer, trace = await asyncio.to_thread(self.structured_answer, question)
+        if answer is not None:
+            return self._finish(answer, trace, start, GRAPH)
+        check_deadline("llm")
+        llm_start = time.perf_counter()
+        try:
+            answer = await self.llm.generate_answer_async(question)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            return self._fail(e, trace, start)
+        finally:
+            trace["stages"]["llm_ms"] = (time.perf_counter() - llm_start) * 1000
+        return self._finish(answer, trace, start, LLM)
@@ -3,63 +3,263 @@
 """
 荆楚植物图谱 API接口服务
 用于小程序/APP/其他前端调用，免费基于FastAPI
-运行命令：python api_server.py
+运行命令：python api_server.py（单进程）
+多进程：gunicorn -c gunicorn_conf.py api_server:app（预加载知识快照，worker 共享）
 接口文档：http://localhost:8000/docs
 """
-from fastapi import FastAPI
+import asyncio
+import hmac
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from langchain_qa import LangChainPlantQA
+from typing import List, Optional
 import uvicorn
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.api.langchain_qa import LangChainPlantQA
+from src.api import serving
+from src.api.answer_router import LLM_ERROR
+from src.api.admission import AdmissionMiddleware, admission_stats
+from src.api.deadline import ANSWER_DEADLINE, READ_DEADLINE, Deadline, DeadlineExceeded, deadline_scope
+from src.api.facet_index import FACETS
+from src.api.http_cache import FastJSONResponse, cached_response
+from src.api.offline_bundle import BundleStore
+from src.api.question_log import get_question_log
+
 # 加载环境变量
 load_dotenv()
+
+@asynccontextmanager
+async def lifespan(app):
+    # worker 启动时创建问答实例与连接池（gunicorn 已在 post_fork 中创建时直接返回），
+    # 避免首个请求在事件循环上执行阻塞的初始化
+    await asyncio.to_thread(serving.get_qa)
+    yield
+
 # 初始化FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="荆楚植物文化图谱API",
     description="提供植物问答、植物详情、植物列表等接口，适配小程序/APP",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
-# 初始化问答实例（缓存）
-qa = LangChainPlantQA()
+# 响应压缩（植物列表、详情等较大的 JSON 压缩后体积通常只有几分之一）
+app.add_middleware(GZipMiddleware, minimum_size=500)
+# 准入控制（最外层）：问答与只读接口分舱限并发、有界排队，按客户端限流；过载时立即返回 429/503 + Retry-After
+app.add_middleware(AdmissionMiddleware)
+# 预加载只读知识快照（多进程模式下在 fork 前由主进程执行一次）
+# 快照可热更新：接口每次请求通过 serving.get_snapshot() 取当前版本，不要在模块级保存引用
+serving.preload(LangChainPlantQA.ALIAS_MAP)
+# 管理接口口令（未配置时管理接口不可用）
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+# 问答实例含连接池，必须在各 worker 进程内创建（post_fork 或启动时），通过 serving.get_qa() 获取
+# 离线数据包（由 tools/export_bundle.py 导出）
+bundle_store = BundleStore()
 
 # 定义请求模型
 class QuestionRequest(BaseModel):
     question: str  # 自然语言问题
+    timeout: Optional[float] = None  # 客户端可接受的最长等待（秒），不超过服务端上限 ANSWER_DEADLINE
 
 class PlantDetailRequest(BaseModel):
     plant_name: str  # 植物中文名
 
+class PlantDetailsRequest(BaseModel):
+    plant_names: List[str]  # 植物中文名列表（列表页批量获取）
+
+# ==================== 请求时限 ====================
+def _deadline(request: Request, budget: float) -> Deadline:
+    """请求时限从到达时刻（准入控制中间件记录，含排队时间）开始计算"""
+    return Deadline(budget, getattr(request.state, "arrived_at", None))
+
+def _timeout_payload(e: DeadlineExceeded, data=None):
+    return {"code": 504, "data": data, "msg": str(e), "timeout": e.to_dict()}
+
 # ==================== 接口定义 ====================
-@app.get("/api/plant_list", summary="获取所有植物名称列表")
-def get_plant_list():
-    """返回Neo4j中所有荆楚植物的中文名列表"""
+def _plant_list_payload():
     try:
-        return {"code": 200, "data": qa.plant_names, "msg": "success"}
+        return {"code": 200, "data": serving.get_qa().plant_names, "msg": "success"}
     except Exception as e:
         return {"code": 500, "data": [], "msg": f"获取失败: {str(e)}"}
 
-@app.post("/api/plant_detail", summary="获取单株植物的完整详情")
-def get_plant_detail(req: PlantDetailRequest):
-    """根据植物中文名，返回科属、分布、象征、药用等完整信息"""
+def _plant_detail_payload(plant_name: str, deadline: Deadline = None):
     try:
-        detail = qa.get_plant_detail(req.plant_name)
+        with deadline_scope(deadline):
+            detail = serving.get_qa().get_plant_detail(plant_name)
+        if detail is None:
+            return {"code": 404, "data": None, "msg": f"暂未收录该植物：{plant_name}"}
         return {"code": 200, "data": detail, "msg": "success"}
+    except DeadlineExceeded as e:
+        return _timeout_payload(e)
     except Exception as e:
         return {"code": 500, "data": None, "msg": f"获取失败: {str(e)}"}
 
+@app.get("/api/plant_list", summary="获取所有植物名称列表")
+def get_plant_list(request: Request):
+    """返回Neo4j中所有荆楚植物的中文名列表（支持 ETag / If-None-Match 条件请求）"""
+    snapshot = serving.get_snapshot()
+    return cached_response(request, snapshot.version, snapshot.updated_at, _plant_list_payload)
+
+@app.get("/api/plant_detail", summary="获取单株植物的完整详情（可缓存）")
+def get_plant_detail_cached(request: Request, name: str):
+    """GET 版本的植物详情：带 ETag / Cache-Control，客户端与 CDN 可缓存，未变化时返回 304"""
+    snapshot = serving.get_snapshot()
+    return cached_response(request, snapshot.version, snapshot.updated_at,
+                           lambda: _plant_detail_payload(name, _deadline(request, READ_DEADLINE)), name)
+
+@app.post("/api/plant_detail", summary="获取单株植物的完整详情")
+def get_plant_detail(req: PlantDetailRequest, request: Request):
+    """根据植物中文名，返回科属、分布、象征、药用等完整信息"""
+    return _plant_detail_payload(req.plant_name, _deadline(request, READ_DEADLINE))
+
+@app.get("/api/related", summary="获取相关植物推荐")
+def get_related(request: Request, plant: str, k: int = 5):
+    """按科属、节日、文化象征、分布区域的预计算相似度，返回与该植物最相关的 k 种植物"""
+    snapshot = serving.get_snapshot()
+    name = snapshot.alias_map.get(plant, plant)
+    k = max(1, min(k, snapshot.related.neighbors.shape[1]))
+
+    def payload():
+        related = [{"name": n, "score": score} for n, score in snapshot.related.related(name, k)]
+        return {"code": 200, "data": related, "msg": "success"}
+    return cached_response(request, snapshot.version, snapshot.updated_at, payload, name, str(k))
+
+# 分面检索：每页条数上限、每个分面返回的计数条数
+SEARCH_PAGE_SIZE_MAX = 100
+SEARCH_FACET_TOP = 20
+
+def _split_values(raw: str) -> List[str]:
+    return [v.strip() for v in raw.replace("，", ",").replace("|", ",").split(",") if v.strip()]
+
+@app.get("/api/search", summary="分面检索（科、属、节日、文献、分布区域）")
+def search_plants(request: Request,
+                  family: List[str] = Query(default=[]), genus: List[str] = Query(default=[]),
+                  festival: List[str] = Query(default=[]), literature: List[str] = Query(default=[]),
+                  region: List[str] = Query(default=[]), op: str = "and",
+                  page: int = 1, size: int = 20, counts: bool = True):
+    """
+    按分面筛选植物，如 ?family=蔷薇科&festival=春节&region=恩施
+    - 同一参数内逗号分隔的取值为“或”（family=蔷薇科,兰科），同一参数重复出现为“且”（festival=春节&festival=端午节）
+    - 不同分面默认为“且”，op=or 时为“或”；region 会规范化（“恩施州”->“恩施”），并包含分布于湖北全省的植物
+    - 返回命中总数、按植物名排序的当前页，以及 counts=true 时结果集中各分面取值的植物数
+    位图按位运算完成，耗时与植物数成线性且常数极小（10 万株植物为毫秒级）
+    """
+    snapshot = serving.get_snapshot()
+    raw = {"family": family, "genus": genus, "festival": festival, "literature": literature, "region": region}
+    filters = {facet: [_split_values(v) for v in values] for facet, values in raw.items() if values}
+    op = "or" if op.lower() == "or" else "and"
+    page, size = max(1, page), max(1, min(size, SEARCH_PAGE_SIZE_MAX))
+
+    def payload():
+        facets = snapshot.facets
+        bits = facets.match(filters, op)
+        positions = facets.positions(bits)
+        start = (page - 1) * size
+        items = []
+        for pos in positions[start:start + size]:
+            props = snapshot.plants[facets.names[pos]]
+            items.append({"name": props["name"], "family": props.get("family"), "genus": props.get("genus"),
+                          "distribution": props.get("distribution")})
+        data = {"total": len(positions), "page": page, "size": size, "plants": items}
+        if counts:
+            data["facets"] = facets.facet_counts(bits, list(FACETS), SEARCH_FACET_TOP)
+        return {"code": 200, "data": data, "msg": "success"}
+    resource = [f"{k}={'&'.join(','.join(g) for g in v)}" for k, v in sorted(filters.items())]
+    return cached_response(request, snapshot.version, snapshot.updated_at, payload,
+                           *resource, op, str(page), str(size), str(counts))
+
+@app.post("/api/plant_details", summary="批量获取多株植物的完整详情")
+def get_plant_details(req: PlantDetailsRequest, request: Request):
+    """一次查询返回多株植物详情（按传入顺序，未收录的植物跳过），供列表页使用"""
+    try:
+        with deadline_scope(_deadline(request, READ_DEADLINE)):
+            details = serving.get_qa().get_plant_details(req.plant_names)
+        return {"code": 200, "data": details, "msg": "success"}
+    except DeadlineExceeded as e:
+        return _timeout_payload(e, [])
+    except Exception as e:
+        return {"code": 500, "data": [], "msg": f"获取失败: {str(e)}"}
+
+@app.get("/api/bundle", summary="离线数据包（支持增量）")
+def get_bundle(request: Request, since: str = ""):
+    """
+    返回小程序/PWA 离线数据包：植物详情、别名表、反向索引与预生成回答
+    since 为客户端已有的数据包版本，只下发变化的植物；版本未知或已过期时返回完整数据包（full=true）
+    """
+    bundle = bundle_store.latest()
+    if bundle is None:
+        return {"code": 404, "data": None, "msg": "离线数据包尚未生成，请先运行 tools/export_bundle.py"}
+    return cached_response(request, bundle["version"], bundle["generated_at"],
+                           lambda: {"code": 200, "data": bundle_store.delta(since, bundle), "msg": "success"}, since)
+
 @app.post("/api/answer", summary="智能问答接口（自然语言）")
-def answer_question(req: QuestionRequest):
-    """输入任意自然语言问题，返回Cypher查询结果"""
+async def answer_question(req: QuestionRequest, request: Request):
+    """
+    输入任意自然语言问题，返回回答：能直接查知识库的问题（分类、分布、节日等）不调用大模型，
+    其余问题异步调用大模型（同一 worker 可并发处理多个问答）；route 为实际使用的路径（graph / llm），
+    大模型调用失败时 data 为提示文字、route 为 llm_error
+    整个请求受时限约束（默认 ANSWER_DEADLINE 秒，含排队）：到期即取消剩余工作，
+    返回 code=504 与 timeout（超时发生的阶段 queue / resolve / graph / llm、已用时间与时限）
+    """
+    budget = min(req.timeout, ANSWER_DEADLINE) if req.timeout else ANSWER_DEADLINE
+    deadline = _deadline(request, budget)
     try:
-        answer = qa.answer(req.question)
-        return {"code": 200, "data": answer, "msg": "success"}
+        deadline.check("queue")  # 排队已耗尽时限则不再开始处理
+        with deadline_scope(deadline):
+            try:
+                answer, trace = await asyncio.wait_for(serving.get_router().answer_async(req.question),
+                                                       timeout=max(deadline.remaining(), 0))
+            except asyncio.TimeoutError:
+                raise deadline.exceeded() from None
+        # 只放入内存队列，由后台线程批量写盘，不增加响应延迟；失败提示不是回答，不写入日志（原因在 error 字段）
+        get_question_log().record(req.question, "api", answer="" if trace["route"] == LLM_ERROR else answer, **trace)
+        return {"code": 200, "data": answer, "route": trace["route"], "msg": "success"}
+    except DeadlineExceeded as e:
+        get_question_log().record(req.question, "api", route="timeout", timeout=e.to_dict())
+        return _timeout_payload(e, "")
     except Exception as e:
+        get_question_log().record(req.question, "api", route="error", error=str(e)[:100])
         return {"code": 500, "data": "", "msg": f"问答失败: {str(e)}"}
 
+@app.get("/api/router_stats", summary="问答路由统计")
+def router_stats():
+    """当前 worker 的分流比例（知识库 / 大模型）、各路径平均耗时与估算节省的总延迟"""
+    return {"code": 200, "data": serving.get_router().stats.report(), "msg": "success"}
+
+@app.post("/api/admin/reload", summary="热更新知识库（管理接口）")
+def admin_reload(force: bool = False, x_admin_token: str = Header(default="")):
+    """
+    热更新知识快照与植物名索引，请求不中断（需请求头 X-Admin-Token）
+    单进程：在后台重建后原子替换，默认数据版本未变化时不重建，force=true 强制重建
+    gunicorn：通知主进程重建快照并平滑重启全部 worker，所有 worker 同时切换到新版本
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        return {"code": 403, "data": None, "msg": "无权访问（未配置 ADMIN_TOKEN 或口令错误）"}
+    started = serving.request_reload(force)
+    return {"code": 202 if started else 409, "data": serving.reload_status(),
+            "msg": "已开始重建" if started else "已有重建在进行"}
+
+@app.get("/api/health", summary="服务健康检查与当前 worker 内存")
+def health():
+    """返回当前 worker 进程号、知识快照版本与热更新状态、内存占用（RSS/PSS/USS，单位 MB）与各分舱的并发、排队和拒绝统计"""
+    snapshot = serving.get_snapshot()
+    return {"code": 200, "data": {
+        "pid": os.getpid(),
+        "snapshot_version": snapshot.version,
+        "plant_count": len(snapshot.plant_names),
+        "reload": serving.reload_status(),
+        "memory": serving.memory_usage(),
+        "admission": admission_stats()
+    }, "msg": "success"}
+
 # 主函数
 if __name__ == "__main__":
-    # 启动API服务，本地访问：http://localhost:8000
+    # 启动API服务（单进程），本地访问：http://localhost:8000
+    # 多 worker 请使用 gunicorn -c gunicorn_conf.py api_server:app
     uvicorn.run(app, host="0.0.0.0", port=8000)
     print("✅ API服务已启动，接口文档：http://localhost:8000/docs")
\ No newline at end of file
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+植物描述全文检索（BM25）
+问题中没有识别出具体植物时（如“湖北哪些植物能驱虫”），按分布、文化象征、药用、传统用途、生态意义
+检索最相关的植物，作为大模型回答的参考资料。
+倒排索引在数据加载时构建一次，查询只遍历问题中各词的倒排表。
+单字只参与排序：植物至少命中问题中的一个完整词才会返回，寒暄或与植物无关的问题（如“你好”）返回空列表，
+不会把只有个别字相同的植物当作参考资料。
+"""
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+try:
+    import jieba
+except ImportError:  # 未安装 jieba 时按单字切分
+    jieba = None
+
+# 参与检索的字段
+SEARCH_FIELDS = [
+    "distribution",
+    "cultural_symbol",
+    "medicinal_value",
+    "traditional_use",
+    "ecological_significance",
+]
+
+# 问句中常见但没有检索意义的词
+STOPWORDS = {
+    "的", "了", "和", "与", "及", "或", "是", "有", "在", "能", "会", "可以", "可", "吗", "呢", "吧",
+    "哪些", "哪个", "哪里", "什么", "怎么", "如何", "为什么", "请问", "一下", "一些", "有没有",
+    "植物", "荆楚", "湖北", "无",
+    "我", "你", "您", "他", "她", "它", "们", "谁", "这", "那", "个", "用", "做", "把", "被", "让", "给",
+    "要", "想", "对", "从", "到", "为", "很", "最", "都", "也", "还", "就", "又",
+}
+
+_CJK = re.compile(r"[一-鿿]")
+_TOKEN = re.compile(r"[一-鿿]+|[a-zA-Z0-9]+")
+
+
+def _words(chunk: str) -> List[str]:
+    """jieba 精确模式分词（去掉停用词）；未安装 jieba 时按单字切分"""
+    words = jieba.lcut(chunk) if jieba is not None else list(chunk)
+    return [w for w in words if w not in STOPWORDS]
+
+
+def _terms(text: str) -> Tuple[List[str], List[str]]:
+    """(完整词, 实词中的单字)：完整词为 jieba 搜索模式的多字词、单字实词与英文数字串"""
+    words, chars = [], []
+    for chunk in _TOKEN.findall(text or ""):
+        if not _CJK.match(chunk):
+            words.append(chunk.lower())
+            continue
+        if jieba is not None:
+            words.extend(w for w in jieba.lcut_for_search(chunk) if len(w) > 1)
+        for word in _words(chunk):
+            if len(word) == 1:
+                words.append(word)
+            else:
+                chars.extend(word)
+    return [w for w in words if w not in STOPWORDS], [c for c in chars if c not in STOPWORDS]
+
+
+def tokenize(text: str) -> List[str]:
+    """jieba 搜索模式分词 + 实词中的单字（单字让“驱虫药”也能匹配到“驱虫”，常见字的权重由 IDF 压低）"""
+    words, chars = _terms(text)
+    return words + chars
+
+
+def content_words(text: str) -> Set[str]:
+    """问题中的完整词；检索结果必须至少命中其中一个"""
+    return set(_terms(text)[0])
+
+
+class BM25Index:
+    """BM25 倒排索引；documents 为植物记录（需包含 name 及 SEARCH_FIELDS 字段）"""
+
+    def __init__(self, documents: Iterable, fields: List[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.fields = fields or SEARCH_FIELDS
+        self.k1 = k1
+        self.b = b
+        self.names: List[str] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for doc_id, doc in enumerate(documents):
+            self.names.append(doc["name"])
+            tokens = tokenize(" ".join(str(doc.get(f, "")) for f in self.fields))
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        n_docs = len(self.names)
+        avgdl = (sum(doc_lengths) / n_docs) if n_docs else 0.0
+        # 每篇文档的长度归一化因子 k1 * (1 - b + b * dl / avgdl)，查询时直接使用
+        self._norm = [k1 * (1 - b + b * dl / avgdl) if avgdl else k1 for dl in doc_lengths]
+        self._idf = {
+            term: math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self._postings.items()
+        }
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+        """返回 [(植物名, 得分)]，按得分降序；只返回命中问题中至少一个完整词的植物，没有时返回空列表"""
+        required = content_words(query)
+        scores: Dict[int, float] = {}
+        relevant = set()
+        for term in set(tokenize(query)) | required:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = self._idf[term]
+            for doc_id, tf in posting:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norm[doc_id])
+            if term in required:
+                relevant.update(doc_id for doc_id, _ in posting)
+        candidates = ((doc_id, score) for doc_id, score in scores.items() if doc_id in relevant)
+        best = heapq.nlargest(top_k, candidates, key=lambda item: item[1])
+        return [(self.names[doc_id], round(score, 4)) for doc_id, score in best]
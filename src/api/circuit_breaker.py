@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+熔断器：保护图数据库等外部依赖
+- 关闭（closed）：正常调用；连续失败达到阈值后打开
+- 打开（open）：直接拒绝调用（抛出 CircuitOpenError），调用方改用本地快照，不再等待超时
+- 半开（half_open）：打开超过 reset_timeout 后，后台线程执行一次探测（如 verify_connectivity），
+  成功则关闭，失败则继续保持打开；探测期间用户请求仍走降级路径，不会被探测拖慢
+未提供探测函数时，半开状态放行一个真实请求作为探测。
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type
+
+try:
+    from neo4j.exceptions import DriverError, Neo4jError
+except ImportError:  # 未安装 neo4j 驱动时只有网络错误
+    DriverError = Neo4jError = None
+
+logger = logging.getLogger(__name__)
+
+# ========== 图数据库熔断参数 ==========
+# 视为图数据库不可用的异常：连接失败、会话过期、网络错误与超时（Cypher 语法错误等不计入）
+GRAPH_FAILURES = (DriverError, OSError) if DriverError is not None else (OSError,)
+# 图数据库连接与单次查询超时（秒）
+GRAPH_TIMEOUT = float(os.environ.get("NEO4J_TIMEOUT", "5"))
+# 连续失败多少次后熔断、熔断多久后探测恢复（秒）
+GRAPH_FAILURE_THRESHOLD = int(os.environ.get("NEO4J_FAILURE_THRESHOLD", "3"))
+GRAPH_RESET_TIMEOUT = float(os.environ.get("NEO4J_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，调用被拒绝"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 probe: Optional[Callable[[], object]] = None,
+                 failure_types: Tuple[Type[BaseException], ...] = (Exception,)):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.failure_types = failure_types
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+        self._probing = False
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            if self.probe is None:
+                return True  # 放行当前请求作为探测
+            self._probing = True
+        threading.Thread(target=self._run_probe, name=f"{self.name}-probe", daemon=True).start()
+        return False
+
+    def _run_probe(self):
+        try:
+            self.probe()
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} 探测失败，保持熔断：{str(e)[:100]}")
+            self.trip()
+        else:
+            self.record_success()
+        finally:
+            self._probing = False
+
+    def trip(self):
+        """立即打开（如启动时就无法连接）"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                logger.warning(f"⚠️ {self.name} 不可用，熔断打开，改用降级数据")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"✅ {self.name} 已恢复，熔断关闭")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            trip = self.state == self.HALF_OPEN or self.failures >= self.failure_threshold
+        if trip:
+            self.trip()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """执行 fn；熔断打开时抛出 CircuitOpenError，fn 抛出 failure_types 中的异常时计为一次失败"""
+        if not self._allow():
+            raise CircuitOpenError(f"{self.name} 熔断中")
+        try:
+            result = fn(*args, **kwargs)
+        except self.failure_types:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+def run_graph(fn: Callable, *args, **kwargs):
+    """执行图查询；事务超时（Neo4jError，错误码含 TimedOut）转换为 TimeoutError，与网络超时一样计入熔断"""
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        if Neo4jError is not None and isinstance(e, Neo4jError) and "TimedOut" in (e.code or ""):
+            raise TimeoutError(e.message) from e
+        raise
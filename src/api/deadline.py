@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+请求时限（deadline）传递
+每个 API / Streamlit 请求创建一个 Deadline，通过 contextvars 随调用链传递（asyncio.to_thread 会复制上下文），
+各阶段不必逐层传参：
+    resolve  植物识别与问题类型判断
+    graph    知识库查询：Neo4j 事务超时 = min(NEO4J_TIMEOUT, 剩余时间)
+    llm      大模型调用：请求超时 = min(默认超时, 剩余时间)；流式生成在片段之间检查
+阶段开始前检查剩余时间，已超时则抛出 DeadlineExceeded（记录超时发生的阶段），剩余工作不再执行。
+DeadlineExceeded 不是网络错误，不计入熔断、也不触发快照降级。
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# 问答请求的默认时限（秒，含排队时间）；只读接口（植物详情）的时限
+ANSWER_DEADLINE = float(os.environ.get("ANSWER_DEADLINE", "30"))
+READ_DEADLINE = float(os.environ.get("READ_DEADLINE", "5"))
+
+
+class DeadlineExceeded(Exception):
+    """请求超过时限；stage 为超时发生时所在的阶段"""
+
+    def __init__(self, stage: str, elapsed: float, budget: float):
+        super().__init__(f"请求超时：{stage} 阶段已用 {elapsed:.1f} 秒，超过 {budget:.1f} 秒时限")
+        self.stage = stage
+        self.elapsed = elapsed
+        self.budget = budget
+
+    def to_dict(self) -> dict:
+        return {"stage": self.stage, "elapsed_ms": round(self.elapsed * 1000, 1),
+                "budget_ms": round(self.budget * 1000, 1)}
+
+
+class Deadline:
+    """一次请求的时限；start 为请求到达时刻（time.monotonic()，默认为创建时刻，可包含排队时间）"""
+
+    def __init__(self, budget: float, start: Optional[float] = None):
+        self.budget = budget
+        self.start = start if start is not None else time.monotonic()
+        self.stage: Optional[str] = None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def remaining(self) -> float:
+        return self.budget - self.elapsed()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str):
+        """进入阶段 stage；已超时则抛出 DeadlineExceeded"""
+        self.stage = stage
+        if self.expired():
+            raise self.exceeded()
+
+    def exceeded(self) -> DeadlineExceeded:
+        return DeadlineExceeded(self.stage or "unknown", self.elapsed(), self.budget)
+
+    def cap(self, timeout: float, stage: str) -> float:
+        """进入阶段 stage，返回该阶段可用的超时：min(timeout, 剩余时间)"""
+        self.check(stage)
+        return min(timeout, self.remaining())
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """在 with 块内（含其中 asyncio.to_thread 启动的线程）使用 deadline"""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline(stage: str):
+    """当前请求已超时则抛出 DeadlineExceeded；没有时限时不做任何事"""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def cap_timeout(timeout: float, stage: str) -> float:
+    """按当前请求的剩余时间收紧超时；没有时限时原样返回"""
+    deadline = _current.get()
+    return deadline.cap(timeout, stage) if deadline is not None else timeout
+
+
+def raise_if_expired(stage: str):
+    """外部调用失败后调用：若失败是因为时限已到（超时被收紧），改为抛出 DeadlineExceeded"""
+    deadline = _current.get()
+    if deadline is not None and deadline.expired():
+        deadline.stage = stage
+        raise deadline.exceeded()
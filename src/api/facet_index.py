@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+分面检索索引（位图）
+每个分面取值（科、属、节日、文献书名、规范化后的分布区域）对应一个位图：第 i 位表示第 i 株植物（按植物名排序）是否具有该取值。
+全部位图存放在一个 uint64 矩阵中（每行一个取值），10 万株植物每个取值只占约 12 KB。
+查询只做按位与 / 或：同一分面内逗号分隔的取值为“或”，同一分面重复出现为“且”，不同分面默认为“且”（op=or 时为“或”）；
+计数对结果位图与各取值位图按位与后统计 1 的个数，整体开销与植物数成线性、常数极小，不需要逐条扫描字符串。
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.database.plant_schema import MISSING, literature_work, normalize_festival, split_terms
+
+# 分布区域规范化：去掉行政区划后缀，合并常见异写（“恩施州”“恩施土家族苗族自治州” -> “恩施”）
+REGION_SUFFIXES = ("土家族苗族自治州", "自治州", "地区", "林区", "市", "州", "县")
+REGION_ALIASES = {"湖北省全省": "湖北全省", "全省": "湖北全省", "湖北省": "湖北全省", "湖北各地": "湖北全省"}
+# 分布于“湖北全省”的植物也算作分布于任一具体区域
+PROVINCE_WIDE = "湖北全省"
+
+
+def normalize_region(term: str) -> str:
+    term = term.strip()
+    if term in REGION_ALIASES:
+        return REGION_ALIASES[term]
+    for suffix in REGION_SUFFIXES:
+        if term.endswith(suffix) and len(term) > len(suffix) + 1:
+            return term[:-len(suffix)]
+    return term
+
+
+def _single(field: str) -> Callable[[Dict], List[str]]:
+    def values(record):
+        value = record.get(field) or MISSING
+        return [] if value == MISSING else [value]
+    return values
+
+
+# 分面 -> 从标准字段记录取值
+FACETS: Dict[str, Callable[[Dict], List[str]]] = {
+    "family": _single("family"),
+    "genus": _single("genus"),
+    "festival": lambda r: [normalize_festival(t) for t in split_terms(r.get("festivals", MISSING))],
+    "literature": lambda r: [literature_work(t) for t in split_terms(r.get("literature_source", MISSING))],
+    "region": lambda r: [normalize_region(t) for t in split_terms(r.get("distribution", MISSING))],
+}
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        """逐行统计 1 的个数"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:  # numpy < 2.0：按字节查表
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        as_bytes = words.view(np.uint8).reshape(words.shape[:-1] + (-1,))
+        return _BYTE_COUNTS[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+class FacetIndex:
+    """bits[row] 为取值 row 的位图；values[facet] 为 {取值: row}，counts[row] 为该取值的植物数"""
+
+    def __init__(self, names: List[str], values: Dict[str, Dict[str, int]], bits: np.ndarray):
+        self.names = names
+        self.values = values
+        self.bits = bits
+        self.n_words = bits.shape[1]
+        self.counts = _popcount(bits) if len(bits) else np.zeros(0, dtype=np.int64)
+        self._all = self._full_mask(len(names), self.n_words)
+
+    @staticmethod
+    def _full_mask(n: int, n_words: int) -> np.ndarray:
+        mask = np.zeros(n_words, dtype=np.uint64)
+        if n:
+            mask[:n // 64] = np.uint64(0xFFFFFFFFFFFFFFFF)
+            if n % 64:
+                mask[n // 64] = np.uint64((1 << (n % 64)) - 1)
+        return mask
+
+    @classmethod
+    def build(cls, records: Iterable) -> "FacetIndex":
+        """records 须按植物名排序（与快照的 plant_names 顺序一致）"""
+        names, rows, cols = [], [], []
+        values: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        n_values = 0
+        for i, record in enumerate(records):
+            names.append(record["name"])
+            for facet, extract in FACETS.items():
+                table = values[facet]
+                for value in dict.fromkeys(v for v in extract(record) if v):
+                    row = table.get(value)
+                    if row is None:
+                        row = table[value] = n_values
+                        n_values += 1
+                    rows.append(row)
+                    cols.append(i)
+        n_words = max(1, (len(names) + 63) // 64)
+        bits = np.zeros((n_values, n_words), dtype=np.uint64)
+        if rows:
+            rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+            # 同一个字内可能有多株植物：用 bitwise_or.at 逐个置位
+            np.bitwise_or.at(bits, (rows, cols >> 6), np.left_shift(np.uint64(1), (cols & 63).astype(np.uint64)))
+        return cls(names, values, bits)
+
+    # ---------- 查询 ----------
+    def bitset(self, facet: str, value: str) -> np.ndarray:
+        """单个取值的位图（未知取值为空位图）；区域会先规范化，并包含分布于湖北全省的植物"""
+        table = self.values.get(facet)
+        if table is None:
+            raise ValueError(f"不支持的分面：{facet}（可选 {'、'.join(FACETS)}）")
+        if facet == "region":
+            value = normalize_region(value)
+        row = table.get(value)
+        bits = self.bits[row] if row is not None else np.zeros(self.n_words, dtype=np.uint64)
+        if facet == "region" and value != PROVINCE_WIDE and PROVINCE_WIDE in table:
+            bits = bits | self.bits[table[PROVINCE_WIDE]]
+        return bits
+
+    def match(self, filters: Dict[str, Sequence[Sequence[str]]], op: str = "and") -> np.ndarray:
+        """
+        filters：{分面: [取值组, ...]}，组内取值为“或”，同一分面的多个组为“且”
+        op：不同分面之间的组合方式（and / or）；没有任何条件时返回全部植物
+        """
+        facet_bits = []
+        for facet, groups in filters.items():
+            bits = self._all.copy()
+            for group in groups:
+                any_of = np.zeros(self.n_words, dtype=np.uint64)
+                for value in group:
+                    any_of |= self.bitset(facet, value)
+                bits &= any_of
+            facet_bits.append(bits)
+        if not facet_bits:
+            return self._all.copy()
+        if op == "or":
+            return np.bitwise_or.reduce(facet_bits)
+        return np.bitwise_and.reduce(facet_bits)
+
+    def positions(self, bits: np.ndarray) -> np.ndarray:
+        """位图中为 1 的植物编号（升序，即按植物名排序）"""
+        flags = np.unpackbits(bits.view(np.uint8), bitorder="little")[:len(self.names)]
+        return np.flatnonzero(flags)
+
+    def count(self, bits: np.ndarray) -> int:
+        return int(_popcount(bits))
+
+    def facet_counts(self, bits: np.ndarray, facets: Optional[Sequence[str]] = None,
+                     top: int = 20) -> Dict[str, Dict[str, int]]:
+        """结果集中各分面取值的植物数（每个分面按数量取前 top 个，数量为 0 的不返回）"""
+        result = {}
+        for facet in facets or FACETS:
+            table = self.values.get(facet) or {}
+            if not table:
+                result[facet] = {}
+                continue
+            labels = list(table)
+            rows = np.fromiter(table.values(), dtype=np.int64, count=len(table))
+            counts = _popcount(self.bits[rows] & bits)
+            order = np.argsort(-counts, kind="stable")[:top]
+            result[facet] = {labels[i]: int(counts[i]) for i in order if counts[i] > 0}
+        return result
+
+    def value_counts(self, facet: str) -> Dict[str, int]:
+        """某分面全部取值及其植物数（不加筛选）"""
+        return {value: int(self.counts[row]) for value, row in self.values.get(facet, {}).items()}
@@ -5,48 +5,159 @@
 支持环境变量：NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
 """
 import os
-from neo4j import GraphDatabase
+import sys
 import jieba
 import logging
 from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.api.circuit_breaker import GRAPH_FAILURES, CircuitOpenError
+from src.api.fuzzy_match import FuzzyResolver
+from src.api.knowledge_repository import KnowledgeRepository, create_repository
+from src.api.plant_queries import entry_to_detail
+from src.database.plant_schema import PLANT_ALIASES
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 图数据库与本地快照都不可用时的回答
+UNAVAILABLE_MSG = "⚠️ 知识库暂时无法访问，请稍后再试。"
+
+
+def _list_or_text(list_key: str, text_key: str):
+    """对比表单元格：优先取关联实体列表，其次取节点文本属性"""
+    return lambda entry: "、".join(entry.get(list_key) or []) or entry.get(text_key)
+
+
+def _field(key: str):
+    return lambda entry: entry.get(key)
+
+
+class NameIndex:
+    """
+    一版植物名相关的只读数据：植物名表、别名表、多植物识别用的写法表、模糊匹配索引
+    构建完成后不再修改；热更新时整体替换，识别过程中途不会看到新旧混合的数据
+    """
+    __slots__ = ("plant_names", "alias_map", "mention_terms", "resolver")
+
+    def __init__(self, plant_names: List[str], alias_map: dict):
+        self.plant_names = plant_names
+        self.alias_map = alias_map
+        # 问题中可能出现的写法 -> 标准植物名（植物名本身 + 别名），多植物识别按最长匹配
+        self.mention_terms = sorted(
+            [(name, name) for name in plant_names] + list(alias_map.items()),
+            key=lambda term: -len(term[0])
+        )
+        self.resolver = FuzzyResolver(plant_names, alias_map)
+
+
+EMPTY_INDEX = NameIndex([], {})
+
+
 class PlantQASystem:
-    # ========== 类属性：别名映射表 ==========
-    ALIAS_MAP = {
-        "菊花": "菊", "梅花": "梅", "兰花": "兰", "竹子": "竹",
-        "荷花": "荷", "莲花": "荷", "桂花": "桂", "牡丹花": "牡丹",
-        "杜鹃花": "杜鹃", "水仙花": "水仙", "艾草": "艾", "菖蒲叶": "菖蒲",
-        "松树": "松", "柏树": "柏", "柳树": "柳", "桑树": "桑",
-        "茶树": "茶", "桃树": "桃", "银杏树": "银杏", "梧桐树": "梧桐"
+    # ========== 类属性：统一别名表（实际使用按知识库植物名解析后的 self.alias_map） ==========
+    ALIAS_MAP = PLANT_ALIASES
+
+    # 节日关键词 -> (图谱中的节日名, 图标, 图谱暂无数据时的兜底回答)
+    FESTIVAL_KEYWORDS = {
+        "端午": ("端午节", "🎋", "艾、菖蒲、蒜"),
+        "春节": ("春节", "🧧", "橘、桃、水仙"),
+        "重阳": ("重阳节", "🏔️", "菊、茱萸"),
+        "中秋": ("中秋节", "🌕", "桂"),
+        "清明": ("清明节", "🌧️", "柳、杜鹃、柏"),
     }
 
-    def __init__(self, uri: str = None, user: str = None, password: str = None):
+    # 问题类型 -> 关键词（按顺序匹配，先命中者优先；均未命中为 basic）
+    # 离线数据包也导出这张表，客户端本地判定问题类型后直接取预生成的回答
+    INTENT_KEYWORDS = [
+        ("symbol", ["象征", "寓意", "代表", "含义", "文化"]),
+        ("medicinal", ["药用", "功效", "药效", "治疗", "治病"]),
+        ("distribution", ["分布", "哪里", "在哪", "产地", "生长"]),
+        ("folk", ["民俗", "用途", "使用", "怎么用"]),
+        ("festival", ["节日", "端午", "春节", "重阳", "中秋", "清明"]),
+        ("literature", ["文献", "记载", "诗经", "楚辞", "诗词"]),
+        ("taxonomy", ["科", "属", "分类"]),
+    ]
+    INTENTS = [intent for intent, _ in INTENT_KEYWORDS] + ["basic"]
+
+    # 两处植物名之间出现这些词时才算分别提到两种植物（“梅和兰”）；
+    # 中间没有连接词时视为复合词或修饰（“菊花茶”“艾草泡茶”只识别第一个），
+    # 但连写 ENUMERATION_MIN 个及以上植物名视为并列（“梅兰竹菊”“松竹梅”）
+    ENUMERATION_MIN = 3
+    MENTION_SEPARATORS = ("和", "与", "跟", "同", "及", "或", "还是", "比", "对比", "、", "，", ",", "；", ";", " ", "vs")
+
+    # 多植物对比：问题类型 -> (图标, 标题, [(列名, 取值函数)])
+    COMPARE_COLUMNS = {
+        "symbol": ("🌿", "文化象征", [("文化象征", _list_or_text("symbols", "cultural_symbol"))]),
+        "medicinal": ("💊", "药用价值", [("药用价值", _list_or_text("medicinal", "medicinal_value"))]),
+        "distribution": ("🗺️", "分布区域", [("分布区域", _field("distribution"))]),
+        "folk": ("🏮", "民俗用途", [("民俗用途", _field("folk_use"))]),
+        "festival": ("🎉", "相关节日", [("相关节日", _list_or_text("festivals", "festival"))]),
+        "literature": ("📖", "文献记载", [("文献记载", _list_or_text("literature", "literature_source"))]),
+        "taxonomy": ("🌱", "科属", [("拉丁名", _field("latin_name")), ("科", _field("family")),
+                                   ("属", _field("genus"))]),
+        "basic": ("🌿", "基本信息", [("科", _field("family")), ("属", _field("genus")),
+                                   ("分布", _field("distribution")), ("文化象征", _field("cultural_symbol"))]),
+    }
+
+    def __init__(self, uri: str = None, user: str = None, password: str = None,
+                 repository: KnowledgeRepository = None, index: "NameIndex" = None):
         """
-        初始化Neo4j连接
+        初始化知识库仓库（默认 Neo4j，可由环境变量 KNOWLEDGE_BACKEND 切换）
         优先级：传入参数 > 环境变量 > 本地开发默认值（你的neo4j账号：neo4j/12345678）
+        index：已构建好的植物名数据（如主进程知识快照中的），提供时不再按仓库重建
         """
         self.uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
         self.user = user or os.environ.get("NEO4J_USER", "neo4j")
         self.password = password or os.environ.get("NEO4J_PASSWORD", "12345678")
-        
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
-        self.plant_names = self._get_all_plants()
-        self._setup_jieba()
-        logger.info(f"✅ 完整问答系统已启动，连接至 {self.uri}，包含 {len(self.plant_names)} 种植物")
-
-    def _get_all_plants(self) -> List[str]:
-        with self.driver.session() as session:
-            result = session.run("MATCH (p:Plant) RETURN p.name as name ORDER BY p.name")
-            return [record['name'] for record in result]
-
-    def _setup_jieba(self):
-        # 添加植物名称
-        for name in self.plant_names:
+
+        # 图数据库访问经熔断器保护，不可用时从本地图谱快照作答（见 knowledge_repository）
+        self.repo = repository or create_repository(uri=self.uri, user=self.user, password=self.password)
+        self.index = EMPTY_INDEX
+        self._load_plant_names(index)
+        backend = type(getattr(self.repo, "backend", self.repo)).__name__
+        logger.info(f"✅ 完整问答系统已启动（知识库后端 {backend}），包含 {len(self.plant_names)} 种植物")
+
+    # ---------- 当前一版植物名数据（热更新时整体替换） ----------
+    @property
+    def plant_names(self) -> List[str]:
+        return self.index.plant_names
+
+    @property
+    def alias_map(self) -> dict:
+        return self.index.alias_map
+
+    @property
+    def resolver(self) -> FuzzyResolver:
+        return self.index.resolver
+
+    def _load_plant_names(self, index: NameIndex = None):
+        """加载植物名与别名并构建匹配索引、分词词典；知识库暂不可用时保持为空，稍后重试"""
+        try:
+            self.index = self.build_index(index=index)
+        except (CircuitOpenError,) + GRAPH_FAILURES as e:
+            logger.warning(f"⚠️ 知识库不可用且没有本地快照，植物列表暂为空：{str(e)[:100]}")
+
+    def build_index(self, repo: KnowledgeRepository = None, index: NameIndex = None) -> NameIndex:
+        """
+        按知识库（默认当前仓库）构建新一版植物名数据（不影响正在使用旧版本的请求），并注册分词词典
+        index 为已构建好的一版时只注册分词词典
+        """
+        if index is None:
+            repo = repo or self.repo
+            index = NameIndex(repo.list_names(), repo.aliases)
+        self._setup_jieba(index)
+        return index
+
+    def swap_index(self, index: NameIndex):
+        """原子替换为新一版植物名数据（一次引用赋值）"""
+        self.index = index
+
+    def _setup_jieba(self, index: NameIndex):
+        # 添加植物名称（jieba 词典只增不减，旧版本的词留在词典中不影响识别）
+        for name in index.plant_names:
             jieba.add_word(name)
-        # 添加别名（使用类属性）
-        for alias in self.ALIAS_MAP.keys():
+        # 添加别名
+        for alias in index.alias_map.keys():
             jieba.add_word(alias)
         # 添加节日词汇
         jieba.add_word("端午节")
@@ -60,183 +171,172 @@ class PlantQASystem:
     # ------------------------------------------------------------
     def answer(self, question: str) -> str:
         """主回答函数，自动识别植物并分派到具体查询"""
-        # 1. 直接匹配知识库中的植物名
-        for plant in self.plant_names:
-            if plant in question:
-                return self._answer_for_plant(plant, question)
-        # 2. 通过别名映射识别（使用类属性）
-        for alias, real_name in self.ALIAS_MAP.items():
+        try:
+            if not self.plant_names:
+                self._load_plant_names()
+                if not self.plant_names:
+                    return UNAVAILABLE_MSG
+            return self._answer(question)
+        except (CircuitOpenError,) + GRAPH_FAILURES:
+            return UNAVAILABLE_MSG
+
+    def _answer(self, question: str) -> str:
+        plants = self.resolve_plants(question)
+        if len(plants) > 1:
+            return self.answer_comparison(plants, self.identify_intent(question))
+        if plants:
+            return self._answer_for_plant(plants[0], question)
+        # 别名可识别但知识库未收录
+        for alias in self.ALIAS_MAP:
             if alias in question:
-                if real_name in self.plant_names:
-                    return self._answer_for_plant(real_name, question)
-                else:
-                    return f"❌ 暂未收录该种植物（{alias}）"
-        # 3. 分词尝试提取（兜底）
-        words = jieba.lcut(question)
-        for word in words:
-            if word in self.plant_names:
-                return self._answer_for_plant(word, question)
-        # 4. 完全没有识别出任何植物
+                return f"❌ 暂未收录该种植物（{alias}）"
+        # 完全没有识别出任何植物
         return self._handle_general_question(question)
 
+    def resolve_plant(self, question: str) -> Optional[str]:
+        """识别问题中的植物，返回第一个提到的标准植物名；无法识别时返回 None"""
+        plants = self.resolve_plants(question)
+        return plants[0] if plants else None
+
+    def resolve_plants(self, question: str) -> List[str]:
+        """识别问题中提到的全部植物（按出现顺序、去重）；无法识别时返回空列表"""
+        index = self.index  # 整个识别过程使用同一版数据
+        # 1. 植物名与统一别名表（别名已按知识库植物名解析，含“荷”“莲”等括号变体）：
+        #    长词优先且不重叠，“菖蒲”不会再额外识别出“蒲”，“荷花”不会再识别出“荷”
+        taken = [False] * len(question)
+        found = []
+        for term, name in index.mention_terms:
+            start = question.find(term)
+            while start != -1:
+                end = start + len(term)
+                if not any(taken[start:end]):
+                    taken[start:end] = [True] * len(term)
+                    found.append((start, end, name))
+                start = question.find(term, end)
+        if found:
+            return list(dict.fromkeys(self._separate_mentions(question, sorted(found))))
+        # 2. 分词尝试提取（兜底）
+        for word in jieba.lcut(question):
+            if word in index.plant_names:
+                return [word]
+        # 3. 模糊匹配兜底（错别字、繁体、拼音、“荷”与“荷（莲）”等写法）
+        fuzzy = index.resolver.resolve_in_text(question)
+        return [fuzzy] if fuzzy else []
+
+    def _separate_mentions(self, question: str, found: List[tuple]) -> List[str]:
+        """found 为按位置排序的 (起点, 终点, 植物名)，返回分别提到的植物名"""
+        # 紧挨着的提及为一组：连写的并列保留全部，两个连写（复合词）只保留第一个
+        runs = []
+        for mention in found:
+            if runs and mention[0] == runs[-1][-1][1]:
+                runs[-1].append(mention)
+            else:
+                runs.append([mention])
+        names, last_end = [], 0
+        for run in runs:
+            # 与上一处保留的提及之间须有连接词，否则属于同一个短语（“艾草泡茶”）
+            if names and not any(sep in question[last_end:run[0][0]] for sep in self.MENTION_SEPARATORS):
+                continue
+            members = run if len(run) >= self.ENUMERATION_MIN else run[:1]
+            names.extend(name for _, _, name in members)
+            last_end = run[-1][1]
+        return names
+
     def _answer_for_plant(self, plant: str, question: str) -> str:
         """给定植物名，根据问题类型返回对应信息"""
-        q_type = self._identify_question_type(question)
-        with self.driver.session() as session:
-            if q_type == "symbol":
-                return self._query_symbol(session, plant)
-            elif q_type == "medicinal":
-                return self._query_medicinal(session, plant)
-            elif q_type == "distribution":
-                return self._query_distribution(session, plant)
-            elif q_type == "folk":
-                return self._query_folk(session, plant)
-            elif q_type == "festival":
-                return self._query_festival(session, plant)
-            elif q_type == "literature":
-                return self._query_literature(session, plant)
-            elif q_type == "taxonomy":
-                return self._query_taxonomy(session, plant)
-            else:
-                return self._query_basic(session, plant)
+        return self.answer_intent(plant, self.identify_intent(question))
+
+    def answer_intent(self, plant: str, q_type: str) -> str:
+        """按问题类型（INTENTS 之一）回答指定植物"""
+        entry = self.repo.get_plant(plant) or {}
+        formatter = getattr(self, f"_format_{q_type}", self._format_basic)
+        return formatter(plant, entry)
+
+    def answer_comparison(self, plants: List[str], q_type: str) -> str:
+        """
+        多植物对比：一次批量查询取回全部植物（Neo4j 为一条 UNWIND 查询，缓存命中的植物不再查询），
+        按问题类型生成对比表；耗时不随植物数增加而成倍增长
+        """
+        icon, title, columns = self.COMPARE_COLUMNS.get(q_type, self.COMPARE_COLUMNS["basic"])
+        entries = {e["name"]: e for e in self.repo.get_many(plants)}
+        lines = [
+            f"{icon} {'、'.join(plants)}的{title}对比：",
+            "",
+            "| 植物 | " + " | ".join(name for name, _ in columns) + " |",
+            "| --- |" + " --- |" * len(columns),
+        ]
+        for plant in plants:
+            entry = entries.get(plant)
+            cells = [value_of(entry) if entry else None for _, value_of in columns]
+            cells = [str(c).replace("|", "／").replace("\n", " ") if c else "暂缺" for c in cells]
+            lines.append(f"| {plant} | " + " | ".join(cells) + " |")
+        return "\n".join(lines)
 
     # ------------------------------------------------------------
     # 问题类型识别
     # ------------------------------------------------------------
-    def _identify_question_type(self, question: str) -> str:
+    def identify_intent(self, question: str) -> str:
         q = question.lower()
-        if any(k in q for k in ["象征", "寓意", "代表", "含义", "文化"]):
-            return "symbol"
-        elif any(k in q for k in ["药用", "功效", "药效", "治疗", "治病"]):
-            return "medicinal"
-        elif any(k in q for k in ["分布", "哪里", "在哪", "产地", "生长"]):
-            return "distribution"
-        elif any(k in q for k in ["民俗", "用途", "使用", "怎么用"]):
-            return "folk"
-        elif any(k in q for k in ["节日", "端午", "春节", "重阳", "中秋", "清明"]):
-            return "festival"
-        elif any(k in q for k in ["文献", "记载", "诗经", "楚辞", "诗词"]):
-            return "literature"
-        elif any(k in q for k in ["科", "属", "分类"]):
-            return "taxonomy"
-        else:
-            return "basic"
+        for intent, keywords in self.INTENT_KEYWORDS:
+            if any(k in q for k in keywords):
+                return intent
+        return "basic"
 
     # ------------------------------------------------------------
-    # 具体查询方法（每个方法返回可直接显示的字符串）
+    # 各问题类型的回答格式（entry 为植物节点属性与关联实体，来自图数据库或本地快照）
     # ------------------------------------------------------------
-    def _query_symbol(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})-[:HAS_SYMBOL]->(s:Symbol)
-            RETURN collect(s.meaning) as symbols
-        """, name=plant)
-        record = result.single()
-        if record and record['symbols']:
-            return f"🌿 {plant}的文化象征：\n" + "、".join(record['symbols'])
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.cultural_symbol as symbol
-        """, name=plant)
-        record = result.single()
-        if record and record['symbol']:
-            return f"🌿 {plant}的文化象征：\n{record['symbol']}"
+    def _format_symbol(self, plant: str, entry: dict) -> str:
+        if entry.get('symbols'):
+            return f"🌿 {plant}的文化象征：\n" + "、".join(entry['symbols'])
+        if entry.get('cultural_symbol'):
+            return f"🌿 {plant}的文化象征：\n{entry['cultural_symbol']}"
         return f"🌿 {plant}的文化象征信息暂缺。"
 
-    def _query_medicinal(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})-[:HAS_MEDICINAL]->(m:Medicinal)
-            RETURN collect(m.effect) as effects
-        """, name=plant)
-        record = result.single()
-        if record and record['effects']:
-            return f"💊 {plant}的药用价值：\n" + "、".join(record['effects'])
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.medicinal_value as med
-        """, name=plant)
-        record = result.single()
-        if record and record['med'] and record['med'] != '无药用记载':
-            return f"💊 {plant}的药用价值：\n{record['med']}"
+    def _format_medicinal(self, plant: str, entry: dict) -> str:
+        if entry.get('medicinal'):
+            return f"💊 {plant}的药用价值：\n" + "、".join(entry['medicinal'])
+        med = entry.get('medicinal_value')
+        if med and med != '无药用记载':
+            return f"💊 {plant}的药用价值：\n{med}"
         return f"💊 {plant}的药用价值信息暂缺。"
 
-    def _query_distribution(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.distribution as dist
-        """, name=plant)
-        record = result.single()
-        if record and record['dist']:
-            return f"🗺️ {plant}的分布区域：\n{record['dist']}"
+    def _format_distribution(self, plant: str, entry: dict) -> str:
+        if entry.get('distribution'):
+            return f"🗺️ {plant}的分布区域：\n{entry['distribution']}"
         return f"🗺️ {plant}的分布信息暂缺。"
 
-    def _query_folk(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.folk_use as folk
-        """, name=plant)
-        record = result.single()
-        if record and record['folk']:
-            return f"🏮 {plant}的民俗用途：\n{record['folk']}"
+    def _format_folk(self, plant: str, entry: dict) -> str:
+        if entry.get('folk_use'):
+            return f"🏮 {plant}的民俗用途：\n{entry['folk_use']}"
         return f"🏮 {plant}的民俗用途信息暂缺。"
 
-    def _query_festival(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})-[:RELATED_TO_FESTIVAL]->(f:Festival)
-            RETURN collect(f.name) as festivals
-        """, name=plant)
-        record = result.single()
-        if record and record['festivals']:
-            return f"🎉 {plant}相关的节日：\n" + "、".join(record['festivals'])
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.festival as festival
-        """, name=plant)
-        record = result.single()
-        if record and record['festival']:
-            return f"🎉 {plant}相关的节日：\n{record['festival']}"
+    def _format_festival(self, plant: str, entry: dict) -> str:
+        if entry.get('festivals'):
+            return f"🎉 {plant}相关的节日：\n" + "、".join(entry['festivals'])
+        if entry.get('festival'):
+            return f"🎉 {plant}相关的节日：\n{entry['festival']}"
         return f"🎉 {plant}的节日信息暂缺。"
 
-    def _query_literature(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})-[:RECORDED_IN]->(l:Literature)
-            RETURN collect(l.name) as literatures
-        """, name=plant)
-        record = result.single()
-        if record and record['literatures']:
-            return f"📖 {plant}的文献记载：\n" + "、".join(record['literatures'])
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.literature_source as lit
-        """, name=plant)
-        record = result.single()
-        if record and record['lit']:
-            return f"📖 {plant}的文献出处：\n{record['lit']}"
+    def _format_literature(self, plant: str, entry: dict) -> str:
+        if entry.get('literature'):
+            return f"📖 {plant}的文献记载：\n" + "、".join(entry['literature'])
+        if entry.get('literature_source'):
+            return f"📖 {plant}的文献出处：\n{entry['literature_source']}"
         return f"📖 {plant}的文献信息暂缺。"
 
-    def _query_taxonomy(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.latin_name as latin, p.family as family, p.genus as genus
-        """, name=plant)
-        record = result.single()
-        if record:
-            return f"🌱 {plant}（{record['latin']}）\n🏷️ 科：{record['family']}  属：{record['genus']}"
+    def _format_taxonomy(self, plant: str, entry: dict) -> str:
+        if entry:
+            return f"🌱 {plant}（{entry.get('latin_name')}）\n🏷️ 科：{entry.get('family')}  属：{entry.get('genus')}"
         return f"🌱 {plant}的科属信息暂缺。"
 
-    def _query_basic(self, session, plant: str) -> str:
-        result = session.run("""
-            MATCH (p:Plant {name: $name})
-            RETURN p.latin_name as latin, p.family as family, p.genus as genus,
-                   p.distribution as dist, p.cultural_symbol as symbol
-        """, name=plant)
-        record = result.single()
-        if record:
-            info = f"🌿 {plant}（{record['latin']}）\n"
-            info += f"🏷️ 科：{record['family']}  属：{record['genus']}\n"
-            if record['dist']:
-                info += f"🗺️ 分布：{record['dist']}\n"
-            if record['symbol']:
-                info += f"✨ 文化象征：{record['symbol']}"
+    def _format_basic(self, plant: str, entry: dict) -> str:
+        if entry:
+            info = f"🌿 {plant}（{entry.get('latin_name')}）\n"
+            info += f"🏷️ 科：{entry.get('family')}  属：{entry.get('genus')}\n"
+            if entry.get('distribution'):
+                info += f"🗺️ 分布：{entry['distribution']}\n"
+            if entry.get('cultural_symbol'):
+                info += f"✨ 文化象征：{entry['cultural_symbol']}"
             return info
         return f"🌿 {plant} 的信息暂缺。"
 
@@ -244,86 +344,47 @@ class PlantQASystem:
     # 通用问题（不包含具体植物）
     # ------------------------------------------------------------
     def _handle_general_question(self, question: str) -> str:
+        return self.answer_general(question) or "❓ 请明确指定植物名称（如：兰有什么文化象征？）"
+
+    def answer_general(self, question: str) -> Optional[str]:
+        """植物列表、节日 / 文献 -> 植物等可直接查询的通用问题；其他问题返回 None"""
         q = question.lower()
         if any(k in q for k in ["所有植物", "有哪些植物", "植物列表"]):
-            plants_str = "、".join(self.plant_names)
-            return f"📚 知识库中共有 {len(self.plant_names)} 种植物：\n{plants_str}"
-        elif "端午" in q:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (p:Plant)-[:RELATED_TO_FESTIVAL]->(f:Festival)
-                    WHERE f.name CONTAINS '端午'
-                    RETURN p.name as name
-                """)
-                plants = [r['name'] for r in result]
-                if plants:
-                    return f"🎋 端午节相关植物：{ '、'.join(plants) }"
-                else:
-                    return "🎋 端午节相关植物：艾、菖蒲、蒜"
-        elif "春节" in q:
-            return "🧧 春节相关植物：橘、桃、水仙"
-        elif "重阳" in q:
-            return "🏔️ 重阳节相关植物：菊、茱萸"
-        elif "中秋" in q:
-            return "🌕 中秋节相关植物：桂"
-        elif "清明" in q:
-            return "🌧️ 清明节相关植物：柳、杜鹃、柏"
-        elif "楚辞" in q or "诗经" in q:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (p:Plant)-[:RECORDED_IN]->(l:Literature)
-                    WHERE l.name CONTAINS '楚辞' OR l.name CONTAINS '诗经'
-                    RETURN p.name as name
-                """)
-                plants = [r['name'] for r in result]
-                if plants:
-                    return f"📜 《楚辞》《诗经》中记载的植物：{ '、'.join(plants[:10]) }……"
-        return "❓ 请明确指定植物名称（如：兰有什么文化象征？）"
+            names = self.plant_names
+            return f"📚 知识库中共有 {len(names)} 种植物：\n{'、'.join(names)}"
+        for keyword, (festival, icon, fallback) in self.FESTIVAL_KEYWORDS.items():
+            if keyword in q:
+                plants = self._plants_by_festival(festival)
+                return f"{icon} {festival}相关植物：{ '、'.join(plants) if plants else fallback }"
+        works = [w for w in ["楚辞", "诗经"] if w in q]
+        if works:
+            plants = self._plants_by_literature(works)
+            if plants:
+                titles = "".join(f"《{w}》" for w in works)
+                return f"📜 {titles}中记载的植物：{ '、'.join(plants[:10]) }……"
+        return None
+
+    # ------------------------------------------------------------
+    # 反向查询：节日 / 文献 -> 植物
+    # ------------------------------------------------------------
+    def _plants_by_festival(self, festival: str) -> List[str]:
+        return self.repo.reverse_lookup("festival", festival)
+
+    def _plants_by_literature(self, works: List[str]) -> List[str]:
+        return sorted({name for work in works for name in self.repo.reverse_lookup("literature", work)})
 
     # ------------------------------------------------------------
     # 对外接口：获取植物的完整详细信息（用于侧边栏展示）
     # ------------------------------------------------------------
-    def get_plant_detail(self, plant_name: str) -> dict:
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Plant {name: $name})
-                OPTIONAL MATCH (p)-[:HAS_SYMBOL]->(s:Symbol)
-                OPTIONAL MATCH (p)-[:HAS_MEDICINAL]->(m:Medicinal)
-                OPTIONAL MATCH (p)-[:RECORDED_IN]->(l:Literature)
-                OPTIONAL MATCH (p)-[:RELATED_TO_FESTIVAL]->(f:Festival)
-                RETURN p.name as name,
-                       p.latin_name as latin_name,
-                       p.family as family,
-                       p.genus as genus,
-                       p.distribution as distribution,
-                       p.folk_use as folk_use,
-                       p.ecological_meaning as ecological,
-                       p.cultural_symbol as cultural_symbol,
-                       collect(DISTINCT s.meaning) as symbols,
-                       collect(DISTINCT m.effect) as medicinal,
-                       collect(DISTINCT l.name) as literature,
-                       collect(DISTINCT f.name) as festivals
-            """, name=plant_name)
-            record = result.single()
-            if record:
-                return {
-                    "name": record["name"],
-                    "latin": record["latin_name"],
-                    "family": record["family"],
-                    "genus": record["genus"],
-                    "distribution": record["distribution"] or "暂无分布信息",
-                    "folk_use": record["folk_use"] or "暂无民俗用途",
-                    "ecological": record["ecological"] or "暂无生态意义",
-                    "cultural_symbol": record["cultural_symbol"] or "暂无文化象征",
-                    "symbols": record["symbols"],
-                    "medicinal": record["medicinal"],
-                    "literature": record["literature"],
-                    "festivals": record["festivals"]
-                }
-            return None
+    def get_plant_detail(self, plant_name: str) -> Optional[dict]:
+        return entry_to_detail(self.repo.get_plant(plant_name))
+
+    def get_plant_details(self, plant_names: List[str]) -> List[dict]:
+        """批量获取植物详情（缓存未命中的植物一次批量查询），按传入顺序返回，未收录的植物跳过"""
+        return [entry_to_detail(e) for e in self.repo.get_many(plant_names)]
 
     def close(self):
-        self.driver.close()
+        self.repo.close()
 
 def test():
     qa = PlantQASystem()
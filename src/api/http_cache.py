@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+只读接口的 HTTP 条件缓存与快速 JSON 序列化
+- ETag / Last-Modified 由知识库数据版本生成，数据不变则标签不变
+- 客户端携带 If-None-Match（或 If-Modified-Since）命中时直接返回 304，不查库、不序列化
+- Cache-Control 允许客户端与 CDN 缓存，过期后带标签回源校验
+- 优先使用 orjson 序列化，未安装时退回标准库 json
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+# 只读接口默认缓存策略：5 分钟内直接使用缓存，之后 1 天内可先用旧数据再后台校验
+DEFAULT_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+# 已序列化响应体的缓存条数（按 ETag 索引）
+BODY_CACHE_SIZE = 512
+
+
+def dumps(payload: Any) -> bytes:
+    """序列化响应体；两种实现都把无法直接序列化的值（Decimal、Neo4j 时间类型、集合等）转为字符串"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """默认 JSON 响应类：orjson 序列化，保留中文不转义"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def make_etag(version: str, *parts: str) -> str:
+    """弱 ETag：数据版本 + 资源标识（响应会被 gzip 压缩，因此使用弱校验）"""
+    resource = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:12]
+    return f'W/"{version}-{resource}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # 比较时忽略弱校验前缀
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP 日期精确到秒
+    return int(last_modified) <= int(since)
+
+
+class _BodyCache:
+    """按 ETag 缓存已序列化的响应体，重复请求不再重复构造与序列化
+    同步接口在线程池中执行，读写与淘汰都在锁内完成（否则 get 的 move_to_end 可能遇到刚被淘汰的键）
+    """
+
+    def __init__(self, size: int = BODY_CACHE_SIZE):
+        self.size = size
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(etag)
+            if body is not None:
+                self._items.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: bytes):
+        with self._lock:
+            self._items[etag] = body
+            self._items.move_to_end(etag)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+_body_cache = _BodyCache()
+
+
+def cached_response(request: Request, version: str, last_modified: float,
+                    build_payload: Callable[[], Any], *resource: str,
+                    cache_control: str = DEFAULT_CACHE_CONTROL) -> Response:
+    """
+    条件响应：ETag 只依赖数据版本与资源标识，命中 304 时不会调用 build_payload
+    build_payload 返回接口统一格式 {"code", "data", "msg"}，只有 code == 200 的响应会被缓存
+    """
+    etag = make_etag(version, request.url.path, *resource)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _not_modified_since(if_modified_since, last_modified):
+            return Response(status_code=304, headers=headers)
+
+    body = _body_cache.get(etag)
+    if body is None:
+        payload = build_payload()
+        body = dumps(payload)
+        if payload.get("code") != 200:
+            return Response(content=body, media_type="application/json",
+                            headers={"Cache-Control": "no-store"})
+        _body_cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
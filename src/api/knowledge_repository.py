@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""
+知识库仓库：三个前端（Streamlit 页面、PlantQASystem、LangChainPlantQA）共用的植物数据读取接口
+    get_plant(name)             单株植物条目（支持别名）
+    get_many(names)             批量条目，按传入顺序返回，未收录的跳过
+    list_names()                全部标准植物名（排序）
+    reverse_lookup(kind, value) 反向查询：节日 / 文献书名 / 文化象征 / 药用 / 科 -> 植物名
+    version()                   数据版本（内容变化则变化）
+条目使用图谱词汇（见 plant_schema.ENTRY_RELATIONS）：Plant 节点属性 + symbols/medicinal/literature/festivals 列表。
+
+后端：
+    InMemoryRepository  内存条目（本地图谱快照、测试数据）
+    ExcelRepository     Excel 生成的紧凑二进制存储（.jcps，mmap 只读）
+    EmbeddedRepository  嵌入式图引擎（CSR 邻接，Excel 或图谱快照加载，无需 Neo4j）
+    Neo4jRepository     图数据库（经熔断器保护，不可用时降级到本地图谱快照）
+前端统一通过 create_repository() 获取，外层的 CachingRepository 负责别名解析、按数据版本失效的 LRU 缓存与批量合并。
+"""
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.api.circuit_breaker import (
+    GRAPH_FAILURE_THRESHOLD, GRAPH_FAILURES, GRAPH_RESET_TIMEOUT, GRAPH_TIMEOUT, CircuitBreaker, CircuitOpenError,
+    run_graph
+)
+from src.api.deadline import cap_timeout, raise_if_expired
+from src.api.fuzzy_match import name_variants
+from src.database.embedded_graph import EmbeddedGraph
+from src.database.graph_snapshot import (
+    PLANT_GRAPH_PROJECTION, SNAPSHOT_PATH, GraphSnapshot, SnapshotReader, graph_entry
+)
+from src.database.plant_schema import (
+    ENTRY_RELATIONS, PLANT_ALIASES, content_hash, literature_work, record_to_entry
+)
+
+logger = logging.getLogger(__name__)
+
+# 数据后端：neo4j / excel / snapshot / embedded（可由各前端指定默认值）
+KNOWLEDGE_BACKEND = os.environ.get("KNOWLEDGE_BACKEND", "")
+# 嵌入式图引擎的数据来源：excel（Excel 数据）/ snapshot（Neo4j 导出的本地图谱快照）
+EMBEDDED_GRAPH_SOURCE = os.environ.get("EMBEDDED_GRAPH_SOURCE", "excel")
+# 缓存条目数、数据版本检查间隔（秒）
+REPOSITORY_CACHE_SIZE = int(os.environ.get("REPOSITORY_CACHE_SIZE", "4096"))
+VERSION_CHECK_INTERVAL = float(os.environ.get("VERSION_CHECK_INTERVAL", "5"))
+
+# 反向查询类型 -> 条目中的取值（文献按书名查询）
+REVERSE_KINDS = {
+    "festival": lambda entry: entry.get("festivals") or [],
+    "literature": lambda entry: [literature_work(l) for l in entry.get("literature") or []],
+    "symbol": lambda entry: entry.get("symbols") or [],
+    "medicinal": lambda entry: entry.get("medicinal") or [],
+    "family": lambda entry: [entry["family"]] if entry.get("family") else [],
+}
+
+
+def resolve_aliases(aliases: Dict[str, str], names: Iterable[str]) -> Dict[str, str]:
+    """
+    别名表按实际植物名解析：目标名不在知识库中时按括号变体匹配（“荷” -> “荷（莲）”），
+    同时为带括号的植物名补充变体别名（“荷”“莲” -> “荷（莲）”）；无法解析的别名丢弃
+    """
+    names = list(names)
+    known = set(names)
+    variants = {}
+    for name in names:
+        for variant in name_variants(name)[1:]:
+            if variant not in known:
+                variants.setdefault(variant, name)
+    resolved = dict(variants)
+    for alias, target in aliases.items():
+        target = target if target in known else variants.get(target)
+        if target and alias not in known:
+            resolved[alias] = target
+    return resolved
+
+
+class KnowledgeRepository(ABC):
+    """
+    仓库接口；后端只需处理标准植物名，别名解析与缓存由 CachingRepository 完成
+    四个抽象方法缺一不可：漏实现的后端在实例化时即报 TypeError，而不是等到第一次查询
+    """
+    # 本地后端加载时读取的数据文件（文件更新后需重新创建仓库）；Neo4j 后端为 None，数据变化由版本号反映
+    source_path: Optional[str] = None
+
+    @abstractmethod
+    def version(self) -> str:
+        """数据版本：数据变化时改变（用作缓存失效与 ETag 的依据）"""
+
+    @abstractmethod
+    def list_names(self) -> List[str]:
+        """全部标准植物名"""
+
+    @abstractmethod
+    def get_many(self, names: List[str]) -> List[dict]:
+        """按标准植物名批量取条目，按传入顺序返回，未收录的植物跳过"""
+
+    @abstractmethod
+    def reverse_lookup(self, kind: str, value: str) -> List[str]:
+        """反向查询：kind 为 REVERSE_KINDS 中的关系类型（节日、文献、象征等），返回关联到 value 的植物名"""
+
+    def get_plant(self, name: str) -> Optional[dict]:
+        found = self.get_many([name])
+        return found[0] if found else None
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# 内存 / Excel 后端
+# ============================================================
+class InMemoryRepository(KnowledgeRepository):
+    """条目全部在内存中；反向索引在构建时一次生成"""
+
+    def __init__(self, entries: Dict[str, dict], version: Optional[str] = None):
+        self._entries = entries
+        self._names = sorted(entries)
+        self._version = version or content_hash(entries)
+        self._reverse: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in REVERSE_KINDS}
+        for name in self._names:
+            self._index_entry(name, entries[name])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, str]], version: Optional[str] = None):
+        """标准字段记录（Excel 读取结果）构建"""
+        entries = {}
+        for record in records:
+            entries[record["name"]] = record_to_entry(record)
+        return cls(entries, version)
+
+    @classmethod
+    def from_graph_snapshot(cls, snapshot: GraphSnapshot):
+        version = f"snapshot-{snapshot.data_version}" if snapshot.data_version is not None else None
+        return cls(snapshot.plants, version)
+
+    def _index_entry(self, name: str, entry: dict):
+        for kind, values_of in REVERSE_KINDS.items():
+            for value in dict.fromkeys(values_of(entry)):
+                self._reverse[kind].setdefault(value, []).append(name)
+
+    def version(self) -> str:
+        return self._version
+
+    def list_names(self) -> List[str]:
+        return list(self._names)
+
+    def get_many(self, names: List[str]) -> List[dict]:
+        return [self._entries[n] for n in names if n in self._entries]
+
+    def reverse_lookup(self, kind: str, value: str) -> List[str]:
+        return list(self._reverse[kind].get(value, []))
+
+
+class ExcelRepository(InMemoryRepository):
+    """
+    Excel 数据后端：读取由 Excel 生成的 .jcps 存储（Excel 更新后自动重建）
+    条目在首次访问时由存储记录转换并缓存，反向索引构建时只保存植物名
+    """
+
+    def __init__(self, excel_path: str, store_path: str):
+        from src.database.excel_ingest import iter_excel_records
+        from src.database.plant_schema import FIELDS
+        from src.database.plant_store import open_store
+        self.store = open_store(store_path, excel_path, lambda: iter_excel_records(excel_path), FIELDS)
+        self._entries = {}
+        self._names = self.store.names()
+        self._version = f"excel-{self.store.version}"
+        self._reverse = {kind: {} for kind in REVERSE_KINDS}
+        for record in self.store:
+            self._index_entry(record["name"], record_to_entry(record.to_dict()))
+
+    def get_many(self, names: List[str]) -> List[dict]:
+        found = []
+        for name in names:
+            entry = self._entries.get(name)
+            if entry is None:
+                record = self.store.get(name)
+                if record is None:
+                    continue
+                entry = self._entries[name] = record_to_entry(record.to_dict())
+            found.append(entry)
+        return found
+
+    def close(self):
+        self.store.close()
+
+
+# ============================================================
+# 嵌入式图引擎后端
+# ============================================================
+class EmbeddedRepository(KnowledgeRepository):
+    """进程内图引擎：按名称取植物与正向/反向遍历都是数组切片（微秒级），见 embedded_graph"""
+
+    def __init__(self, graph: EmbeddedGraph):
+        self.graph = graph
+        self._version = graph.version or content_hash({n: graph.entry(n) for n in graph.plant_names})
+
+    @classmethod
+    def from_excel(cls, excel_path: str, store_path: str):
+        """经 .jcps 存储读取 Excel 数据（Excel 未变化时不重新解析）"""
+        from src.database.excel_ingest import iter_excel_records
+        from src.database.plant_schema import FIELDS
+        from src.database.plant_store import open_store
+        store = open_store(store_path, excel_path, lambda: iter_excel_records(excel_path), FIELDS)
+        try:
+            return cls(EmbeddedGraph.from_records((r.to_dict() for r in store), f"embedded-{store.version}"))
+        finally:
+            store.close()
+
+    def version(self) -> str:
+        return self._version
+
+    def list_names(self) -> List[str]:
+        return list(self.graph.plant_names)
+
+    def get_many(self, names: List[str]) -> List[dict]:
+        found = []
+        for name in names:
+            entry = self.graph.entry(name)
+            if entry is not None:
+                found.append(entry)
+        return found
+
+    def reverse_lookup(self, kind: str, value: str) -> List[str]:
+        return self.graph.plants_by(kind, value)
+
+
+# ============================================================
+# Neo4j 后端（熔断 + 本地图谱快照降级）
+# ============================================================
+PLANTS_BY_NAMES_QUERY = f"""
+    UNWIND $names AS plant_name
+    MATCH (p:Plant {{name: plant_name}})
+    RETURN {PLANT_GRAPH_PROJECTION}
+"""
+
+# 反向查询：按实体节点主键索引定位，再沿关系遍历
+REVERSE_QUERIES = {
+    "festival": "MATCH (:Festival {name: $value})<-[:RELATED_TO_FESTIVAL]-(p:Plant)",
+    "literature": "MATCH (l:Literature) WHERE l.work = $value MATCH (p:Plant)-[:RECORDED_IN]->(l)",
+    "symbol": "MATCH (:Symbol {meaning: $value})<-[:HAS_SYMBOL]-(p:Plant)",
+    "medicinal": "MATCH (:Medicinal {effect: $value})<-[:HAS_MEDICINAL]-(p:Plant)",
+    "family": "MATCH (p:Plant {family: $value})",
+}
+
+
+class Neo4jRepository(KnowledgeRepository):
+    """
+    图数据库后端：每次调用一个会话、一条查询（批量详情为一次 UNWIND）
+    所有查询经熔断器；熔断打开或查询失败时改用本地图谱快照（每次导入后刷新），两者都不可用时抛出原异常
+    """
+
+    def __init__(self, driver, snapshots: Optional[SnapshotReader] = None):
+        self.driver = driver
+        self.snapshots = snapshots or SnapshotReader()
+        self.breaker = CircuitBreaker(
+            "Neo4j", GRAPH_FAILURE_THRESHOLD, GRAPH_RESET_TIMEOUT,
+            probe=driver.verify_connectivity, failure_types=GRAPH_FAILURES
+        )
+        self._fallback: Optional[InMemoryRepository] = None
+        self._fallback_source: Optional[GraphSnapshot] = None
+        # 启动时连不上直接熔断：首批请求走快照，不必逐个等待超时
+        try:
+            driver.verify_connectivity()
+        except GRAPH_FAILURES as e:
+            logger.warning(f"⚠️ Neo4j 连接失败（使用本地图谱快照，后台自动重连）：{str(e)[:100]}")
+            self.breaker.trip()
+
+    def _snapshot_repository(self) -> Optional[InMemoryRepository]:
+        snapshot = self.snapshots.get()
+        if snapshot is None:
+            return None
+        if snapshot is not self._fallback_source:
+            self._fallback = InMemoryRepository.from_graph_snapshot(snapshot)
+            self._fallback_source = snapshot
+        return self._fallback
+
+    def _run(self, query: str, **params) -> list:
+        from neo4j import Query
+        # 事务超时按请求剩余时间收紧（Neo4j 中 0 表示不限时，因此至少 1 毫秒）
+        timeout = max(cap_timeout(GRAPH_TIMEOUT, "graph"), 0.001)
+
+        def work():
+            with self.driver.session() as session:
+                return list(session.run(Query(query, timeout=timeout), **params))
+        try:
+            return run_graph(work)
+        except GRAPH_FAILURES:
+            # 因请求时限到期而超时不算 Neo4j 故障：改为 DeadlineExceeded，不计入熔断、不降级
+            raise_if_expired("graph")
+            raise
+
+    def _call(self, method: str, query: str, convert: Callable[[list], object], *args, **params):
+        try:
+            return convert(self.breaker.call(self._run, query, **params))
+        except (CircuitOpenError,) + GRAPH_FAILURES:
+            fallback = self._snapshot_repository()
+            if fallback is None:
+                raise
+            return getattr(fallback, method)(*args)
+
+    def version(self) -> str:
+        return self._call(
+            "version", "MATCH (v:DataVersion {key: 'plants'}) RETURN v.version AS version",
+            lambda rows: f"neo4j-{rows[0]['version'] if rows else 0}"
+        )
+
+    def list_names(self) -> List[str]:
+        return self._call("list_names", "MATCH (p:Plant) RETURN p.name AS name ORDER BY name",
+                          lambda rows: [r["name"] for r in rows])
+
+    def get_many(self, names: List[str]) -> List[dict]:
+        def convert(rows):
+            entries = {}
+            for row in rows:
+                entry = graph_entry(row)
+                entries[entry["name"]] = entry
+            return [entries[n] for n in names if n in entries]
+        return self._call("get_many", PLANTS_BY_NAMES_QUERY, convert, names, names=list(names))
+
+    def reverse_lookup(self, kind: str, value: str) -> List[str]:
+        query = REVERSE_QUERIES[kind] + " RETURN DISTINCT p.name AS name ORDER BY name"
+        return self._call("reverse_lookup", query, lambda rows: [r["name"] for r in rows], kind, value,
+                          value=value)
+
+    def close(self):
+        self.driver.close()
+
+
+# ============================================================
+# 缓存层（所有前端共用）
+# ============================================================
+_MISSING = object()
+
+
+class CachingRepository(KnowledgeRepository):
+    """
+    前端统一入口：
+    - 别名解析（统一别名表 PLANT_ALIASES，按实际植物名解析）
+    - 条目 / 反向查询 LRU 缓存，数据版本变化时整体失效（版本每 VERSION_CHECK_INTERVAL 秒检查一次）
+    - get_many 只向后端请求未命中的名称，一次批量查询
+    - 命中 / 未命中按线程计数（thread_counters），调用方可据此判断一次请求是否完全命中缓存
+    """
+
+    def __init__(self, backend: KnowledgeRepository, size: int = REPOSITORY_CACHE_SIZE,
+                 check_interval: float = VERSION_CHECK_INTERVAL, aliases: Optional[Dict[str, str]] = None):
+        self.backend = backend
+        self.size = size
+        self.check_interval = check_interval
+        self.alias_source = dict(PLANT_ALIASES if aliases is None else aliases)
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._local = threading.local()
+        self._reset()
+
+    def _count(self, hits: int, misses: int):
+        self._local.hits = getattr(self._local, "hits", 0) + hits
+        self._local.misses = getattr(self._local, "misses", 0) + misses
+
+    def thread_counters(self) -> tuple:
+        """当前线程累计的 (命中数, 未命中数)"""
+        return getattr(self._local, "hits", 0), getattr(self._local, "misses", 0)
+
+    def _reset(self):
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+        self._reverse: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        self._names: Optional[List[str]] = None
+        self._aliases: Optional[Dict[str, str]] = None
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval and self._version is not None:
+            return
+        version = self.backend.version()
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                self._version = version
+                self._reset()
+
+    def _put(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.size:
+            cache.popitem(last=False)
+
+    # ---------- 接口 ----------
+    def version(self) -> str:
+        self._check_version()
+        return self._version
+
+    def list_names(self) -> List[str]:
+        self._check_version()
+        if self._names is None:
+            self._names = self.backend.list_names()
+        return list(self._names)
+
+    @property
+    def aliases(self) -> Dict[str, str]:
+        """别名 -> 标准植物名（已按当前数据解析）"""
+        names = self.list_names()
+        if self._aliases is None:
+            self._aliases = resolve_aliases(self.alias_source, names)
+        return self._aliases
+
+    def resolve(self, name: str) -> str:
+        name = (name or "").strip()
+        return self.aliases.get(name, name)
+
+    def get_many(self, names: List[str]) -> List[dict]:
+        self._check_version()
+        resolved = [self.resolve(n) for n in names]
+        with self._lock:
+            cached = {}
+            for name in resolved:
+                value = self._entries.get(name, None)
+                if value is not None:
+                    self._entries.move_to_end(name)
+                    cached[name] = value
+        misses = [n for n in dict.fromkeys(resolved) if n not in cached]
+        self._count(len(resolved) - len(misses), len(misses))
+        if misses:
+            found = {e["name"]: e for e in self.backend.get_many(misses)}
+            with self._lock:
+                for name in misses:
+                    cached[name] = found.get(name, _MISSING)
+                    self._put(self._entries, name, cached[name])
+        return [cached[n] for n in resolved if cached[n] is not _MISSING]
+
+    def reverse_lookup(self, kind: str, value: str) -> List[str]:
+        if kind not in REVERSE_KINDS:
+            raise ValueError(f"不支持的反向查询类型：{kind}")
+        self._check_version()
+        key = (kind, value)
+        with self._lock:
+            names = self._reverse.get(key)
+            if names is not None:
+                self._reverse.move_to_end(key)
+                self._count(1, 0)
+                return list(names)
+        self._count(0, 1)
+        names = self.backend.reverse_lookup(kind, value)
+        with self._lock:
+            self._put(self._reverse, key, names)
+        return list(names)
+
+    @property
+    def source_path(self) -> Optional[str]:
+        return self.backend.source_path
+
+    def close(self):
+        self.backend.close()
+
+
+# ============================================================
+# 工厂
+# ============================================================
+def _neo4j_driver(pool_size: Optional[int] = None, uri: str = None, user: str = None, password: str = None):
+    """按参数或环境变量创建驱动；配置不全时返回 None"""
+    uri = uri or os.environ.get("NEO4J_URI", "")
+    user = user or os.environ.get("NEO4J_USER", "")
+    password = password or os.environ.get("NEO4J_PASSWORD", "")
+    if not all([uri, user, password]):
+        return None
+    from neo4j import GraphDatabase
+    config = {"connection_timeout": GRAPH_TIMEOUT, "connection_acquisition_timeout": GRAPH_TIMEOUT}
+    if pool_size:
+        config["max_connection_pool_size"] = pool_size
+    return GraphDatabase.driver(uri, auth=(user, password), **config)
+
+
+def create_repository(backend: str = None, default: str = "neo4j", *, excel_path: str = None,
+                      store_path: str = None, driver=None, pool_size: Optional[int] = None,
+                      uri: str = None, user: str = None, password: str = None) -> CachingRepository:
+    """
+    按配置创建带缓存的仓库：backend 参数 > 环境变量 KNOWLEDGE_BACKEND > default
+    neo4j 配置不全时退回本地图谱快照（snapshot）；embedded 的数据来源由 EMBEDDED_GRAPH_SOURCE 指定
+    """
+    backend = (backend or KNOWLEDGE_BACKEND or default).lower()
+    if backend == "neo4j":
+        driver = driver or _neo4j_driver(pool_size, uri, user, password)
+        if driver is not None:
+            return CachingRepository(Neo4jRepository(driver))
+        backend = "snapshot"
+    from src.database.excel_ingest import DEFAULT_EXCEL_PATH, DEFAULT_STORE_PATH
+    excel_path = excel_path or DEFAULT_EXCEL_PATH
+    store_path = store_path or DEFAULT_STORE_PATH
+    if backend == "excel":
+        repo = ExcelRepository(excel_path, store_path)
+        repo.source_path = excel_path
+        return CachingRepository(repo)
+    if backend == "snapshot":
+        snapshot = GraphSnapshot.load()
+        repo = InMemoryRepository.from_graph_snapshot(snapshot) if snapshot else InMemoryRepository({}, "empty")
+        repo.source_path = SNAPSHOT_PATH
+        return CachingRepository(repo)
+    if backend == "embedded":
+        if EMBEDDED_GRAPH_SOURCE == "snapshot":
+            snapshot = GraphSnapshot.load()
+            if snapshot is None:
+                raise FileNotFoundError("未找到本地图谱快照，请先运行 neo4j_import 或改用 EMBEDDED_GRAPH_SOURCE=excel")
+            repo = EmbeddedRepository(EmbeddedGraph.from_graph_snapshot(snapshot))
+            repo.source_path = SNAPSHOT_PATH
+        else:
+            repo = EmbeddedRepository.from_excel(excel_path, store_path)
+            repo.source_path = excel_path
+        return CachingRepository(repo)
+    raise ValueError(f"未知的知识库后端：{backend}（可选 neo4j / excel / snapshot / embedded）")
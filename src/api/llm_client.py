@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+共享大模型客户端（Streamlit 页面与问答 API 共用）
+- 同步与异步接口：chat / achat 返回完整回答，stream 返回流式片段迭代器
+- 每个进程一个持久连接池（keep-alive，安装 h2 时启用 HTTP/2 多路复用），请求之间复用连接，不再每次 TLS 握手
+- 模型注册表：按用途取模型名（环境变量可覆盖），各前端不再各自硬编码模型
+- 每次调用可单独指定超时；未指定时使用客户端默认超时；当前请求带时限（src/api/deadline.py）时按剩余时间收紧，
+  时限到期导致的失败改为抛出 DeadlineExceeded。SDK 自带的失败重试关闭（max_retries=0）：
+  重试会在收紧后的超时之外再等待退避并重新计时，请求总耗时可达时限的数倍
+异步连接池在首次异步调用时创建，绑定到当时的事件循环（API 服务每个 worker 一个事件循环）。
+"""
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Union
+
+import httpx
+from groq import AsyncGroq, Groq
+
+from src.api.deadline import cap_timeout, raise_if_expired
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    HTTP2_AVAILABLE = True
+except ImportError:  # 未安装 h2 时使用 HTTP/1.1 keep-alive
+    HTTP2_AVAILABLE = False
+
+# ========== 模型注册表：用途 -> 模型名 ==========
+MODEL_REGISTRY: Dict[str, str] = {
+    # 植物问答（短回答、低延迟）
+    "chat": os.environ.get("LLM_MODEL_CHAT", "llama-3.1-8b-instant"),
+    # 需要更强推理的长回答
+    "large": os.environ.get("LLM_MODEL_LARGE", "llama-3.3-70b-versatile"),
+}
+DEFAULT_MODEL = "chat"
+
+# ========== 连接池与超时 ==========
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", "16"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+# 空闲连接保活时间（秒）
+LLM_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", "120"))
+
+Messages = Union[str, List[Dict[str, str]]]
+
+
+def resolve_model(model: Optional[str] = None) -> str:
+    """用途名（chat / large）-> 模型名；不在注册表中的按模型名原样使用"""
+    model = model or DEFAULT_MODEL
+    return MODEL_REGISTRY.get(model, model)
+
+
+def _messages(prompt: Messages) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+
+
+def _content(response) -> str:
+    return (response.choices[0].message.content or "").strip()
+
+
+class LLMClient:
+    """一个进程一个实例：同步与异步请求各自复用一个连接池"""
+
+    def __init__(self, api_key: str = None, pool_size: int = LLM_POOL_SIZE, timeout: float = LLM_TIMEOUT,
+                 http2: bool = HTTP2_AVAILABLE):
+        self.api_key = api_key or os.environ.get("GROQ_API_KEY")
+        if not self.api_key:
+            raise ValueError("请配置 GROQ_API_KEY 环境变量！")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http2 = http2
+        self.client = Groq(api_key=self.api_key, timeout=timeout, max_retries=0,
+                           http_client=httpx.Client(**self._pool_config()))
+        self._async_client: Optional[AsyncGroq] = None
+
+    def _pool_config(self) -> dict:
+        return {
+            "limits": httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                                   keepalive_expiry=LLM_KEEPALIVE_EXPIRY),
+            "timeout": self.timeout,
+            "http2": self.http2,
+        }
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        if self._async_client is None:
+            self._async_client = AsyncGroq(api_key=self.api_key, timeout=self.timeout, max_retries=0,
+                                           http_client=httpx.AsyncClient(**self._pool_config()))
+        return self._async_client
+
+    def _request(self, prompt: Messages, model: Optional[str], timeout: Optional[float], params: dict) -> dict:
+        params.setdefault("temperature", 0.1)
+        timeout = cap_timeout(timeout if timeout is not None else self.timeout, "llm")
+        return dict(params, messages=_messages(prompt), model=resolve_model(model), timeout=timeout)
+
+    # ---------- 同步 ----------
+    def chat(self, prompt: Messages, model: Optional[str] = None, timeout: Optional[float] = None,
+             **params) -> str:
+        """一次完整回答；prompt 为字符串（单条用户消息）或 messages 列表"""
+        request = self._request(prompt, model, timeout, params)
+        try:
+            return _content(self.client.chat.completions.create(**request))
+        except Exception:
+            raise_if_expired("llm")
+            raise
+
+    def stream(self, prompt: Messages, model: Optional[str] = None, timeout: Optional[float] = None,
+               **params) -> Iterator:
+        """流式回答：返回 SDK 的片段流（可 close() 提前中止）；片段之间的时限检查由调用方完成"""
+        request = self._request(prompt, model, timeout, params)
+        try:
+            return self.client.chat.completions.create(stream=True, **request)
+        except Exception:
+            raise_if_expired("llm")
+            raise
+
+    # ---------- 异步 ----------
+    async def achat(self, prompt: Messages, model: Optional[str] = None, timeout: Optional[float] = None,
+                    **params) -> str:
+        request = self._request(prompt, model, timeout, params)
+        try:
+            response = await self.async_client.chat.completions.create(**request)
+        except Exception:
+            raise_if_expired("llm")
+            raise
+        return _content(response)
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+        self.close()
+
+
+# ========== 进程级共享实例 ==========
+_client: Optional[LLMClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client(pool_size: Optional[int] = None) -> LLMClient:
+    """返回当前进程的共享客户端；fork 后的子进程首次调用时重新创建（连接不跨进程复用）"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = LLMClient(pool_size=pool_size or LLM_POOL_SIZE)
+            _client_pid = os.getpid()
+        return _client
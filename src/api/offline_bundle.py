@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+小程序 / PWA 离线数据包
+导出内容：全部植物详情、别名表、反向索引（节日/文献/科/文化象征 -> 植物）、问题类型关键词，
+以及每株植物 × 每种问题类型的预生成回答（与 PlantQASystem 在线回答一致）。
+客户端本地完成“识别植物 -> 判定问题类型 -> 取回答”，只有未覆盖的问题才请求服务端。
+
+数据包按内容计算版本号，以 gzip 压缩的 JSON 保存为 <版本>.json.gz，LATEST 文件记录最新版本。
+保留最近若干个历史版本，客户端携带已有版本号请求时只下发变化的植物（增量包）。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.database.plant_schema import literature_work
+
+BUNDLE_FORMAT = 1
+# 数据包目录（默认在仓库 data 目录下，与启动目录无关）与保留的历史版本数
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BUNDLE_DIR = os.environ.get("BUNDLE_DIR", os.path.join(_REPO_ROOT, "data", "bundles"))
+BUNDLE_KEEP = int(os.environ.get("BUNDLE_KEEP", "10"))
+LATEST_FILE = "LATEST"
+
+_VERSION_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+
+def _digest(payload) -> str:
+    text = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def build_reverse_indexes(details: Dict[str, dict]) -> Dict[str, Dict[str, List[str]]]:
+    """植物详情 -> {索引名: {取值: [植物名]}}，植物名按名称排序"""
+    indexes = {"festival": {}, "literature": {}, "family": {}, "symbol": {}}
+    for name in sorted(details):
+        detail = details[name]
+        keys = {
+            "festival": detail.get("festivals") or [],
+            "literature": [literature_work(l) for l in detail.get("literature") or []],
+            "family": [detail["family"]] if detail.get("family") else [],
+            "symbol": detail.get("symbols") or [],
+        }
+        for index, values in keys.items():
+            for value in dict.fromkeys(values):
+                indexes[index].setdefault(value, []).append(name)
+    return indexes
+
+
+def build_bundle(qa, alias_map: Optional[Dict[str, str]] = None) -> dict:
+    """
+    qa 为 PlantQASystem：详情一次批量查询，预生成回答逐株逐类型调用 answer_intent
+    每株植物单独计算内容哈希，增量包据此判断哪些植物发生了变化
+    """
+    names = list(qa.plant_names)
+    details = {d["name"]: d for d in qa.get_plant_details(names)}
+    answers = {name: {intent: qa.answer_intent(name, intent) for intent in qa.INTENTS} for name in details}
+    plant_hashes = {name: _digest([details[name], answers[name]]) for name in details}
+    alias_map = dict(alias_map if alias_map is not None else qa.alias_map)
+    intent_keywords = OrderedDict(qa.INTENT_KEYWORDS)
+    indexes = build_reverse_indexes(details)
+    version = _digest([BUNDLE_FORMAT, plant_hashes, alias_map, intent_keywords])
+    return {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "generated_at": time.time(),
+        "alias_map": alias_map,
+        "intent_keywords": intent_keywords,
+        "indexes": indexes,
+        "plant_hashes": plant_hashes,
+        "plants": details,
+        "answers": answers,
+    }
+
+
+def write_bundle(bundle: dict, directory: str = BUNDLE_DIR, keep: int = BUNDLE_KEEP) -> str:
+    """写入 <版本>.json.gz 并更新 LATEST（先写临时文件再替换，读取方不会看到半个文件）；返回数据包路径"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{bundle['version']}.json.gz")
+    body = json.dumps(bundle, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    for target, content in ((path, gzip.compress(body, compresslevel=9)),
+                            (os.path.join(directory, LATEST_FILE), bundle["version"].encode("ascii"))):
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+    # 只保留最近 keep 个版本
+    bundles = sorted(
+        (os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".json.gz")),
+        key=os.path.getmtime, reverse=True,
+    )
+    for old in bundles[keep:]:
+        if old != path:
+            os.remove(old)
+    return path
+
+
+class BundleStore:
+    """读取数据包目录：latest() 返回最新数据包，delta(since) 返回相对旧版本的增量包
+    缓存按 (版本, 文件修改时间) 命中，同一版本重新导出后读取新文件；接口在线程池中执行，缓存读写在锁内完成
+    """
+
+    CACHE_SIZE = 4
+
+    def __init__(self, directory: str = BUNDLE_DIR):
+        self.directory = directory
+        self._cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def latest_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, LATEST_FILE), encoding="ascii") as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return version if _VERSION_PATTERN.match(version) else None
+
+    def load(self, version: str) -> Optional[dict]:
+        if not version or not _VERSION_PATTERN.match(version):
+            return None
+        path = os.path.join(self.directory, f"{version}.json.gz")
+        try:
+            key = (version, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            bundle = self._cache.get(key)
+            if bundle is not None:
+                self._cache.move_to_end(key)
+                return bundle
+        try:
+            with gzip.open(path, "rb") as f:
+                bundle = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            # 同一版本的旧文件内容不再使用
+            for stale in [k for k in self._cache if k[0] == version]:
+                del self._cache[stale]
+            self._cache[key] = bundle
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return bundle
+
+    def latest(self) -> Optional[dict]:
+        return self.load(self.latest_version())
+
+    def delta(self, since: str = "", current: Optional[dict] = None) -> Optional[dict]:
+        """since 为客户端已有版本：版本已被清理或未知时返回完整数据包（full=True）；current 默认为最新数据包"""
+        current = current or self.latest()
+        if current is None:
+            return None
+        base = self.load(since) if since else None
+        if base is None or base.get("format") != current["format"]:
+            return dict(current, full=True)
+        old_hashes = base["plant_hashes"]
+        changed = [n for n, h in current["plant_hashes"].items() if old_hashes.get(n) != h]
+        return {
+            "format": current["format"],
+            "version": current["version"],
+            "since": since,
+            "full": False,
+            "generated_at": current["generated_at"],
+            # 别名表、关键词与反向索引体积小，增量包中始终完整下发
+            "alias_map": current["alias_map"],
+            "intent_keywords": current["intent_keywords"],
+            "indexes": current["indexes"],
+            "plant_hashes": current["plant_hashes"],
+            "plants": {n: current["plants"][n] for n in changed},
+            "answers": {n: current["answers"][n] for n in changed},
+            "removed": [n for n in old_hashes if n not in current["plant_hashes"]],
+        }
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+植物详情 Cypher 查询（问答系统与 LangChain 问答共用）
+关联的象征、药用、文献、节日分别用模式推导式收集：
+查询开销是四类关系数量之和，而不是链式 OPTIONAL MATCH 产生的笛卡尔积
+"""
+from collections import defaultdict
+from typing import Optional
+
+PLANT_DETAIL_PROJECTION = """
+    p.name as name,
+    p.latin_name as latin_name,
+    p.family as family,
+    p.genus as genus,
+    p.distribution as distribution,
+    p.folk_use as folk_use,
+    p.ecological_meaning as ecological,
+    p.cultural_symbol as cultural_symbol,
+    [(p)-[:HAS_SYMBOL]->(s:Symbol) | s.meaning] as symbols,
+    [(p)-[:HAS_MEDICINAL]->(m:Medicinal) | m.effect] as medicinal,
+    [(p)-[:RECORDED_IN]->(l:Literature) | l.name] as literature,
+    [(p)-[:RELATED_TO_FESTIVAL]->(f:Festival) | f.name] as festivals
+"""
+
+# 单株植物详情
+PLANT_DETAIL_QUERY = f"""
+    MATCH (p:Plant {{name: $name}})
+    RETURN {PLANT_DETAIL_PROJECTION}
+"""
+
+def record_to_detail(record) -> Optional[dict]:
+    """查询结果行 -> 植物详情字典（缺失文本字段给出默认提示）"""
+    if not record:
+        return None
+    return {
+        "name": record["name"],
+        "latin": record["latin_name"],
+        "family": record["family"],
+        "genus": record["genus"],
+        "distribution": record["distribution"] or "暂无分布信息",
+        "folk_use": record["folk_use"] or "暂无民俗用途",
+        "ecological": record["ecological"] or "暂无生态意义",
+        "cultural_symbol": record["cultural_symbol"] or "暂无文化象征",
+        "symbols": record["symbols"],
+        "medicinal": record["medicinal"],
+        "literature": record["literature"],
+        "festivals": record["festivals"]
+    }
+
+
+def entry_to_detail(entry) -> Optional[dict]:
+    """知识库仓库条目（图谱属性 + 关联实体列表）-> 植物详情字典（与 record_to_detail 输出一致）"""
+    if not entry:
+        return None
+    record = defaultdict(lambda: None, entry)
+    record["ecological"] = entry.get("ecological_meaning")
+    return record_to_detail(record)
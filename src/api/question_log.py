@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+问题日志（不阻塞请求）
+请求线程只把记录放入有界内存队列（put_nowait，微秒级）；后台线程按批取出，追加写入本地 JSONL 文件。
+队列满时丢弃新记录并计数，日志永远不会拖慢或阻塞问答。
+每条记录包括：问题、识别出的植物与问题类型、实际路径（graph / llm）、各阶段耗时（毫秒）、是否命中缓存、回答。
+文件按日期与进程号分开（questions-YYYYMMDD-<pid>.jsonl），多 worker 同时写入互不干扰；
+tools/replay_questions.py 读取这些文件，按指定速率重放并对比延迟与回答。
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 日志目录（默认在仓库 data 目录下，与启动目录无关；留空则不记录）、队列容量、每批写入条数、最长刷新间隔（秒）
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+QUESTION_LOG_DIR = os.environ.get("QUESTION_LOG_DIR", os.path.join(_REPO_ROOT, "data", "question_log"))
+QUESTION_LOG_QUEUE = int(os.environ.get("QUESTION_LOG_QUEUE", "10000"))
+QUESTION_LOG_BATCH = 256
+QUESTION_LOG_FLUSH_INTERVAL = 1.0
+# 回答只保存前若干字（重放对比足够，日志体积可控）
+ANSWER_CHARS = 500
+
+
+class QuestionLog:
+    """有界队列 + 后台批量写入线程"""
+
+    def __init__(self, directory: str = QUESTION_LOG_DIR, capacity: int = QUESTION_LOG_QUEUE,
+                 batch_size: int = QUESTION_LOG_BATCH, flush_interval: float = QUESTION_LOG_FLUSH_INTERVAL):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=capacity)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, name="question-log", daemon=True)
+        self._thread.start()
+
+    def record(self, question: str, source: str, route: Optional[str] = None, plant: Optional[str] = None,
+               intent: Optional[str] = None, stages: Optional[dict] = None, cache_hit: Optional[bool] = None,
+               answer: str = "", **extra):
+        """记录一次问答；队列满时丢弃（不阻塞调用方）"""
+        entry = {
+            "ts": time.time(),
+            "source": source,
+            "question": question,
+            "plant": plant,
+            "intent": intent,
+            "route": route,
+            "stages": {k: round(v, 3) for k, v in (stages or {}).items()},
+            "cache_hit": cache_hit,
+            "answer": (answer or "")[:ANSWER_CHARS],
+        }
+        entry.update(extra)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"questions-{time.strftime('%Y%m%d')}-{os.getpid()}.jsonl")
+
+    def _drain(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            lines = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in batch)
+            with open(self._path(), "a", encoding="utf-8") as f:
+                f.write(lines)
+            self.written += len(batch)
+        except OSError as e:
+            self.dropped += len(batch)
+            logger.warning(f"⚠️ 问题日志写入失败：{str(e)[:100]}")
+
+    def close(self, timeout: float = 5.0):
+        """停止后台线程并写完队列中剩余的记录"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+class _NullLog:
+    """未配置日志目录时的空实现"""
+    dropped = written = 0
+
+    def record(self, *args, **kwargs):
+        pass
+
+    def close(self, timeout: float = 5.0):
+        pass
+
+
+# ========== 进程级共享实例 ==========
+_log = None
+_log_pid: Optional[int] = None
+_log_lock = threading.Lock()
+
+
+def get_question_log():
+    """返回当前进程的问题日志；fork 后的子进程首次调用时重新创建后台线程"""
+    global _log, _log_pid
+    with _log_lock:
+        if _log is None or _log_pid != os.getpid():
+            _log = QuestionLog() if QUESTION_LOG_DIR else _NullLog()
+            _log_pid = os.getpid()
+            atexit.register(_log.close)
+        return _log
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+相关植物推荐（预计算相似度）
+每株植物编码为稀疏特征向量：科、属、关联节日、文化象征词、分布区域，各类特征带不同权重；
+加载时用 SciPy 稀疏矩阵分块计算余弦相似度，只保留每株植物的前 k 个邻居。
+查询时直接读取预计算结果，开销为 O(k)，与植物总数无关。
+"""
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from src.database.plant_schema import MISSING, normalize_festival, split_terms
+
+# 特征类别 -> (记录字段, 权重)；同属比同科更能说明相似
+FEATURE_WEIGHTS = {
+    "family": ("family", 2.0),
+    "genus": ("genus", 3.0),
+    "festival": ("festivals", 2.0),
+    "symbol": ("cultural_symbol", 1.5),
+    "region": ("distribution", 1.0),
+}
+
+# 每株植物保留的邻居数
+DEFAULT_TOP_K = 10
+# 分块计算相似度时每块的行数（控制峰值内存）
+BLOCK_ROWS = 1024
+# 过于常见的特征（如大目录中的“春节”“湖北省全省”）几乎不区分植物，却会让相似度矩阵变稠密：
+# 出现在超过 max(MIN_MAX_DF, MAX_DF_RATIO × 植物数) 株植物上的特征不参与计算
+MAX_DF_RATIO = 0.02
+MIN_MAX_DF = 200
+
+
+def plant_features(record) -> Dict[str, float]:
+    """植物记录 -> {特征名: 权重}"""
+    features = {}
+    for kind, (field, weight) in FEATURE_WEIGHTS.items():
+        value = record.get(field) or MISSING
+        if kind in ("family", "genus"):
+            terms = [] if value == MISSING else [value]
+        else:
+            terms = split_terms(value)
+            if kind == "festival":
+                terms = [normalize_festival(t) for t in terms]
+        for term in terms:
+            features[f"{kind}:{term}"] = weight
+    return features
+
+
+class RelatedPlants:
+    """预计算的相关植物表：neighbors[i] 为第 i 株植物的邻居编号（-1 表示空位），scores 为对应相似度"""
+
+    def __init__(self, names: List[str], neighbors: np.ndarray, scores: np.ndarray):
+        self.names = names
+        self._row = {name: i for i, name in enumerate(names)}
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @classmethod
+    def build(cls, records: Iterable, top_k: int = DEFAULT_TOP_K) -> "RelatedPlants":
+        names, rows, cols, data = [], [], [], []
+        vocabulary: Dict[str, int] = {}
+        for i, record in enumerate(records):
+            names.append(record["name"])
+            for feature, weight in plant_features(record).items():
+                rows.append(i)
+                cols.append(vocabulary.setdefault(feature, len(vocabulary)))
+                data.append(weight)
+        n = len(names)
+        rows, cols, data = np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32), np.asarray(data)
+        # 按特征出现频次加权（越少见越有区分度），并剔除只出现一次或过于常见的特征
+        df = np.bincount(cols, minlength=len(vocabulary)) if len(cols) else np.zeros(0, dtype=np.int64)
+        max_df = max(MIN_MAX_DF, int(MAX_DF_RATIO * n))
+        keep = (df[cols] >= 2) & (df[cols] <= max_df)
+        rows, cols, data = rows[keep], cols[keep], data[keep] * (1.0 + np.log(n / df[cols[keep]]))
+        matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n, max(1, len(vocabulary))), dtype=np.float32)
+        # 行向量 L2 归一化后，点积即余弦相似度
+        norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+        norms[norms == 0] = 1.0
+        matrix = sparse.diags(1.0 / norms).dot(matrix).tocsr()
+
+        neighbors = np.full((n, top_k), -1, dtype=np.int32)
+        scores = np.zeros((n, top_k), dtype=np.float32)
+        transposed = matrix.T.tocsc()
+        for start in range(0, n, BLOCK_ROWS):
+            block = (matrix[start:start + BLOCK_ROWS] @ transposed).tocsr()
+            for offset in range(block.shape[0]):
+                i = start + offset
+                lo, hi = block.indptr[offset], block.indptr[offset + 1]
+                idx, sim = block.indices[lo:hi], block.data[lo:hi]
+                keep = idx != i
+                idx, sim = idx[keep], sim[keep]
+                if not len(idx):
+                    continue
+                if len(idx) > top_k:
+                    part = np.argpartition(-sim, top_k - 1)[:top_k]
+                    idx, sim = idx[part], sim[part]
+                order = np.lexsort((idx, -sim))
+                neighbors[i, :len(order)] = idx[order]
+                scores[i, :len(order)] = sim[order]
+        return cls(names, neighbors, scores)
+
+    def related(self, name: str, k: int = 5) -> List[Tuple[str, float]]:
+        """返回 [(植物名, 相似度)]，最多 k 个；未收录的植物返回空列表"""
+        i = self._row.get(name)
+        if i is None:
+            return []
+        result = []
+        for j, score in zip(self.neighbors[i, :k], self.scores[i, :k]):
+            if j < 0:
+                break
+            result.append((self.names[j], round(float(score), 3)))
+        return result
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+荆楚植物图谱 API 多进程部署支持
+- 主进程预加载只读知识快照（植物列表、别名表、jieba 词典），fork 后各 worker 写时复制共享
+- 每个 worker 独立创建 Neo4j / LLM 连接池，池大小按全局预算平均分配
+- 提供进程内存统计，便于记录每个 worker 的实际内存占用
+- 热更新（单进程）：定期检查知识库数据版本（或由管理接口触发），在后台线程重建知识快照与植物名索引，
+  完成后原子替换；进行中的请求使用旧版本直到结束，不需要重启进程
+- 热更新（gunicorn 多进程）：由主进程统一检查版本并重建快照，再通过 SIGHUP 平滑重启全部 worker，
+  新 worker 继续写时复制共享新快照，各 worker 同时切换到同一版本（见 gunicorn_conf.py）
+"""
+import gc
+import hashlib
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.api.facet_index import FacetIndex
+from src.api.free_qa_system import NameIndex
+from src.api.hot_reload import HotReloader
+from src.api import knowledge_repository
+from src.api.knowledge_repository import create_repository, resolve_aliases
+from src.api.related_plants import RelatedPlants
+from src.database.graph_snapshot import GraphSnapshot
+from src.database.plant_schema import ENTRY_RELATIONS, from_neo4j_properties
+
+logger = logging.getLogger(__name__)
+
+# ========== 部署参数（环境变量） ==========
+# worker 数量，与 gunicorn 的 WEB_CONCURRENCY 约定保持一致
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# 所有 worker 合计允许的 Neo4j 连接数（Aura 免费版连接数有限）
+NEO4J_POOL_BUDGET = int(os.environ.get("NEO4J_POOL_BUDGET", "16"))
+# 所有 worker 合计允许的 LLM HTTP 连接数
+LLM_POOL_BUDGET = int(os.environ.get("LLM_POOL_BUDGET", "32"))
+# 各 worker 检查知识库数据版本的间隔（秒，0 表示只能通过管理接口触发热更新）
+RELOAD_CHECK_INTERVAL = float(os.environ.get("RELOAD_CHECK_INTERVAL", "30"))
+
+
+class KnowledgeSnapshot:
+    """只读知识快照：构建一次后不再修改，多个 worker 通过写时复制共享同一份内存页
+    version：知识库数据版本（本地后端为仓库版本，Neo4j 为内容哈希；数据不变则不变），用作 HTTP ETag
+    updated_at：知识库最近一次导入时间（DataVersion 节点），用作 HTTP Last-Modified
+    """
+    __slots__ = ("plant_names", "plants", "alias_map", "related", "facets", "name_index", "version", "data_version",
+                 "updated_at", "built_at")
+
+    def __init__(self, plants: Dict[str, dict], alias_map: Dict[str, str],
+                 data_version: Optional[int] = None, updated_at: Optional[float] = None,
+                 source_version: Optional[str] = None):
+        names = sorted(plants)
+        self.plant_names = tuple(names)
+        self.plants = MappingProxyType({
+            name: MappingProxyType(dict(plants[name])) for name in names
+        })
+        self.alias_map = MappingProxyType(dict(alias_map))
+        records = [from_neo4j_properties(self.plants[name]) for name in names]
+        # 相关植物表与分面位图（numpy 数组，少量大对象，fork 后共享效果好）
+        self.related = RelatedPlants.build(records)
+        self.facets = FacetIndex.build(records)
+        # 规则问答的植物名数据（含模糊 / 拼音匹配索引）：主进程构建一次，各 worker 共享，不再各自重建
+        self.name_index = NameIndex(names, dict(self.alias_map))
+        if source_version is not None:
+            self.version = hashlib.sha1(source_version.encode("utf-8")).hexdigest()[:12]
+        else:
+            self.version = self._compute_version(plants)
+        self.data_version = data_version
+        self.built_at = time.time()
+        self.updated_at = updated_at or self.built_at
+
+    @staticmethod
+    def _compute_version(plants: Dict[str, dict]) -> str:
+        """根据快照内容计算稳定版本号（内容不变则版本不变）"""
+        payload = json.dumps(plants, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+    def get_plant(self, name: str) -> Optional[MappingProxyType]:
+        name = self.alias_map.get(name, name)
+        return self.plants.get(name)
+
+
+def _with_neo4j_session(query: Callable):
+    """用一个短生命周期的驱动执行 query(session)，执行完立即关闭，避免连接被 fork 继承；配置不全时返回 None"""
+    uri = os.environ.get("NEO4J_URI", "")
+    user = os.environ.get("NEO4J_USER", "")
+    password = os.environ.get("NEO4J_PASSWORD", "")
+    if not all([uri, user, password]):
+        return None
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=1)
+    try:
+        with driver.session() as session:
+            return query(session)
+    finally:
+        driver.close()
+
+
+def _load_plants_from_neo4j() -> Tuple[Dict[str, dict], Optional[int], Optional[float]]:
+    """读取全部植物属性与数据版本"""
+    def query(session):
+        result = session.run("MATCH (p:Plant) RETURN p {.*} AS plant")
+        plants = {r["plant"]["name"]: r["plant"] for r in result if r["plant"].get("name")}
+        record = session.run("""
+            MATCH (v:DataVersion {key: 'plants'})
+            RETURN v.version AS version, v.updated_at.epochSeconds AS updated_at
+        """).single()
+        return plants, record
+
+    loaded = _with_neo4j_session(query)
+    if loaded is None:
+        logger.info("ℹ️ Neo4j 配置不全，知识快照为空（离线模式）")
+        return {}, None, None
+    plants, record = loaded
+    if record:
+        return plants, record["version"], record["updated_at"]
+    return plants, None, None
+
+
+def _load_plants_from_graph_snapshot() -> Tuple[Dict[str, dict], Optional[int], Optional[float]]:
+    """Neo4j 不可用时使用最近一次导入导出的本地图谱快照（只取节点属性）"""
+    graph = GraphSnapshot.load()
+    if graph is None:
+        return {}, None, None
+    plants = {name: _node_properties(entry) for name, entry in graph.plants.items()}
+    logger.info(f"ℹ️ 使用本地图谱快照：{len(plants)} 种植物，数据版本 {graph.data_version}")
+    return plants, graph.data_version, graph.exported_at
+
+
+def _load_plants_from_repository(repo) -> Tuple[Dict[str, dict], str]:
+    """本地后端（Excel / 图谱快照文件 / 嵌入式图）：读取仓库中的全部植物，版本为仓库的数据版本"""
+    backend = getattr(repo, "backend", repo)  # 绕过条目缓存，全量读取不挤掉热点条目
+    plants = {entry["name"]: _node_properties(entry) for entry in backend.get_many(backend.list_names())}
+    return plants, backend.version()
+
+
+def _node_properties(entry: dict) -> dict:
+    """知识库条目只保留节点属性（去掉关联实体列表）"""
+    relations = set(ENTRY_RELATIONS.values())
+    return {k: v for k, v in entry.items() if k not in relations}
+
+
+def _local_repository():
+    """主进程预加载用：配置为本地后端时打开仓库；Neo4j 后端返回 None（不在 fork 前创建连接池）"""
+    backend = (knowledge_repository.KNOWLEDGE_BACKEND or "neo4j").lower()
+    return create_repository(backend) if backend != "neo4j" else None
+
+
+def _preload_jieba(words: List[str]):
+    """在主进程中完成 jieba 词典加载与自定义词注册，fork 后各 worker 直接复用"""
+    try:
+        import jieba
+    except ImportError:
+        return
+    jieba.initialize()
+    for word in words:
+        jieba.add_word(word)
+
+
+# ========== 进程级状态 ==========
+_snapshot: Optional[KnowledgeSnapshot] = None
+_alias_source: Dict[str, str] = {}
+_qa = None
+_qa_pid: Optional[int] = None
+_router = None
+_reloader: Optional[HotReloader] = None
+# 主进程预加载所用本地数据文件（Neo4j 后端为 None），主进程据此检查数据版本
+_source_path: Optional[str] = None
+# gunicorn 主进程进程号：设置后由主进程统一热更新，worker 不再各自重建
+_master_pid: Optional[int] = None
+# 主进程当前快照对应的数据版本（格式同 shared_data_version()）
+_shared_version: Optional[str] = None
+# 防止并发的首个请求各自初始化一遍 worker（各建一套连接池与热更新线程）
+_init_lock = threading.Lock()
+
+
+def build_snapshot(alias_map: Dict[str, str], repo=None) -> KnowledgeSnapshot:
+    """
+    构建只读快照：本地后端（repo 有数据文件）直接读取该仓库；
+    否则从 Neo4j（不可用时从本地图谱快照）读取全部植物
+    """
+    if repo is not None and repo.source_path:
+        plants, version = _load_plants_from_repository(repo)
+        return KnowledgeSnapshot(plants, resolve_aliases(alias_map, plants), source_version=version)
+    try:
+        plants, data_version, updated_at = _load_plants_from_neo4j()
+    except Exception as e:
+        logger.warning(f"⚠️ 知识快照加载失败，尝试本地图谱快照：{str(e)[:100]}")
+        plants, data_version, updated_at = {}, None, None
+    if not plants:
+        plants, data_version, updated_at = _load_plants_from_graph_snapshot()
+    # 别名按实际植物名解析（如“荷花” -> “荷（莲）”）
+    return KnowledgeSnapshot(plants, resolve_aliases(alias_map, plants), data_version, updated_at)
+
+
+def preload(alias_map: Dict[str, str]) -> KnowledgeSnapshot:
+    """主进程调用：构建只读快照（gunicorn preload_app 模式下在 fork 之前执行）"""
+    global _snapshot, _alias_source, _source_path, _shared_version
+    if _snapshot is not None:
+        return _snapshot
+    _alias_source = dict(alias_map)
+    repo = _local_repository()
+    _source_path = repo.source_path if repo is not None else None
+    file_version = _file_version(_source_path)
+    try:
+        _snapshot = build_snapshot(alias_map, repo)
+    finally:
+        if repo is not None:
+            repo.close()
+    _shared_version = _snapshot_shared_version(_snapshot, file_version)
+    _preload_jieba(list(_snapshot.plant_names) + list(_snapshot.alias_map.keys()))
+    logger.info(f"✅ 知识快照已构建：{len(_snapshot.plant_names)} 种植物，版本 {_snapshot.version}")
+    return _snapshot
+
+
+def get_snapshot() -> KnowledgeSnapshot:
+    if _snapshot is None:
+        raise RuntimeError("知识快照尚未构建，请先调用 preload()")
+    return _snapshot
+
+
+def freeze_shared_memory():
+    """fork 之前把已加载对象移入 GC 永久代，避免 worker 中的垃圾回收触碰共享页导致复制"""
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def worker_pool_size(budget: int, workers: int = None) -> int:
+    """按全局预算计算单个 worker 的连接池大小（至少为 1）"""
+    workers = workers or WEB_CONCURRENCY
+    return max(1, budget // max(1, workers))
+
+
+def init_worker(workers: int = None):
+    """
+    worker 进程调用：创建本进程专属的问答实例与连接池，以及共用同一知识库仓库的问答路由
+    每个进程只初始化一次：并发调用时后到者等待并直接使用已创建的实例
+    """
+    with _init_lock:
+        if _qa is not None and _qa_pid == os.getpid():
+            return _qa
+        return _init_worker(workers)
+
+
+def _init_worker(workers: int = None):
+    global _qa, _qa_pid, _router
+    from src.api.answer_router import AnswerRouter
+    from src.api.free_qa_system import PlantQASystem
+    from src.api.langchain_qa import LangChainPlantQA
+    _qa = LangChainPlantQA(
+        neo4j_pool_size=worker_pool_size(NEO4J_POOL_BUDGET, workers),
+        llm_pool_size=worker_pool_size(LLM_POOL_BUDGET, workers),
+        snapshot=_snapshot,
+    )
+    _router = AnswerRouter(PlantQASystem(repository=_qa.repo, index=_snapshot_index(_snapshot)), _qa)
+    _qa_pid = os.getpid()
+    _start_reloader()
+    mem = memory_usage()
+    logger.info(f"✅ worker {_qa_pid} 就绪，内存 RSS={mem['rss_mb']}MB PSS={mem['pss_mb']}MB USS={mem['uss_mb']}MB")
+    return _qa
+
+
+def _snapshot_index(snapshot: Optional[KnowledgeSnapshot]):
+    """知识快照中的植物名数据；快照为空（知识库暂不可用）时返回 None，由问答系统按仓库构建"""
+    return snapshot.name_index if snapshot is not None and snapshot.plant_names else None
+
+
+def get_qa():
+    """返回当前进程的问答实例；未初始化时（正常应已在启动时完成）在此创建"""
+    if _qa is None or _qa_pid != os.getpid():
+        return init_worker()
+    return _qa
+
+
+def get_router():
+    """返回当前进程的问答路由（知识库优先，必要时调用大模型）"""
+    get_qa()
+    return _router
+
+
+# ========== 热更新 ==========
+class _ServingData:
+    """一版服务数据：知识库仓库 + 只读知识快照 + 规则问答的植物名索引（一起构建、一起替换）"""
+    __slots__ = ("repo", "snapshot", "index", "mtime")
+
+    def __init__(self, repo, snapshot: Optional[KnowledgeSnapshot], index):
+        self.repo = repo
+        self.snapshot = snapshot
+        self.index = index
+        self.mtime = _source_mtime(repo)
+
+
+def _source_mtime(repo) -> Optional[int]:
+    path = repo.source_path
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
+
+def _data_version() -> str:
+    """知识库数据版本；本地后端（Excel / 图谱快照文件）只在加载时读取数据，以数据文件的修改时间为准"""
+    repo = _qa.repo
+    return f"file-{_source_mtime(repo)}" if repo.source_path else repo.version()
+
+
+def _build_serving_data() -> _ServingData:
+    repo = _qa.repo
+    # 本地后端只在加载时读取数据文件：文件更新后重新创建仓库（Neo4j 后端沿用连接池，缓存按版本自动失效）
+    current = _reloader.current
+    if repo.source_path and current is not None and _source_mtime(repo) != current.mtime:
+        repo = create_repository(excel_path=repo.source_path)
+    snapshot = build_snapshot(_alias_source, repo) if _snapshot is not None else None
+    return _ServingData(repo, snapshot, _router.structured.build_index(repo, _snapshot_index(snapshot)))
+
+
+def _swap_serving_data(data: _ServingData):
+    """原子替换：每一项都是一次引用赋值，进行中的请求继续使用它已拿到的旧对象"""
+    global _snapshot
+    if data.snapshot is not None:
+        _snapshot = data.snapshot
+        _qa.snapshot = data.snapshot
+    _qa.repo = data.repo
+    _router.structured.repo = data.repo
+    _router.structured.swap_index(data.index)
+
+
+def _start_reloader():
+    """worker 进程内创建热更新器：以知识库数据版本为准，定期在后台检查（由主进程统一热更新时不检查）"""
+    global _reloader
+    interval = 0 if _master_pid is not None else RELOAD_CHECK_INTERVAL
+    _reloader = HotReloader("知识库", _build_serving_data, _data_version,
+                            check_interval=interval, on_swap=_swap_serving_data)
+    try:
+        version = _data_version()
+    except Exception:
+        version = None  # 知识库暂不可用：恢复后版本变化即触发一次重建
+    _reloader.adopt(_ServingData(_qa.repo, _snapshot, _router.structured.index), version)
+    _reloader.start_watcher()
+
+
+def request_reload(force: bool = False) -> bool:
+    """
+    管理接口调用：单进程时在后台重建并替换当前进程的知识数据，已有重建在进行时返回 False；
+    gunicorn 多进程时通知主进程重建快照并平滑重启全部 worker（总是重建，force 不起作用）
+    """
+    get_qa()
+    if _master_pid is not None:
+        os.kill(_master_pid, signal.SIGHUP)
+        return True
+    return _reloader.reload(force=force)
+
+
+def reload_status() -> Optional[dict]:
+    """当前 worker 的热更新状态；mode 为 master 时由 gunicorn 主进程统一热更新（worker 随之重启）"""
+    if _reloader is None or _qa_pid != os.getpid():
+        return None
+    return dict(_reloader.status(), mode="master" if _master_pid is not None else "worker")
+
+
+# ========== 多进程热更新：主进程重建快照，平滑重启 worker ==========
+def enable_master_reload():
+    """
+    gunicorn 主进程调用（gunicorn_conf.py）：由主进程统一热更新
+    worker 各自重建会让每个进程持有一份私有的快照与索引（写时复制共享随之失效），
+    且各 worker 在不同时刻切换版本，ETag 在请求之间来回变化
+    """
+    global _master_pid
+    _master_pid = os.getpid()
+
+
+def _file_version(path: Optional[str]) -> Optional[str]:
+    try:
+        return f"file-{os.stat(path).st_mtime_ns}" if path else None
+    except OSError:
+        return None
+
+
+def _neo4j_version(session) -> str:
+    record = session.run("MATCH (v:DataVersion {key: 'plants'}) RETURN v.version AS version").single()
+    return f"neo4j-{record['version'] if record else 0}"
+
+
+def _snapshot_shared_version(snapshot: KnowledgeSnapshot, file_version: Optional[str]) -> str:
+    """快照对应的数据版本：本地后端为构建前读取的文件修改时间，Neo4j 为快照的 DataVersion"""
+    return file_version if _source_path else f"neo4j-{snapshot.data_version or 0}"
+
+
+def shared_data_version() -> Optional[str]:
+    """主进程检查用的数据版本：本地后端为数据文件修改时间，Neo4j 为 DataVersion 节点（短生命周期驱动，读完即关）"""
+    if _source_path:
+        return _file_version(_source_path)
+    return _with_neo4j_session(_neo4j_version)
+
+
+def rebuild_shared_snapshot() -> bool:
+    """
+    主进程调用（gunicorn on_reload，fork 新 worker 之前）：重建知识快照并重新冻结，返回是否成功
+    失败时保留旧快照，新 worker 继续使用旧版本
+    """
+    global _snapshot, _shared_version
+    start = time.perf_counter()
+    file_version = _file_version(_source_path)
+    repo = None
+    try:
+        repo = _local_repository()
+        snapshot = build_snapshot(_alias_source, repo)
+    except Exception as e:
+        logger.warning(f"⚠️ 知识快照重建失败，继续使用旧版本：{str(e)[:200]}")
+        return False
+    finally:
+        if repo is not None:
+            repo.close()
+    # 解冻后旧快照才能被回收，新快照构建完成后重新冻结
+    if hasattr(gc, "unfreeze"):
+        gc.unfreeze()
+    _snapshot = snapshot
+    _shared_version = _snapshot_shared_version(snapshot, file_version)
+    _preload_jieba(list(snapshot.plant_names) + list(snapshot.alias_map.keys()))
+    freeze_shared_memory()
+    logger.info(f"✅ 知识快照已重建：{len(snapshot.plant_names)} 种植物，版本 {snapshot.version}，"
+                f"耗时 {round((time.perf_counter() - start) * 1000, 1)} ms")
+    return True
+
+
+def start_master_watcher(on_change: Callable[[], None], interval: float = RELOAD_CHECK_INTERVAL):
+    """
+    主进程后台线程：每 interval 秒检查一次数据版本，与当前快照不同时调用 on_change（向主进程发送 SIGHUP）
+    同一版本只触发一次：重建失败时不会每次检查都重启全部 worker，等数据再次变化或手动触发
+    """
+    if interval <= 0:
+        return None
+
+    def watch():
+        signalled = None
+        while True:
+            time.sleep(interval)
+            try:
+                version = shared_data_version()
+            except Exception as e:
+                logger.warning(f"⚠️ 知识库版本检查失败：{str(e)[:100]}")
+                continue
+            if version is not None and version != _shared_version and version != signalled:
+                signalled = version
+                on_change()
+    watcher = threading.Thread(target=watch, name="知识库-master-watcher", daemon=True)
+    watcher.start()
+    return watcher
+
+
+def memory_usage() -> Dict[str, Optional[float]]:
+    """读取当前进程内存：RSS（含共享页）、PSS（共享页按进程数均摊）、USS（进程独占）"""
+    usage = {"rss_mb": None, "pss_mb": None, "uss_mb": None}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+        usage["rss_mb"] = round(fields.get("Rss", 0) / 1024, 1)
+        usage["pss_mb"] = round(fields.get("Pss", 0) / 1024, 1)
+        private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+        usage["uss_mb"] = round(private / 1024, 1)
+    except OSError:
+        # 非 Linux 平台只能拿到峰值 RSS
+        import resource
+        usage["rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return usage
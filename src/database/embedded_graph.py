@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+嵌入式图引擎（无需 Neo4j 的小规模部署）
+只支持问答系统用到的几种查询形态：
+    按名称取植物            -> 名称 -> 植物 id 的字典
+    植物 -> 象征/药用/文献/节日 -> 正向 CSR 邻接的一个切片
+    节日/文献书名/象征/药用/科 -> 植物（反向遍历）-> 反向 CSR 邻接的一个切片
+节点按标签分别驻留（interning）为连续整数 id，边存为 CSR（offsets + targets 两个 int32 数组）：
+一次遍历只是一次数组切片，没有网络往返，也没有逐边的 Python 对象。
+植物 id 按植物名排序分配，反向遍历的结果天然按名称有序（与 Neo4j 的 ORDER BY name 一致）。
+数据来源为 Excel 生成的记录或本地图谱快照（graph_snapshot），构建后只读。
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.database.plant_schema import ENTRY_RELATIONS, literature_work, record_to_entry
+
+# 正向关系：条目中的列表字段 -> 实体标签
+RELATION_LABELS = {key: label for label, key in ENTRY_RELATIONS.items()}
+# 反向查询类型 -> (实体标签, 植物条目 -> 实体取值)；文献按书名、科按属性值建立派生节点
+REVERSE_LABELS = {
+    "festival": ("Festival", lambda entry: entry.get("festivals") or []),
+    "literature": ("Work", lambda entry: [literature_work(l) for l in entry.get("literature") or []]),
+    "symbol": ("Symbol", lambda entry: entry.get("symbols") or []),
+    "medicinal": ("Medicinal", lambda entry: entry.get("medicinal") or []),
+    "family": ("Family", lambda entry: [entry["family"]] if entry.get("family") else []),
+}
+
+
+class CSR:
+    """压缩稀疏行邻接：节点 i 的邻居为 targets[offsets[i]:offsets[i + 1]]"""
+    __slots__ = ("offsets", "targets")
+
+    def __init__(self, sources: List[int], targets: List[int], n_sources: int):
+        src = np.asarray(sources, dtype=np.int32)
+        dst = np.asarray(targets, dtype=np.int32)
+        order = np.argsort(src, kind="stable")  # 同一源节点的边保持插入顺序
+        self.targets = dst[order]
+        self.offsets = np.zeros(n_sources + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=n_sources), out=self.offsets[1:])
+
+    def neighbors(self, node: int) -> List[int]:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]].tolist()
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets)
+
+
+class _NodeTable:
+    """单个标签的节点驻留表：取值 <-> 连续 id"""
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def intern(self, name: str) -> int:
+        node = self.ids.get(name)
+        if node is None:
+            node = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+
+class EmbeddedGraph:
+    """只读内存图：植物节点属性 + 正向/反向 CSR 邻接"""
+
+    def __init__(self, entries: Dict[str, dict], version: Optional[str] = None):
+        self.version = version
+        self.plant_names: List[str] = sorted(entries)
+        self.plant_ids: Dict[str, int] = {name: i for i, name in enumerate(self.plant_names)}
+        relation_keys = set(RELATION_LABELS)
+        self.properties: List[dict] = [
+            {k: v for k, v in entries[name].items() if k not in relation_keys} for name in self.plant_names
+        ]
+
+        self.nodes: Dict[str, _NodeTable] = {}
+        edges: Dict[str, tuple] = {}
+        labels = set(RELATION_LABELS.values()) | {label for label, _ in REVERSE_LABELS.values()}
+        for label in labels:
+            self.nodes[label] = _NodeTable()
+            edges[label] = ([], [])
+        for pid, name in enumerate(self.plant_names):
+            entry = entries[name]
+            for key, label in RELATION_LABELS.items():
+                self._add_edges(edges[label], pid, label, entry.get(key) or [])
+            for label, values_of in REVERSE_LABELS.values():
+                if label not in RELATION_LABELS.values():  # 派生节点（书名、科）
+                    self._add_edges(edges[label], pid, label, dict.fromkeys(values_of(entry)))
+
+        n_plants = len(self.plant_names)
+        self.out_edges: Dict[str, CSR] = {}
+        self.in_edges: Dict[str, CSR] = {}
+        for label, (plants, targets) in edges.items():
+            self.out_edges[label] = CSR(plants, targets, n_plants)
+            self.in_edges[label] = CSR(targets, plants, len(self.nodes[label].names))
+
+    def _add_edges(self, edges: tuple, pid: int, label: str, values: Iterable[str]):
+        table = self.nodes[label]
+        for value in values:
+            edges[0].append(pid)
+            edges[1].append(table.intern(value))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, str]], version: Optional[str] = None) -> "EmbeddedGraph":
+        """标准字段记录（Excel 读取结果 / .jcps 存储）构建，实体拆分规则与导入 Neo4j 相同"""
+        return cls({record["name"]: record_to_entry(record) for record in records}, version)
+
+    @classmethod
+    def from_graph_snapshot(cls, snapshot) -> "EmbeddedGraph":
+        """本地图谱快照（Neo4j 导出）构建"""
+        version = f"snapshot-{snapshot.data_version}" if snapshot.data_version is not None else None
+        return cls(snapshot.plants, version)
+
+    # ---------- 查询 ----------
+    def entry(self, name: str) -> Optional[dict]:
+        """植物条目：节点属性 + 四类关联实体列表"""
+        pid = self.plant_ids.get(name)
+        if pid is None:
+            return None
+        entry = dict(self.properties[pid])
+        for key, label in RELATION_LABELS.items():
+            names = self.nodes[label].names
+            entry[key] = [names[t] for t in self.out_edges[label].neighbors(pid)]
+        return entry
+
+    def plants_by(self, kind: str, value: str) -> List[str]:
+        """反向遍历：实体 -> 关联植物（按名称排序）"""
+        label, _ = REVERSE_LABELS[kind]
+        node = self.nodes[label].ids.get(value)
+        if node is None:
+            return []
+        return [self.plant_names[p] for p in self.in_edges[label].neighbors(node)]
+
+    def stats(self) -> Dict[str, int]:
+        """各标签节点数与边数"""
+        stats = {"Plant": len(self.plant_names)}
+        for label, table in sorted(self.nodes.items()):
+            stats[label] = len(table.names)
+            stats[f"{label}_edges"] = self.out_edges[label].n_edges
+        return stats
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+荆楚植物 Excel 数据读取（流式，单遍）
+openpyxl 只读模式逐行读取：边读边定位包含“植物中文名”的表头行，之后每一行直接转换为标准字段记录并以生成器产出。
+读取本身不会把整张表载入内存；导入脚本（分批写入 Neo4j）与页面（构建 .jcps 存储）共用。
+"""
+import os
+from typing import Dict, Iterator
+
+from openpyxl import load_workbook
+
+from src.database.plant_schema import COLUMN_MAP, HEADER_KEY, MISSING, normalize_record
+
+# 默认数据文件与由其生成的紧凑存储（.jcps）
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_EXCEL_PATH = os.path.join(_REPO_ROOT, "data", "荆楚植物文化图谱植物数据.xlsx")
+DEFAULT_STORE_PATH = os.path.join(_REPO_ROOT, "data", ".cache", "plants.jcps")
+
+# 在前多少行内查找表头
+HEADER_SCAN_ROWS = 20
+
+
+def _header_columns(header) -> Dict[int, str]:
+    """表头行 -> {列位置: 中文表头}（只保留标准字段对应的列，同名列以第一次出现为准）"""
+    columns = {}
+    for pos, cell in enumerate(header):
+        title = str(cell).strip() if cell is not None else ""
+        if title in COLUMN_MAP and title not in columns.values():
+            columns[pos] = title
+    return columns
+
+
+def iter_excel_records(excel_path: str) -> Iterator[Dict[str, str]]:
+    """逐行产出标准字段记录（跳过空行与名称为空的行）"""
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = None
+        for idx, row in enumerate(rows):
+            if any(isinstance(cell, str) and HEADER_KEY in cell for cell in row):
+                columns = _header_columns(row)
+                break
+            if idx + 1 >= HEADER_SCAN_ROWS:
+                break
+        if columns is None:
+            raise ValueError("无法在Excel中找到表头行（必须包含'植物中文名'）")
+
+        for row in rows:
+            if all(cell is None for cell in row):
+                continue
+            record = normalize_record({title: row[pos] for pos, title in columns.items() if pos < len(row)})
+            if record["name"] != MISSING:
+                yield record
+    finally:
+        workbook.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+知识图谱本地快照（Neo4j 不可用时的降级数据源）
+每株植物保存节点全部属性与四类关联实体（象征、药用、文献、节日），足以回答问答系统的全部问题类型。
+每次导入成功后由 neo4j_import 刷新；读取方在熔断打开期间直接从快照作答。
+文件为 gzip 压缩的 JSON，先写临时文件再替换，读取方不会看到半个文件。
+"""
+import gzip
+import json
+import os
+import time
+from typing import Dict, Optional
+
+SNAPSHOT_PATH = os.environ.get(
+    "GRAPH_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", ".cache", "graph_snapshot.json.gz"),
+)
+
+# 植物节点属性 + 关联实体（知识库仓库在线查询与快照导出共用同一投影）
+PLANT_GRAPH_PROJECTION = """
+    p {.*} AS props,
+    [(p)-[:HAS_SYMBOL]->(s:Symbol) | s.meaning] AS symbols,
+    [(p)-[:HAS_MEDICINAL]->(m:Medicinal) | m.effect] AS medicinal,
+    [(p)-[:RECORDED_IN]->(l:Literature) | l.name] AS literature,
+    [(p)-[:RELATED_TO_FESTIVAL]->(f:Festival) | f.name] AS festivals
+"""
+
+ALL_PLANTS_GRAPH_QUERY = f"""
+    MATCH (p:Plant)
+    RETURN {PLANT_GRAPH_PROJECTION}
+"""
+
+
+def graph_entry(record) -> Dict:
+    """查询结果行 -> 快照条目：节点属性平铺，关联实体为列表（去掉导入用的内部属性）"""
+    entry = {k: v for k, v in dict(record["props"]).items() if k not in ("id", "content_hash")}
+    for key in ("symbols", "medicinal", "literature", "festivals"):
+        entry[key] = list(record[key] or [])
+    return entry
+
+
+def export_graph_snapshot(session, path: str = SNAPSHOT_PATH) -> int:
+    """从图数据库读取全部植物写入快照文件，返回植物数"""
+    plants = {}
+    for record in session.run(ALL_PLANTS_GRAPH_QUERY):
+        entry = graph_entry(record)
+        if entry.get("name"):
+            plants[entry["name"]] = entry
+    version = session.run("MATCH (v:DataVersion {key: 'plants'}) RETURN v.version AS version").single()
+    payload = {
+        "data_version": version["version"] if version else None,
+        "exported_at": time.time(),
+        "plants": plants,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+    os.replace(tmp_path, path)
+    return len(plants)
+
+
+class GraphSnapshot:
+    """只读快照：按植物名取条目（反向查询由 knowledge_repository.InMemoryRepository 建索引）"""
+
+    def __init__(self, plants: Dict[str, Dict], data_version: Optional[int] = None,
+                 exported_at: Optional[float] = None):
+        self.plants = plants
+        self.data_version = data_version
+        self.exported_at = exported_at
+        self.plant_names = sorted(plants)
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_PATH) -> Optional["GraphSnapshot"]:
+        """读取快照文件；文件不存在或已损坏时返回 None"""
+        try:
+            with gzip.open(path, "rb") as f:
+                payload = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return cls(payload.get("plants", {}), payload.get("data_version"), payload.get("exported_at"))
+
+    def entry(self, name: str) -> Optional[Dict]:
+        return self.plants.get(name)
+
+
+class SnapshotReader:
+    """按文件修改时间缓存快照：导入刷新快照文件后，下次读取自动加载新版本"""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._mtime = None
+
+    def get(self) -> Optional[GraphSnapshot]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._snapshot
+        if mtime != self._mtime:
+            snapshot = GraphSnapshot.load(self.path)
+            if snapshot is not None:
+                self._snapshot, self._mtime = snapshot, mtime
+        return self._snapshot
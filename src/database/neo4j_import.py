@@ -2,70 +2,214 @@
 # -*- coding: utf-8 -*-
 """
 将 Excel 数据导入 Neo4j 数据库
+默认增量同步：按行计算内容哈希，与 Plant 节点上保存的哈希比较，只写入变化的行、删除已消失的行，
+全部变更在同一个事务中提交，导入过程中在线查询始终能看到完整的旧图或新图。
+Excel 逐行流式读取（excel_ingest.iter_excel_records），变化的行攒满一批即发送；
+各批写入仍属于同一个服务端事务，事务状态随变化的行数增长，大规模全量导入需相应调高 Neo4j 的事务内存上限。
+“、”“；”分隔的象征、药用、节日、文献字段拆分为共享去重的 Symbol / Medicinal / Festival / Literature 节点。
+每次导入成功后导出本地图谱快照（data/.cache/graph_snapshot.json.gz），供 Neo4j 不可用时降级使用。
+运行命令：python neo4j_import.py [Excel路径] [--full]
 """
-import pandas as pd
-from neo4j import GraphDatabase
+import argparse
 import os
+import sys
+import time
+
+from neo4j import GraphDatabase
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.database.excel_ingest import iter_excel_records
+from src.database.graph_snapshot import export_graph_snapshot
+from src.database.plant_schema import (
+    ENTITY_RELATIONS, content_hash, extract_entities, literature_work, plant_key, to_neo4j_properties
+)
 
 # Neo4j 连接配置
 NEO4J_URI = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.environ.get("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD", "12345678")
 
-def import_data(excel_path):
-    # 读取 Excel 数据
-    df = pd.read_excel(excel_path)
-    
+# 每批 UNWIND 写入的行数
+BATCH_SIZE = 500
+# 导入逻辑版本：参与内容哈希，升级后首次同步会重写全部植物（例如补建实体关系）
+IMPORT_SCHEMA = "entities-v1"
+
+
+def _batches(items, size=BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _changed_batches(rows, existing, seen, size=BATCH_SIZE):
+    """
+    流式筛选新增或内容变化的行并分批产出；seen 记录已读到的主键 -> 哈希
+    重复主键以最后一行为准：本次已写入过的主键总是重写，即使后一行与库中原有内容相同
+    """
+    batch = {}
+    written = set()
+    for row in rows:
+        key = row["id"]
+        seen[key] = row["hash"]
+        if existing.get(key) == row["hash"] and key not in written:
+            continue
+        written.add(key)
+        if key in batch or len(batch) >= size:  # 同一主键不在一批内重复写入
+            yield list(batch.values())
+            batch = {}
+        batch[key] = row
+    if batch:
+        yield list(batch.values())
+
+
+def _ensure_schema(session):
+    """唯一约束（自带索引）：按 id 合并节点、按 name 查询植物都走索引"""
+    session.run("CREATE CONSTRAINT plant_id IF NOT EXISTS FOR (p:Plant) REQUIRE p.id IS UNIQUE")
+    session.run("CREATE INDEX plant_name IF NOT EXISTS FOR (p:Plant) ON (p.name)")
+    session.run("CREATE CONSTRAINT data_version_key IF NOT EXISTS FOR (v:DataVersion) REQUIRE v.key IS UNIQUE")
+    # 实体节点按主键唯一，MERGE 与“节日 -> 植物”等反向查询都走索引
+    for _, label, key, _ in ENTITY_RELATIONS:
+        session.run(f"CREATE CONSTRAINT {label.lower()}_{key} IF NOT EXISTS "
+                    f"FOR (e:{label}) REQUIRE e.{key} IS UNIQUE")
+    session.run("CREATE INDEX literature_work IF NOT EXISTS FOR (l:Literature) ON (l.work)")
+
+
+def _iter_rows(records):
+    """Excel 记录 -> 待写入的行（主键、属性、内容哈希、实体），逐行产出"""
+    for record in records:
+        props = to_neo4j_properties(record)
+        key = plant_key(record)
+        props["id"] = key
+        yield {
+            "id": key,
+            "props": props,
+            "hash": content_hash(props, IMPORT_SCHEMA),
+            "entities": extract_entities(record),
+        }
+
+
+def _write_batch(tx, batch):
+    """写入一批变化的植物：MERGE 后整体替换属性（SET p = ...，已删除的列不会残留），再重建实体关系"""
+    tx.run("""
+        UNWIND $rows AS row
+        MERGE (p:Plant {id: row.id})
+        SET p = row.props, p.content_hash = row.hash
+    """, rows=[{"id": r["id"], "props": r["props"], "hash": r["hash"]} for r in batch])
+    _write_entities(tx, batch)
+
+
+def _write_entities(tx, changed):
+    """重建变化植物的实体关系：先删旧关系，再按实体类型 MERGE 共享节点与关系"""
+    rel_types = "|".join(rel for _, _, _, rel in ENTITY_RELATIONS)
+    tx.run(f"""
+        UNWIND $ids AS id
+        MATCH (p:Plant {{id: id}})-[r:{rel_types}]->()
+        DELETE r
+    """, ids=[row["id"] for row in changed])
+
+    for _, label, key, rel in ENTITY_RELATIONS:
+        links = [
+            {"id": row["id"], "value": value, "work": literature_work(value)}
+            for row in changed
+            for value in row["entities"][label]
+        ]
+        # 文献节点额外保存书名（work），“楚辞/诗经 -> 植物”查询按书名索引匹配
+        set_work = "SET e.work = link.work" if label == "Literature" else ""
+        for batch in _batches(links):
+            tx.run(f"""
+                UNWIND $links AS link
+                MERGE (e:{label} {{{key}: link.value}})
+                {set_work}
+                WITH e, link
+                MATCH (p:Plant {{id: link.id}})
+                MERGE (p)-[:{rel}]->(e)
+            """, links=batch)
+
+
+def _remove_orphan_entities(tx):
+    """删除已没有任何植物引用的实体节点"""
+    labels = " OR ".join(f"e:{label}" for _, label, _, _ in ENTITY_RELATIONS)
+    tx.run(f"MATCH (e) WHERE ({labels}) AND NOT EXISTS {{ (e)<--() }} DELETE e")
+
+
+def _sync_tx(tx, read_records, full):
+    """
+    在单个写事务内完成对比与写入，返回差异摘要
+    read_records 每次调用返回一个新的记录迭代器（事务重试时从头重新读取）
+    """
+    if full:
+        existing = {}
+        tx.run("MATCH (p:Plant) DETACH DELETE p")
+    else:
+        result = tx.run("MATCH (p:Plant) RETURN p.id AS id, p.content_hash AS hash")
+        existing = {r["id"]: r["hash"] for r in result}
+
+    # 单遍流式读取：变化的行攒满一批即写入
+    seen = {}
+    changed = 0
+    for batch in _changed_batches(_iter_rows(read_records()), existing, seen):
+        _write_batch(tx, batch)
+        changed += len(batch)
+
+    added = sum(1 for k in seen if k not in existing)
+    updated = sum(1 for k, h in seen.items() if k in existing and existing[k] != h)
+    removed = [k for k in existing if k not in seen]
+    for batch in _batches(removed):
+        tx.run("""
+            UNWIND $ids AS id
+            MATCH (p:Plant {id: id})
+            DETACH DELETE p
+        """, ids=batch)
+
+    if updated or removed or full:
+        _remove_orphan_entities(tx)
+
+    version = None
+    if changed or removed or full:
+        record = tx.run("""
+            MERGE (v:DataVersion {key: 'plants'})
+            SET v.version = coalesce(v.version, 0) + 1,
+                v.updated_at = datetime(),
+                v.plant_count = $count
+            RETURN v.version AS version
+        """, count=len(seen)).single()
+        version = record["version"]
+    else:
+        record = tx.run("MATCH (v:DataVersion {key: 'plants'}) RETURN v.version AS version").single()
+        version = record["version"] if record else None
+
+    return {
+        "added": added,
+        "updated": updated,
+        "removed": len(removed),
+        "unchanged": len(seen) - added - updated,
+        "version": version,
+    }
+
+
+def import_data(excel_path, full=False):
+    """导入 Excel 数据；full=True 时先清空全部植物再重建（同样在一个事务内完成）"""
+    start = time.perf_counter()
+
     # 连接 Neo4j
     driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    
+
     with driver.session() as session:
-        # 清空现有数据（可选）
-        session.run("MATCH (n) DETACH DELETE n")
-        
-        # 导入植物节点
-        for _, row in df.iterrows():
-            session.run("""
-                CREATE (p:Plant {
-                    id: $id,
-                    name: $name,
-                    latin_name: $latin_name,
-                    family: $family,
-                    genus: $genus,
-                    distribution: $distribution,
-                    folk_use: $folk_use,
-                    ecological_meaning: $ecological_meaning,
-                    cultural_symbol: $cultural_symbol,
-                    medicinal_value: $medicinal_value,
-                    literature_source: $literature_source,
-                    festival: $festival
-                })
-            """, 
-            id=row["id"],
-            name=row["name"],
-            latin_name=row["latin_name"],
-            family=row["family"],
-            genus=row["genus"],
-            distribution=row["distribution"],
-            folk_use=row["folk_use"],
-            ecological_meaning=row["ecological_meaning"],
-            cultural_symbol=row["cultural_symbol"],
-            medicinal_value=row["medicinal_value"],
-            literature_source=row["literature_source"],
-            festival=row["festival"]
-            )
-        
-        # 导入药用价值关系（示例）
-        session.run("""
-            MATCH (p:Plant), (m:Medicinal)
-            WHERE p.medicinal_value IS NOT NULL
-            CREATE (p)-[:HAS_MEDICINAL]->(m:Medicinal {effect: p.medicinal_value})
-        """)
-        
-        print("数据导入完成！")
-    
+        _ensure_schema(session)
+        summary = session.execute_write(_sync_tx, lambda: iter_excel_records(excel_path), full)
+        # 导入成功后刷新本地图谱快照，问答系统在 Neo4j 不可用时以此作答
+        summary["snapshot_plants"] = export_graph_snapshot(session)
+
     driver.close()
+    summary["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    print(f"数据导入完成！新增 {summary['added']}，更新 {summary['updated']}，"
+          f"删除 {summary['removed']}，未变 {summary['unchanged']}，"
+          f"数据版本 {summary['version']}，耗时 {summary['elapsed_ms']} ms")
+    return summary
+
 
 if __name__ == "__main__":
-    # 替换为你的 Excel 文件路径
-    import_data("../../data/荆楚植物文化图谱植物数据.xlsx")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="将荆楚植物 Excel 数据导入 Neo4j")
+    parser.add_argument("excel_path", nargs="?", default="../../data/荆楚植物文化图谱植物数据.xlsx")
+    parser.add_argument("--full", action="store_true", help="清空后全量重建（默认增量同步）")
+    args = parser.parse_args()
+    import_data(args.excel_path, full=args.full)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+荆楚植物数据的标准字段定义
+Excel 原始表头（中文）统一映射为英文标准字段名，导入、存储与问答共用同一套字段
+"""
+import hashlib
+import json
+from typing import Dict, List
+
+# 缺失值占位符（与页面展示保持一致）
+MISSING = "无"
+
+# Excel 表头 -> 标准字段名（顺序即存储顺序）
+COLUMN_MAP = {
+    "ID": "id",
+    "植物中文名": "name",
+    "植物拉丁学名": "latin",
+    "植物科名": "family",
+    "植物属名": "genus",
+    "观赏类型": "ornamental_type",
+    "主要观赏价值": "ornamental_value",
+    "文化象征": "cultural_symbol",
+    "生态意义": "ecological_significance",
+    "民俗用途": "folk_use",
+    "现代地理分布": "distribution",
+    "传统实用价值": "traditional_use",
+    "文献出处": "literature_source",
+    "文献记载": "literature_text",
+    "文献页码": "literature_page",
+    "数据采集源": "data_source",
+    "药用价值": "medicinal_value",
+    "节日": "festivals",
+}
+
+# 标准字段列表
+FIELDS: List[str] = list(COLUMN_MAP.values())
+
+# 用于定位表头行的关键列
+HEADER_KEY = "植物中文名"
+
+# ========== 统一别名表（所有前端共用） ==========
+# 目标名可写简称（如“荷”），由知识库仓库按实际植物名解析为标准名（“荷（莲）”）
+PLANT_ALIASES = {
+    "菊花": "菊", "梅花": "梅", "兰花": "兰", "竹子": "竹",
+    "荷花": "荷", "莲花": "荷", "桂花": "桂", "牡丹花": "牡丹",
+    "杜鹃花": "杜鹃", "水仙花": "水仙", "艾草": "艾", "菖蒲叶": "菖蒲",
+    "松树": "松", "柏树": "柏", "柳树": "柳", "桑树": "桑",
+    "茶树": "茶", "桃树": "桃", "银杏树": "银杏", "梧桐树": "梧桐",
+}
+
+
+def normalize_record(row: Dict) -> Dict[str, str]:
+    """把一行以中文表头为键的原始数据转换为标准字段字典（值统一为去空白的字符串）"""
+    record = {}
+    for column, field in COLUMN_MAP.items():
+        value = row.get(column)
+        if value is None or (isinstance(value, float) and value != value):  # None / NaN
+            record[field] = MISSING
+            continue
+        text = str(value).strip()
+        record[field] = text if text else MISSING
+    return record
+
+
+# 标准字段名 -> Neo4j Plant 节点属性名（问答系统中的 Cypher 使用这些属性名）
+NEO4J_PROPERTIES = {
+    "latin": "latin_name",
+    "ecological_significance": "ecological_meaning",
+    "festivals": "festival",
+}
+
+
+def to_neo4j_properties(record: Dict[str, str]) -> Dict[str, str]:
+    """标准字段记录 -> Plant 节点属性（缺失值不写入，保持为 null）"""
+    return {
+        NEO4J_PROPERTIES.get(field, field): value
+        for field, value in record.items()
+        if value != MISSING
+    }
+
+
+def from_neo4j_properties(properties: Dict) -> Dict[str, str]:
+    """Plant 节点属性 -> 标准字段记录（缺失字段补占位符）"""
+    reverse = {prop: field for field, prop in NEO4J_PROPERTIES.items()}
+    record = {field: MISSING for field in FIELDS}
+    for prop, value in properties.items():
+        field = reverse.get(prop, prop)
+        if field in record and value not in (None, ""):
+            record[field] = str(value)
+    return record
+
+
+def plant_key(record: Dict[str, str]) -> str:
+    """植物行的稳定主键：优先使用 ID 列，缺失时退回植物名"""
+    return record["id"] if record.get("id", MISSING) != MISSING else record["name"]
+
+
+def content_hash(properties: Dict[str, str], salt: str = "") -> str:
+    """对一行数据的属性计算稳定哈希（与字段顺序无关），用于增量同步时判断是否变化
+    salt：导入逻辑变化时更换，使已有节点全部视为变化而重新写入"""
+    payload = salt + json.dumps(properties, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# ========== 多值字段 -> 共享实体节点 ==========
+# (标准字段, 节点标签, 节点主键属性, 关系类型)；问答系统按这些关系做正向与反向查询
+ENTITY_RELATIONS = [
+    ("cultural_symbol", "Symbol", "meaning", "HAS_SYMBOL"),
+    ("medicinal_value", "Medicinal", "effect", "HAS_MEDICINAL"),
+    ("festivals", "Festival", "name", "RELATED_TO_FESTIVAL"),
+    ("literature_source", "Literature", "name", "RECORDED_IN"),
+]
+
+# 表示“没有”的占位取值，不生成实体节点
+PLACEHOLDER_TERMS = {MISSING, "无特定节日", "无药用记载", "暂无"}
+
+TERM_DELIMITERS = "、；;"
+_OPEN_BRACKETS = "（("
+_CLOSE_BRACKETS = "）)"
+
+
+def split_terms(value: str) -> List[str]:
+    """按“、”“；”拆分多值字段，括号内的分隔符不拆（如“清热化痰（竹茹、竹叶）”）"""
+    if not value or value in PLACEHOLDER_TERMS:
+        return []
+    terms, current, depth = [], [], 0
+    for ch in value:
+        if ch in _OPEN_BRACKETS:
+            depth += 1
+        elif ch in _CLOSE_BRACKETS:
+            depth = max(0, depth - 1)
+        if ch in TERM_DELIMITERS and depth == 0:
+            terms.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    terms.append("".join(current))
+    return [t.strip() for t in terms if t.strip() and t.strip() not in PLACEHOLDER_TERMS]
+
+
+def normalize_festival(term: str) -> str:
+    """去掉节日后的括号注释：“端午节（辟邪）”“荷花节（夏季）” -> “端午节”“荷花节”"""
+    for bracket in _OPEN_BRACKETS:
+        if bracket in term:
+            term = term.split(bracket, 1)[0]
+    return term.strip()
+
+
+def literature_work(name: str) -> str:
+    """文献出处中的书名：“《楚辞》战国·屈原” -> “楚辞”"""
+    if "《" in name and "》" in name:
+        return name[name.index("《") + 1:name.index("》")].strip()
+    return name.strip()
+
+
+def extract_entities(record: Dict[str, str]) -> Dict[str, List[str]]:
+    """标准字段记录 -> {节点标签: 去重后的实体取值列表}"""
+    entities = {}
+    for field, label, _, _ in ENTITY_RELATIONS:
+        terms = split_terms(record.get(field, MISSING))
+        if label == "Festival":
+            terms = [normalize_festival(t) for t in terms]
+        entities[label] = list(dict.fromkeys(t for t in terms if t))
+    return entities
+
+
+# ========== 知识库条目（图谱词汇） ==========
+# 条目 = Plant 节点属性（NEO4J_PROPERTIES 命名）+ 四类关联实体列表，图数据库、本地快照与 Excel 共用
+ENTRY_RELATIONS = {"Symbol": "symbols", "Medicinal": "medicinal", "Literature": "literature", "Festival": "festivals"}
+
+
+def record_to_entry(record: Dict[str, str]) -> Dict:
+    """标准字段记录 -> 知识库条目（关联实体按导入时相同的规则拆分）"""
+    entry = to_neo4j_properties(record)
+    entry.pop("id", None)
+    for label, values in extract_entities(record).items():
+        entry[ENTRY_RELATIONS[label]] = values
+    return entry
+
+
+def entry_to_record(entry: Dict) -> Dict[str, str]:
+    """知识库条目 -> 标准字段记录（忽略关联实体列表）"""
+    relations = set(ENTRY_RELATIONS.values())
+    return from_neo4j_properties({k: v for k, v in entry.items() if k not in relations})
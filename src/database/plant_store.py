@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+植物记录的紧凑二进制存储（.jcps）
+- 所有字符串去重后存入字符串表（interned），记录只保存字符串编号
+- 字符串表、记录表均为定长偏移表，可 O(1) 随机访问
+- 附带按植物名排序的索引，按名查找为二分查找
+- 文件末尾为全部内容的 CRC32，打开时校验，截断或损坏的文件直接拒绝（ValueError）
+文件通过 mmap 只读打开，多个进程共享同一份操作系统页缓存，进程内几乎不占额外内存。
+
+文件布局（小端序）：
+    头部    HEADER_FORMAT
+    字符串偏移表  uint32 × (字符串数 + 1)
+    字符串数据    UTF-8 字节串依次拼接
+    记录表        uint32 × (记录数 × 字段数)，值为字符串编号
+    名称索引      uint32 × 记录数，按名称排序后的记录编号
+    校验和        uint32，之前全部字节的 CRC32
+前 字段数 个字符串为字段名本身。
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+MAGIC = b"JCPS"
+# 版本 2：文件末尾增加 CRC32 校验和（旧版本文件由 open_store 自动重建）
+FORMAT_VERSION = 2
+# magic, 版本, 字段数, 记录数, 字符串数, 字符串偏移表/字符串数据/记录表/名称索引 的起始位置
+HEADER_FORMAT = "<4sHHIIQQQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+CHECKSUM_SIZE = 4
+
+if sys.byteorder != "little":
+    raise ImportError("plant_store 仅支持小端平台")
+
+
+def _align(buf: bytearray, size: int = 4):
+    """补齐到 4 字节边界，保证 uint32 数组可以直接 memoryview.cast"""
+    buf.extend(b"\0" * (-len(buf) % size))
+
+
+def build_store(records: Iterable[Dict[str, str]], path: str, fields: List[str]):
+    """把记录写成 .jcps 文件（先写临时文件再原子替换，正在读旧文件的进程不受影响）"""
+    strings: Dict[str, int] = {}
+    string_list: List[str] = []
+
+    def intern(value) -> int:
+        value = "" if value is None else str(value)
+        sid = strings.get(value)
+        if sid is None:
+            sid = len(string_list)
+            strings[value] = sid
+            string_list.append(value)
+        return sid
+
+    for field in fields:
+        intern(field)
+    name_pos = fields.index("name")
+    rows: List[List[int]] = []
+    for record in records:
+        rows.append([intern(record.get(field)) for field in fields])
+
+    encoded = [s.encode("utf-8") for s in string_list]
+    name_index = sorted(range(len(rows)), key=lambda i: string_list[rows[i][name_pos]])
+
+    body = bytearray()
+    str_offsets_at = HEADER_SIZE
+    offset = 0
+    offsets = [0]
+    for b in encoded:
+        offset += len(b)
+        offsets.append(offset)
+    if offset >= 2 ** 32:
+        raise ValueError("字符串总长度超过 4GB，无法写入 .jcps")
+    body += struct.pack(f"<{len(offsets)}I", *offsets)
+    str_data_at = HEADER_SIZE + len(body)
+    body += b"".join(encoded)
+    _align(body)
+    records_at = HEADER_SIZE + len(body)
+    flat = [sid for row in rows for sid in row]
+    body += struct.pack(f"<{len(flat)}I", *flat)
+    index_at = HEADER_SIZE + len(body)
+    body += struct.pack(f"<{len(name_index)}I", *name_index)
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, len(fields), len(rows),
+                         len(string_list), str_offsets_at, str_data_at, records_at, index_at)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+        f.write(struct.pack("<I", zlib.crc32(body, zlib.crc32(header))))
+    os.replace(tmp_path, path)
+
+
+def store_is_stale(store_path: str, source_path: str) -> bool:
+    """存储文件不存在或早于源数据文件时需要重建"""
+    if not os.path.exists(store_path):
+        return True
+    return os.path.getmtime(store_path) < os.path.getmtime(source_path)
+
+
+def open_store(store_path: str, source_path: str, load_records: Callable[[], Iterable[Dict[str, str]]],
+               fields: List[str]) -> "PlantStore":
+    """打开存储；不存在、早于源数据文件或无法通过校验（损坏、旧格式版本）时由 load_records() 重建"""
+    if not store_is_stale(store_path, source_path):
+        try:
+            return PlantStore(store_path)
+        except ValueError as e:
+            print(f"⚠️ {e}，重新生成")
+    build_store(load_records(), store_path, fields)
+    return PlantStore(store_path)
+
+
+class PlantRecord(Mapping):
+    """单条植物记录的只读视图：按需从 mmap 中解码字段，不复制整条记录"""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "PlantStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, field: str) -> str:
+        pos = self._store._field_pos.get(field)
+        if pos is None:
+            raise KeyError(field)
+        return self._store._string(self._store._records[self._row * self._store.n_fields + pos])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.fields)
+
+    def __len__(self) -> int:
+        return self._store.n_fields
+
+    def __repr__(self) -> str:
+        return f"PlantRecord({self.get('name')!r})"
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.items())
+
+
+class PlantStore:
+    """只读打开 .jcps 文件，行为类似一个由 PlantRecord 组成的序列"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER_SIZE + CHECKSUM_SIZE:
+            self._file.close()
+            raise ValueError(f".jcps 文件不完整：{path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_fields, self.n_records, n_strings,
+         str_offsets_at, str_data_at, records_at, index_at) = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的 .jcps 文件（或格式版本不符）：{path}")
+        view = memoryview(self._mm)
+        self._view = view
+        # 校验和覆盖除自身外的全部字节：截断或任意字节损坏都无法通过
+        crc = zlib.crc32(view[:size - CHECKSUM_SIZE])
+        (stored,) = struct.unpack_from("<I", self._mm, size - CHECKSUM_SIZE)
+        if crc != stored or index_at + 4 * self.n_records != size - CHECKSUM_SIZE:
+            self.close()
+            raise ValueError(f".jcps 文件已损坏（校验和不符）：{path}")
+        self._str_offsets = view[str_offsets_at:str_offsets_at + 4 * (n_strings + 1)].cast("I")
+        self._str_data_at = str_data_at
+        self._records = view[records_at:records_at + 4 * self.n_records * self.n_fields].cast("I")
+        self._name_index = view[index_at:index_at + 4 * self.n_records].cast("I")
+        self.fields = [self._string(i) for i in range(self.n_fields)]
+        self._field_pos = {field: pos for pos, field in enumerate(self.fields)}
+        self._name_pos = self._field_pos["name"]
+        # 数据版本：文件内容的 CRC32，内容不变则版本不变（用作派生数据的缓存键）
+        self.version = f"{crc:08x}"
+
+    def _string(self, sid: int) -> str:
+        start = self._str_data_at + self._str_offsets[sid]
+        end = self._str_data_at + self._str_offsets[sid + 1]
+        return str(self._mm[start:end], "utf-8")
+
+    def _name_of(self, row: int) -> str:
+        return self._string(self._records[row * self.n_fields + self._name_pos])
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def __getitem__(self, row: int) -> PlantRecord:
+        if row < 0:
+            row += self.n_records
+        if not 0 <= row < self.n_records:
+            raise IndexError(row)
+        return PlantRecord(self, row)
+
+    def __iter__(self) -> Iterator[PlantRecord]:
+        for row in range(self.n_records):
+            yield PlantRecord(self, row)
+
+    def get(self, name: str) -> Optional[PlantRecord]:
+        """按植物名精确查找（名称索引上二分查找）"""
+        lo, hi = 0, self.n_records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_of(self._name_index[mid]) < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_records:
+            row = self._name_index[lo]
+            if self._name_of(row) == name:
+                return PlantRecord(self, row)
+        return None
+
+    def names(self) -> List[str]:
+        """按名称排序的全部植物名"""
+        return [self._name_of(row) for row in self._name_index]
+
+    def close(self):
+        for attr in ("_str_offsets", "_records", "_name_index", "_view"):
+            view = getattr(self, attr, None)
+            if view is not None:
+                view.release()
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+        self._file.close()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Streamlit 大模型调用任务池
+- 进程内共享一个有界线程池（由页面通过 st.cache_resource 创建），生成回答不再占用会话的脚本线程
+- 排队 + 执行中的任务总数有上限，超出时直接提示繁忙，而不是无限堆积
+- 每个会话同一时刻只保留一个任务：新问题提交时取消旧任务（未开始的直接撤销，生成中的在下一个流式片段处中止）
+- 回答以流式方式生成，页面轮询 AnswerJob.partial 展示进度
+- 每个任务带请求时限（从提交时刻开始，含排队），流式片段之间检查，到期即中止（DeadlineExceeded）
+"""
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from src.api.deadline import Deadline, check_deadline
+
+# 线程池大小与最大待处理任务数
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 32
+
+
+class JobCancelled(Exception):
+    """任务被同一会话的新问题取代"""
+
+
+class AnswerJob:
+    """一次回答生成任务：future 为线程池任务，partial 为已生成的文本片段，deadline 为请求时限"""
+
+    def __init__(self, question: str, deadline: Optional[Deadline] = None):
+        self.question = question
+        self.deadline = deadline
+        self.partial: List[str] = []
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.partial)
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future is None or self.future.done()
+
+    def result(self) -> Optional[str]:
+        """已完成任务的回答；被取消时返回 None"""
+        try:
+            return self.future.result(timeout=0) if self.future is not None else None
+        except (CancelledError, JobCancelled):
+            return None
+
+
+class LLMExecutor:
+    """有界线程池：submit 在待处理任务已满时返回 None"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, job: AnswerJob, generate: Callable[[AnswerJob], str]) -> Optional[AnswerJob]:
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        def run():
+            if job.cancel_event.is_set():
+                raise JobCancelled()
+            return generate(job)
+
+        job.future = self._pool.submit(run)
+        job.future.add_done_callback(lambda _: self._slots.release())
+        return job
+
+
+def stream_chat(llm, job: AnswerJob, prompt, **params) -> str:
+    """
+    经共享客户端（src/api/llm_client.LLMClient）流式生成，逐片段写入 job.partial；
+    任务被取消或超过当前请求时限时关闭连接并中止
+    """
+    stream = llm.stream(prompt, **params)
+    try:
+        for chunk in stream:
+            if job.cancel_event.is_set():
+                raise JobCancelled()
+            check_deadline("llm")
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    job.partial.append(delta)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return job.text.strip()
@@ -84,20 +84,22 @@ with col1:
 
 with col2:
     st.markdown("### 🌱 今日推荐植物")
-    # 随机推荐植物
-    random_plant = random.choice(plant_list)
-    plant_detail = qa.get_plant_detail(random_plant)
-    
-    # 显示植物详情卡片
-    st.markdown(f"""
-    <div style="background-color: #f5f5f5; padding: 15px; border-radius: 8px;">
-        <h4 style="margin: 0; color: #2e8b57;">{random_plant}</h4>
-        <p><strong>拉丁名</strong>：{plant_detail['latin']}</p>
-        <p><strong>文化象征</strong>：{plant_detail['cultural_symbol']}</p>
-        <p><strong>分布区域</strong>：{plant_detail['distribution']}</p>
-        <p><strong>关联节日</strong>：{', '.join(plant_detail['festivals']) if plant_detail['festivals'] else '无'}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    # 随机推荐植物（图数据库与本地图谱快照都不可用时没有植物可推荐）
+    random_plant = random.choice(plant_list) if plant_list else None
+    plant_detail = qa.get_plant_detail(random_plant) if random_plant else None
+    if plant_detail is None:
+        st.warning("⚠️ 知识库暂时无法访问，请稍后再试")
+    else:
+        # 显示植物详情卡片
+        st.markdown(f"""
+        <div style="background-color: #f5f5f5; padding: 15px; border-radius: 8px;">
+            <h4 style="margin: 0; color: #2e8b57;">{random_plant}</h4>
+            <p><strong>拉丁名</strong>：{plant_detail['latin']}</p>
+            <p><strong>文化象征</strong>：{plant_detail['cultural_symbol']}</p>
+            <p><strong>分布区域</strong>：{plant_detail['distribution']}</p>
+            <p><strong>关联节日</strong>：{', '.join(plant_detail['festivals']) if plant_detail['festivals'] else '无'}</p>
+        </div>
+        """, unsafe_allow_html=True)
     
     st.markdown("---")
     st.markdown("### 📊 数据概览")
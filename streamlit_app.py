@@ -1,8 +1,17 @@
 ﻿import streamlit as st
 import os
 import random
-import pandas as pd
-from groq import Groq
+import time
+from src.api.bm25_index import BM25Index
+from src.api.deadline import ANSWER_DEADLINE, Deadline, DeadlineExceeded, deadline_scope
+from src.api.fuzzy_match import FuzzyResolver
+from src.api.hot_reload import HotReloader
+from src.api.knowledge_repository import create_repository
+from src.api.llm_client import LLMClient
+from src.api.question_log import get_question_log
+from src.api.related_plants import RelatedPlants
+from src.database.plant_schema import MISSING, entry_to_record, normalize_festival, split_terms
+from src.ui.llm_jobs import AnswerJob, LLMExecutor, stream_chat
 
 # ------------------------------------------------------------
 # 0. 页面配置（必须放在最前面）
@@ -18,62 +27,45 @@ st.set_page_config(
 st.markdown('<link rel="manifest" href="/static/manifest.json">', unsafe_allow_html=True)
 
 # ------------------------------------------------------------
-# 1. 别名映射表
+# 1-2. 知识库仓库：Excel 数据（自动定位表头）→ 紧凑二进制存储（mmap 共享）
+#      别名表、条目缓存与反向索引与问答 API 共用（src/api/knowledge_repository.py）
+#      Excel 更新后在后台重建仓库与全部索引，完成后原子替换（src/api/hot_reload.py），无需重启
 # ------------------------------------------------------------
-ALIAS_MAP = {
-    "梅花": "梅", "菊花": "菊", "兰花": "兰", "竹子": "竹",
-    "荷花": "荷（莲）", "莲花": "荷（莲）", "桂花": "桂", "牡丹花": "牡丹",
-    "杜鹃花": "杜鹃", "水仙花": "水仙", "艾草": "艾", "菖蒲叶": "菖蒲"
-}
+EXCEL_PATH = "data/荆楚植物文化图谱植物数据.xlsx"
+STORE_PATH = "data/.cache/plants.jcps"
+# 检查 Excel 是否更新的间隔（秒）
+RELOAD_CHECK_INTERVAL = float(os.getenv("RELOAD_CHECK_INTERVAL", "30"))
 
-# ------------------------------------------------------------
-# 2. 加载 Excel 数据（自动定位表头）
-# ------------------------------------------------------------
-@st.cache_data
-def load_plant_data():
-    """自动查找包含“植物中文名”的行作为表头"""
+class KnowledgeData:
+    """一版只读知识数据：仓库、mmap 存储，以及由其构建的模糊匹配、全文检索与相关植物索引"""
+
+    def __init__(self, repository):
+        self.repository = repository
+        # mmap 只读存储：概览统计、全文检索与相似植物直接按记录遍历
+        self.plant_data = repository.backend.store
+        # 植物名模糊匹配索引（错别字、繁体、拼音、括号变体）
+        self.name_resolver = FuzzyResolver(repository.list_names(), repository.aliases)
+        # 植物描述 BM25 倒排索引：问题中没有植物名时，按内容检索相关植物作为回答依据
+        self.search_index = BM25Index(self.plant_data)
+        # 相关植物表：加载时预计算每株植物的前 k 个相似植物，页面查询只读结果
+        self.related_index = RelatedPlants.build(self.plant_data)
+
+def build_knowledge_data():
+    """构建一版知识数据（可在后台线程执行，不使用页面元素）；Excel 更新后自动重建存储文件"""
+    return KnowledgeData(create_repository("excel", excel_path=EXCEL_PATH, store_path=STORE_PATH))
+
+def excel_version():
+    return str(os.stat(EXCEL_PATH).st_mtime_ns)
+
+@st.cache_resource
+def load_knowledge():
+    """进程内所有会话共享的热更新器：首次同步构建，之后 Excel 更新时在后台重建并替换"""
     try:
-        excel_path = "data/荆楚植物文化图谱植物数据.xlsx"
-        
-        # 读取前20行，定位表头行
-        df_preview = pd.read_excel(excel_path, engine="openpyxl", header=None, nrows=20)
-        header_row_idx = None
-        for idx, row in df_preview.iterrows():
-            if row.astype(str).str.contains("植物中文名").any():
-                header_row_idx = idx
-                break
-        
-        if header_row_idx is None:
-            st.error("❌ 无法在Excel中找到表头行（必须包含'植物中文名'）")
-            st.stop()
-        
-        # 以找到的行作为表头，重新读取完整数据
-        df = pd.read_excel(excel_path, engine="openpyxl", header=header_row_idx)
-        
-        # 清理列名两端的空白字符
-        df.columns = df.columns.str.strip()
-        
-        # 过滤完全空的行
-        df = df.dropna(how="all")
-        df = df.fillna("无")
-        
-        # 重映射为标准字段名
-        df["name"]            = df["植物中文名"]
-        df["latin"]           = df["植物拉丁学名"]
-        df["family"]          = df["植物科名"]
-        df["genus"]           = df["植物属名"]
-        df["distribution"]    = df["现代地理分布"]
-        df["cultural_symbol"] = df["文化象征"]
-        df["festivals"]       = df["节日"]
-        df["medicinal_value"] = df["药用价值"]
-        df["traditional_use"] = df["传统实用价值"]
-        df["ecological_significance"] = df["生态意义"]
-        
-        # 转换为字典列表，只保留有效植物（名称不为“无”）
-        plant_list = [p for p in df.to_dict("records") if p["name"] != "无"]
-        
-        st.success(f"✅ 成功加载 {len(plant_list)} 种荆楚植物数据")
-        return plant_list
+        reloader = HotReloader("Excel 知识数据", build_knowledge_data, excel_version,
+                               check_interval=RELOAD_CHECK_INTERVAL)
+        reloader.load()
+        st.success(f"✅ 成功加载 {len(reloader.current.plant_data)} 种荆楚植物数据")
+        return reloader
         
     except FileNotFoundError:
         st.error("⚠️ 未找到Excel文件！请确认 data 文件夹下有「荆楚植物文化图谱植物数据.xlsx」")
@@ -83,67 +75,106 @@ def load_plant_data():
         st.stop()
 
 # ------------------------------------------------------------
-# 3. 初始化 Groq 客户端
+# 3. 初始化大模型客户端与任务池（进程内所有会话共享）
 # ------------------------------------------------------------
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "4"))
+LLM_MAX_PENDING = int(os.getenv("LLM_MAX_PENDING", "32"))
+# 生成中页面轮询进度的间隔（秒）
+LLM_POLL_INTERVAL = 0.3
+
 @st.cache_resource
-def init_groq_client():
+def init_llm_client():
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         st.error("❌ 未配置 GROQ_API_KEY！请在 Streamlit Secrets 中填写")
         st.stop()
     try:
-        return Groq(api_key=api_key, timeout=60)
+        # 连接池与线程池同规模，复用 keep-alive（HTTP/2）连接，避免每次提问重新握手
+        return LLMClient(api_key, pool_size=LLM_WORKERS, timeout=60)
     except Exception as e:
         st.error(f"❌ Groq客户端初始化失败：{str(e)[:100]}")
         st.stop()
 
+@st.cache_resource
+def get_llm_executor():
+    """有界线程池：大模型调用不占用会话脚本线程"""
+    return LLMExecutor(workers=LLM_WORKERS, max_pending=LLM_MAX_PENDING)
+
 # ------------------------------------------------------------
 # 4. 全局数据加载
+# 每次页面运行取当前一版知识数据（本次运行内保持不变）；节流检查 Excel 是否更新，
+# 更新时在后台重建，本次运行与进行中的回答继续使用旧版本，下次运行起使用新版本
 # ------------------------------------------------------------
-plant_data = load_plant_data()
-groq_client = init_groq_client()
+knowledge_reloader = load_knowledge()
+knowledge_reloader.maybe_reload()
+knowledge = knowledge_reloader.current
+repository = knowledge.repository
+plant_data = knowledge.plant_data
+name_resolver = knowledge.name_resolver
+search_index = knowledge.search_index
+related_index = knowledge.related_index
+llm_client = init_llm_client()
+llm_executor = get_llm_executor()
 
 # ------------------------------------------------------------
 # 5. 辅助函数：获取植物详情
 # ------------------------------------------------------------
 def get_plant_detail(plant_name):
-    target_name = ALIAS_MAP.get(plant_name.strip(), plant_name.strip())
-    for plant in plant_data:
-        if plant["name"] == target_name or target_name in plant["name"]:
-            return plant
-    return plant_data[0] if plant_data else {}
+    entry = repository.get_plant(plant_name)
+    if entry is None:
+        # 模糊匹配兜底；仍无法识别时返回空详情，而不是随便给出第一种植物
+        resolved = name_resolver.resolve(plant_name.strip())
+        entry = repository.get_plant(resolved) if resolved else None
+    return entry_to_record(entry) if entry else {}
 
 # ------------------------------------------------------------
 # 6. 智能问答生成
 # ------------------------------------------------------------
-def generate_intelligent_answer(question):
-    try:
-        all_plant_names = [p["name"] for p in plant_data]
-        
-        # 识别问题中涉及的植物
-        relevant_plants = []
-        for p_name in all_plant_names:
-            if p_name in question:
-                relevant_plants.append(p_name)
-        for alias, real_name in ALIAS_MAP.items():
-            if alias in question and real_name not in relevant_plants:
-                relevant_plants.append(real_name)
-        
-        # 构建上下文
-        context = "### 荆楚植物参考数据：\n"
+def build_answer_prompt(question, trace=None):
+    """
+    检索参考数据并拼出提示词（在脚本线程执行，只涉及本地索引，毫秒级）
+    trace 不为 None 时写入问题日志需要的识别结果（植物、检索方式）
+    """
+    all_plant_names = plant_data.names()
+    
+    # 识别问题中涉及的植物
+    relevant_plants = []
+    for p_name in all_plant_names:
+        if p_name in question:
+            relevant_plants.append(p_name)
+    for alias, real_name in repository.aliases.items():
+        if alias in question and real_name not in relevant_plants:
+            relevant_plants.append(real_name)
+    if not relevant_plants:
+        fuzzy = name_resolver.resolve_in_text(question)
+        if fuzzy:
+            relevant_plants.append(fuzzy)
+    
+    # 构建上下文
+    context = "### 荆楚植物参考数据：\n"
+    if not relevant_plants:
+        # 未识别出具体植物：按问题内容全文检索最相关的植物作为参考
+        relevant_plants = [name for name, _ in search_index.search(question, top_k=3)]
         if relevant_plants:
-            for p_name in relevant_plants:
-                plant = get_plant_detail(p_name)
-                context += f"""
+            context += "（问题未指明植物，以下为按问题内容检索到的相关植物）\n"
+        if trace is not None:
+            trace["intent"] = "search" if relevant_plants else None
+    elif trace is not None:
+        trace["plant"] = relevant_plants[0]
+        trace["intent"] = "named"
+    if relevant_plants:
+        for p_name in relevant_plants:
+            plant = get_plant_detail(p_name)
+            context += f"""
 - 【植物名】：{plant.get('name', '未知')}
   拉丁学名：{plant.get('latin', '未知')} | 科属：{plant.get('family', '未知')} {plant.get('genus', '未知')}
   湖北分布：{plant.get('distribution', '未知')} | 文化象征：{plant.get('cultural_symbol', '未知')}
   关联节日：{plant.get('festivals', '未知')} | 药用价值：{plant.get('medicinal_value', '未知')}
 """
-        else:
-            context += "未匹配到具体植物，将基于荆楚植物文化常识回答。"
-        
-        prompt = f"""
+    else:
+        context += "未匹配到具体植物，将基于荆楚植物文化常识回答。"
+    
+    prompt = f"""
 你是荆楚植物文化研究员，仅围绕湖北地域植物作答：
 1. 有数据时100%基于数据，无数据时基于常识，不编造；
 2. 突出湖北/荆楚特色，语言通俗易懂，150字以内。
@@ -153,20 +184,62 @@ def generate_intelligent_answer(question):
 
 用户问题：{question}
 """
-        response = groq_client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
-            temperature=0.1,
-            max_tokens=200
-        )
-        return response.choices[0].message.content.strip()
+    return prompt
+
+def prepare_answer(question):
+    """拼出提示词并开始记录本次问答的追踪信息（识别结果、检索耗时、缓存命中）"""
+    trace = {"plant": None, "intent": None, "route": "llm", "stages": {}, "cache_hit": None}
+    hits, misses = repository.thread_counters()
+    start = time.perf_counter()
+    prompt = build_answer_prompt(question, trace)
+    trace["stages"]["prompt_ms"] = (time.perf_counter() - start) * 1000
+    new_hits, new_misses = repository.thread_counters()
+    if new_hits + new_misses > hits + misses:
+        trace["cache_hit"] = new_misses == misses
+    return prompt, trace
+
+def _generate_answer(job, prompt, trace):
+    """在任务池线程中流式生成回答（受本次提问的时限约束），完成后写入问题日志（只入队，不阻塞）"""
+    start = time.perf_counter()
+    try:
+        with deadline_scope(job.deadline):
+            answer = stream_chat(llm_client, job, prompt, model="chat", max_tokens=200)
+    except DeadlineExceeded as e:
+        # 保留已生成的部分，提示超时
+        trace["route"] = "timeout"
+        trace["timeout"] = e.to_dict()
+        answer = (job.text + "\n\n" if job.text else "") + f"⏱️ 回答超时（{e.stage} 阶段），请稍后重试或换个问法"
     except Exception as e:
+        if job.cancel_event.is_set():
+            raise
+        # 失败提示只展示给用户，日志只记录失败原因（不计入重放的回答一致率）
+        trace["route"] = "llm_error"
+        trace["error"] = str(e)[:100]
+        trace["stages"]["llm_ms"] = (time.perf_counter() - start) * 1000
+        get_question_log().record(job.question, "streamlit", **trace)
         return f"💡 问答暂无法响应，错误原因：{str(e)[:80]}"
+    trace["stages"]["llm_ms"] = (time.perf_counter() - start) * 1000
+    get_question_log().record(job.question, "streamlit", answer=answer, **trace)
+    return answer
+
+def submit_answer_job(question):
+    """提交回答任务；同一会话的旧任务先取消。任务池已满时返回 None"""
+    previous = st.session_state.pop("llm_job", None)
+    if previous is not None:
+        previous.cancel()
+    # 时限从提问时刻开始计算，包含在任务池中排队的时间
+    deadline = Deadline(ANSWER_DEADLINE)
+    prompt, trace = prepare_answer(question)
+    job = llm_executor.submit(AnswerJob(question, deadline), lambda j: _generate_answer(j, prompt, trace))
+    if job is not None:
+        st.session_state["llm_job"] = job
+    return job
 
 # ------------------------------------------------------------
 # 7. 页面样式（美化）
+# 样式只在整页运行时注入一次；各片段局部重跑时不会重复发送
 # ------------------------------------------------------------
-st.markdown("""
+PAGE_CSS = """
 <style>
     * {margin: 0; padding: 0; box-sizing: border-box;}
     .main {background-color: #f5f7f9 !important; padding: 0 20px !important;}
@@ -259,10 +332,176 @@ st.markdown("""
         margin: 30px 0 20px !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(PAGE_CSS, unsafe_allow_html=True)
 
 # ------------------------------------------------------------
-# 8. 页面主体布局
+# 8. 派生数据与卡片缓存
+# 数据概览按数据版本缓存（所有会话共享）；渲染好的卡片 HTML 与最近一次回答保存在会话状态中
+# ------------------------------------------------------------
+@st.cache_data
+def compute_overview(_plant_store, data_version):
+    """数据概览统计；data_version 作为缓存键，数据不变时整个进程只计算一次"""
+    families, festivals, regions = set(), set(), set()
+    for plant in _plant_store:
+        families.add(plant.get("family", "未知"))
+        festivals.update(normalize_festival(t) for t in split_terms(plant.get("festivals", MISSING)))
+        regions.update(split_terms(plant.get("distribution", MISSING)))
+    return {
+        "plants": len(_plant_store),
+        "families": len(families),
+        "festivals": len(festivals),
+        "regions": len(regions),
+    }
+
+@st.cache_data
+def plant_names_sorted(_plant_store, data_version):
+    """下拉框选项（按名称排序），按数据版本缓存"""
+    return _plant_store.names()
+
+# 卡片字段：(标题, 记录字段)
+FEATURED_CARD_FIELDS = [
+    ("湖北分布", "distribution"),
+    ("文化象征", "cultural_symbol"),
+    ("关联节日", "festivals"),
+    ("药用价值", "medicinal_value"),
+]
+DETAIL_CARD_FIELDS = FEATURED_CARD_FIELDS + [
+    ("传统用途", "traditional_use"),
+    ("生态意义", "ecological_significance"),
+]
+
+def render_plant_card(plant, subtitle, fields):
+    """植物卡片 HTML；按 (数据版本, 植物, 卡片类型) 缓存在会话状态中，重复查看不再重新格式化"""
+    cache = st.session_state.setdefault("card_html", {})
+    key = (plant_data.version, plant.get("name", "未知"), subtitle)
+    html = cache.get(key)
+    if html is None:
+        rows = "".join(
+            f"<p><strong>{label}</strong>：{plant.get(field, '未知')}</p>" for label, field in fields
+        )
+        html = f"""
+        <div class="plant-card">
+            <h3>{plant.get('name', '未知')} · {subtitle}</h3>
+            <p><strong>拉丁学名</strong>：{plant.get('latin', '未知')}</p>
+            <p><strong>科属分类</strong>：{plant.get('family', '未知')} {plant.get('genus', '未知')}</p>
+            {rows}
+        </div>
+        """
+        cache[key] = html
+    return html
+
+# ------------------------------------------------------------
+# 9. 页面片段：每个片段内的控件只触发该片段重跑，不再重跑整页
+# ------------------------------------------------------------
+@st.fragment
+def sidebar_stats():
+    st.markdown("### 📊 数据概览")
+    overview = compute_overview(plant_data, plant_data.version)
+    col_s1, col_s2 = st.columns(2)
+    with col_s1:
+        st.metric("🌿 植物总数", overview["plants"])
+        st.metric("🎉 关联节日", overview["festivals"])
+    with col_s2:
+        st.metric("🌳 科属数量", overview["families"])
+        st.metric("📍 湖北分布区", overview["regions"])
+
+@st.fragment
+def qa_panel():
+    st.markdown("### 🧠 智能文化问答")
+    user_question = st.text_input(
+        label="请输入你的问题",
+        placeholder="例如：桂的文化象征和湖北分布？",
+        key="user_question",
+        label_visibility="collapsed"
+    )
+    if st.button("获取精准回答", type="primary"):
+        question = user_question.strip()
+        last = st.session_state.get("last_answer")
+        job = st.session_state.get("llm_job")
+        if not question:
+            st.warning("⚠️ 请输入有效问题！")
+        elif job is not None and job.question == question:
+            pass  # 同一问题正在生成，继续等待
+        elif job is None and last is not None and last["question"] == question:
+            pass  # 同一问题重复点击直接展示上次回答
+        elif submit_answer_job(question) is None:
+            # 新问题会取代本会话尚未完成的旧问题
+            st.warning("⚠️ 当前提问人数较多，请稍后再试")
+
+    if collect_answer_job() is not None:
+        # 生成中：由定时片段轮询进度，期间本片段与其他控件照常响应
+        answer_progress()
+        return
+    last = st.session_state.get("last_answer")
+    if last is not None:
+        show_answer(last["question"], last["answer"])
+
+def collect_answer_job():
+    """返回本会话仍在生成的任务；已完成的任务收下结果并清除"""
+    job = st.session_state.get("llm_job")
+    if job is not None and job.done():
+        st.session_state.pop("llm_job")
+        answer = job.result()
+        if answer is not None:
+            st.session_state["last_answer"] = {"question": job.question, "answer": answer}
+        job = None
+    return job
+
+def show_answer(question, text):
+    st.markdown("#### 📝 专属回答")
+    st.caption(f"问题：{question}")
+    st.write(text)
+
+@st.fragment(run_every=LLM_POLL_INTERVAL)
+def answer_progress():
+    """
+    生成中的回答：按固定间隔只重跑本片段拉取已生成的片段
+    生成结束后重跑一次页面，问答片段直接展示完整回答、不再渲染本片段，定时轮询随之停止
+    """
+    job = collect_answer_job()
+    if job is None:
+        st.rerun()
+    show_answer(job.question, (job.text or "🔍 正在检索数据并生成回答") + " ▌")
+
+@st.fragment
+def featured_plant():
+    st.markdown("### 🌸 今日推荐植物")
+    if not plant_data:
+        st.warning("⚠️ 暂无有效植物数据")
+        return
+    # 每个会话只抽取一次推荐植物，切换控件不会让推荐跳变
+    plant = plant_data.get(st.session_state.get("featured_name", ""))
+    if plant is None:
+        plant = plant_data[random.randrange(len(plant_data))]
+        st.session_state["featured_name"] = plant["name"]
+    st.markdown(render_plant_card(plant, "荆楚特色植物", FEATURED_CARD_FIELDS), unsafe_allow_html=True)
+
+@st.fragment
+def catalog_browser():
+    st.markdown("### 📜 植物名录查询")
+    if not plant_data:
+        st.warning("⚠️ 暂无有效植物数据")
+        return
+    selected_plant = st.selectbox(
+        label="选择植物查看详细信息",
+        options=plant_names_sorted(plant_data, plant_data.version),
+        key="plant_selector",
+        label_visibility="collapsed"
+    )
+    if selected_plant:
+        plant_detail = get_plant_detail(selected_plant)
+        st.markdown(render_plant_card(plant_detail, "详细信息", DETAIL_CARD_FIELDS), unsafe_allow_html=True)
+
+        # 相关植物（按科属、节日、文化象征、分布区域的预计算相似度）
+        related = related_index.related(plant_detail.get("name", ""), 5)
+        if related:
+            st.markdown("#### 🔗 相关植物")
+            for name, score in related:
+                st.markdown(f"- **{name}** · 相似度 {score:.2f}")
+
+# ------------------------------------------------------------
+# 10. 页面主体布局
 # ------------------------------------------------------------
 st.title("🌿 荆楚植物智能问答系统")
 st.markdown("##### 基于**荆楚植物文化图谱**原始数据开发 | 湖北地域专属植物文化查询")
@@ -272,30 +511,8 @@ st.markdown("---")
 with st.sidebar:
     st.markdown("### 🌱 系统说明")
     st.markdown("本系统基于荆楚植物文化图谱原始Excel数据开发，提供植物详情查询和智能文化问答。")
-
     st.markdown("---")
-    st.markdown("### 📊 数据概览")
-    total_plants = len(plant_data)
-    total_families = len(set([p.get("family", "未知") for p in plant_data]))
-    total_festivals = len(set([
-        f for p in plant_data
-        for f in p.get("festivals", "无").split("、")
-        if p.get("festivals", "无") != "无"
-    ]))
-    total_hubei_dist = len(set([
-        d for p in plant_data
-        for d in p.get("distribution", "无").split("；")
-        if p.get("distribution", "无") != "无"
-    ]))
-
-    col_s1, col_s2 = st.columns(2)
-    with col_s1:
-        st.metric("🌿 植物总数", total_plants)
-        st.metric("🎉 关联节日", total_festivals)
-    with col_s2:
-        st.metric("🌳 科属数量", total_families)
-        st.metric("📍 湖北分布区", total_hubei_dist)
-
+    sidebar_stats()
     st.markdown("---")
     st.markdown("### ❓ 提问示例")
     st.markdown("- 梅在荆楚文化中的象征意义？")
@@ -303,72 +520,16 @@ with st.sidebar:
     st.markdown("- 荷（莲）在湖北的分布区域？")
 
 # --- 智能问答区域 ---
-st.markdown("### 🧠 智能文化问答")
-user_question = st.text_input(
-    label="请输入你的问题",
-    placeholder="例如：桂的文化象征和湖北分布？",
-    key="user_question",
-    label_visibility="collapsed"
-)
-if st.button("获取精准回答", type="primary"):
-    if not user_question.strip():
-        st.warning("⚠️ 请输入有效问题！")
-    else:
-        with st.spinner("🔍 正在检索数据..."):
-            answer = generate_intelligent_answer(user_question)
-            st.markdown("#### 📝 专属回答")
-            st.write(answer)
+qa_panel()
 st.markdown("---")
 
 # --- 植物卡片（今日推荐 + 植物名录）---
 col_card1, col_card2 = st.columns(2, gap="medium")
-
 with col_card1:
-    st.markdown("### 🌸 今日推荐植物")
-    if plant_data:
-        random_plant = random.choice(plant_data)
-        st.markdown(f"""
-        <div class="plant-card">
-            <h3>{random_plant.get('name', '未知')} · 荆楚特色植物</h3>
-            <p><strong>拉丁学名</strong>：{random_plant.get('latin', '未知')}</p>
-            <p><strong>科属分类</strong>：{random_plant.get('family', '未知')} {random_plant.get('genus', '未知')}</p>
-            <p><strong>湖北分布</strong>：{random_plant.get('distribution', '未知')}</p>
-            <p><strong>文化象征</strong>：{random_plant.get('cultural_symbol', '未知')}</p>
-            <p><strong>关联节日</strong>：{random_plant.get('festivals', '未知')}</p>
-            <p><strong>药用价值</strong>：{random_plant.get('medicinal_value', '未知')}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        st.warning("⚠️ 暂无有效植物数据")
-
+    featured_plant()
 with col_card2:
-    st.markdown("### 📜 植物名录查询")
-    if plant_data:
-        plant_names_sorted = sorted([p["name"] for p in plant_data])
-        selected_plant = st.selectbox(
-            label="选择植物查看详细信息",
-            options=plant_names_sorted,
-            key="plant_selector",
-            label_visibility="collapsed"
-        )
-        if selected_plant:
-            plant_detail = get_plant_detail(selected_plant)
-            st.markdown(f"""
-            <div class="plant-card">
-                <h3>{plant_detail.get('name', '未知')} · 详细信息</h3>
-                <p><strong>拉丁学名</strong>：{plant_detail.get('latin', '未知')}</p>
-                <p><strong>科属分类</strong>：{plant_detail.get('family', '未知')} {plant_detail.get('genus', '未知')}</p>
-                <p><strong>湖北分布</strong>：{plant_detail.get('distribution', '未知')}</p>
-                <p><strong>文化象征</strong>：{plant_detail.get('cultural_symbol', '未知')}</p>
-                <p><strong>关联节日</strong>：{plant_detail.get('festivals', '未知')}</p>
-                <p><strong>药用价值</strong>：{plant_detail.get('medicinal_value', '未知')}</p>
-                <p><strong>传统用途</strong>：{plant_detail.get('traditional_use', '未知')}</p>
-                <p><strong>生态意义</strong>：{plant_detail.get('ecological_significance', '未知')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.warning("⚠️ 暂无有效植物数据")
+    catalog_browser()
 
 # --- 页脚 ---
 st.markdown("---")
-st.markdown('<p class="footer">💡 数据来源：荆楚植物文化图谱原始Excel数据 | 技术支持：Streamlit + Groq</p>', unsafe_allow_html=True)
\ No newline at end of file
+st.markdown('<p class="footer">💡 数据来源：荆楚植物文化图谱原始Excel数据 | 技术支持：Streamlit + Groq</p>', unsafe_allow_html=True)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共夹具：API 使用 Excel 后端，数据文件为真实数据的临时副本（可在测试中修改后触发热更新）
+不需要 Neo4j 与大模型服务；环境变量须在导入 src.api 模块之前设置
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["NEO4J_URI"] = ""
+os.environ["QUESTION_LOG_DIR"] = ""
+os.environ["RATE_LIMIT_ANSWER"] = "0"
+os.environ["RATE_LIMIT_READ"] = "0"
+os.environ["RELOAD_CHECK_INTERVAL"] = "0"
+
+from src.database import excel_ingest  # noqa: E402
+from src.database.excel_ingest import iter_excel_records  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def records():
+    """真实数据的标准字段记录"""
+    return list(iter_excel_records(excel_ingest.DEFAULT_EXCEL_PATH))
+
+
+@pytest.fixture(scope="session")
+def excel_copy(tmp_path_factory):
+    """真实数据文件的临时副本（Excel 后端的数据文件与 .jcps 存储都指向临时目录）"""
+    workdir = tmp_path_factory.mktemp("data")
+    path = str(workdir / "plants.xlsx")
+    shutil.copy(excel_ingest.DEFAULT_EXCEL_PATH, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def api(excel_copy):
+    """Excel 后端的 API（TestClient）；同一会话内共用一个应用实例"""
+    from fastapi.testclient import TestClient
+    from src.api import knowledge_repository
+    mp = pytest.MonkeyPatch()
+    mp.setattr(knowledge_repository, "KNOWLEDGE_BACKEND", "excel")
+    mp.setattr(excel_ingest, "DEFAULT_EXCEL_PATH", excel_copy)
+    mp.setattr(excel_ingest, "DEFAULT_STORE_PATH", os.path.join(os.path.dirname(excel_copy), "plants.jcps"))
+    from src.api import api_server
+    with TestClient(api_server.app) as client:
+        yield client
+    mp.undo()
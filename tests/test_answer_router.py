@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""问答路由：大模型调用失败单独计数，不计入耗时统计，失败提示不写入问题日志；其他错误同样记入日志"""
+import pytest
+
+from src.api import serving
+from src.api.answer_router import GRAPH, LLM, LLM_ERROR, RouteStats
+
+OPEN_QUESTION = "荆楚地区的人为什么喜欢在庭院里种花？"
+
+
+class FailingClient:
+    def chat(self, prompt, timeout=None):
+        raise ConnectionError("上游服务不可用")
+
+    async def achat(self, prompt, timeout=None):
+        raise ConnectionError("上游服务不可用")
+
+
+class RecordingLog:
+    def __init__(self):
+        self.entries = []
+
+    def record(self, question, source, answer="", **fields):
+        self.entries.append(dict(fields, question=question, source=source, answer=answer))
+
+
+@pytest.fixture
+def router(api, monkeypatch):
+    router = serving.get_router()
+    monkeypatch.setattr(router, "stats", RouteStats())
+    return router
+
+
+def test_llm_failure_is_flagged(router, monkeypatch):
+    monkeypatch.setattr(router.llm, "llm", FailingClient())
+    answer, trace = router.answer(OPEN_QUESTION)
+    assert trace["route"] == LLM_ERROR and "上游服务不可用" in trace["error"]
+    assert answer.startswith("抱歉")
+    report = router.stats.report()
+    assert report["routes"][LLM]["count"] == 1 and report["routes"][LLM]["failures"] == 1
+    # 失败不计入平均耗时，也就不参与节省延迟的估算
+    assert report["routes"][LLM]["avg_ms"] is None and router.stats.seconds[LLM] == 0.0
+
+
+def test_api_keeps_failure_text_out_of_question_log(api, router, monkeypatch):
+    from src.api import api_server
+    log = RecordingLog()
+    monkeypatch.setattr(router.llm, "llm", FailingClient())
+    monkeypatch.setattr(api_server, "get_question_log", lambda: log)
+    body = api.post("/api/answer", json={"question": OPEN_QUESTION}).json()
+    assert body["code"] == 200 and body["route"] == LLM_ERROR and body["data"].startswith("抱歉")
+    (entry,) = log.entries
+    assert entry["route"] == LLM_ERROR and entry["answer"] == "" and "上游服务不可用" in entry["error"]
+
+    stats = api.get("/api/router_stats").json()["data"]
+    assert stats["routes"][LLM]["failures"] == 1 and stats["estimated_saved_ms"] is None
+
+
+def test_graph_route_still_recorded(router):
+    answer, trace = router.answer("梅的象征意义是什么")
+    assert trace["route"] == GRAPH and answer
+    assert router.stats.report()["routes"][GRAPH]["count"] == 1
+
+
+def test_api_logs_unexpected_errors(api, router, monkeypatch):
+    from src.api import api_server
+    log = RecordingLog()
+
+    async def broken(question):
+        raise RuntimeError("路由内部错误")
+    monkeypatch.setattr(router, "answer_async", broken)
+    monkeypatch.setattr(api_server, "get_question_log", lambda: log)
+    body = api.post("/api/answer", json={"question": OPEN_QUESTION}).json()
+    assert body["code"] == 500
+    (entry,) = log.entries
+    assert entry["route"] == "error" and entry["answer"] == "" and "路由内部错误" in entry["error"]
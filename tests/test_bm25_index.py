@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""植物描述全文检索：相关问题返回命中完整词的植物，无关问题返回空列表"""
+import pytest
+
+from src.api.bm25_index import BM25Index
+
+
+@pytest.fixture(scope="module")
+def index(records):
+    return BM25Index(records)
+
+
+@pytest.mark.parametrize("question, words", [
+    ("哪些植物象征长寿", ["长寿"]),
+    ("清热解毒的植物有哪些", ["清热", "解毒"]),
+    ("神农架有什么植物", ["神农架"]),
+])
+def test_relevant_question_hits_whole_word(index, records, question, words):
+    results = index.search(question)
+    assert results
+    texts = {r["name"]: " ".join(str(r[f]) for f in index.fields) for r in records}
+    assert all(any(word in texts[name] for word in words) for name, _ in results)
+
+
+@pytest.mark.parametrize("question", ["你好", "今天天气如何", "谁是美国总统", "讲个笑话"])
+def test_unrelated_question_returns_nothing(index, question):
+    assert index.search(question) == []
+
+
+def test_single_character_overlap_is_not_enough():
+    docs = [{"name": "艾", "traditional_use": "端午悬挂驱虫"}, {"name": "梧桐", "cultural_symbol": "好客"}]
+    index = BM25Index(docs, fields=["traditional_use", "cultural_symbol"])
+    assert index.search("你好") == []
+    assert [name for name, _ in index.search("哪些植物能驱虫")] == ["艾"]
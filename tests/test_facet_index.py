@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""分面位图索引：match / positions / facet_counts 与逐条扫描的结果一致"""
+import itertools
+import random
+
+import pytest
+
+from src.api.facet_index import FACETS, PROVINCE_WIDE, FacetIndex, normalize_region
+
+
+def _scan(records, filters, op="and"):
+    """逐条扫描的参考实现：返回命中记录的下标"""
+    def facet_ok(values, facet, groups):
+        if facet == "region":
+            values = set(values)
+            return all(any(normalize_region(v) in values or (normalize_region(v) != PROVINCE_WIDE
+                                                             and PROVINCE_WIDE in values) for v in group)
+                       for group in groups)
+        return all(any(v in values for v in group) for group in groups)
+
+    hits = []
+    for i, record in enumerate(records):
+        oks = [facet_ok(FACETS[facet](record), facet, groups) for facet, groups in filters.items()]
+        if not oks or (any(oks) if op == "or" else all(oks)):
+            hits.append(i)
+    return hits
+
+
+def _scan_counts(records, hits):
+    counts = {facet: {} for facet in FACETS}
+    for i in hits:
+        for facet, extract in FACETS.items():
+            for value in dict.fromkeys(v for v in extract(records[i]) if v):
+                counts[facet][value] = counts[facet].get(value, 0) + 1
+    return counts
+
+
+def _random_filters(rng, index):
+    filters = {}
+    for facet in rng.sample(list(FACETS), rng.randint(1, 3)):
+        values = list(index.values[facet]) or ["不存在"]
+        filters[facet] = [rng.sample(values, min(len(values), rng.randint(1, 2))) + (["不存在"] if rng.random() < 0.2 else [])
+                          for _ in range(rng.randint(1, 2))]
+    return filters
+
+
+@pytest.fixture(scope="module")
+def sorted_records(records):
+    return sorted(records, key=lambda r: r["name"])
+
+
+@pytest.fixture(scope="module")
+def synthetic_records():
+    from tools.generate_catalog import iter_synthetic_records
+    return sorted(iter_synthetic_records(3000, seed=1), key=lambda r: r["name"])
+
+
+@pytest.mark.parametrize("dataset", ["sorted_records", "synthetic_records"])
+def test_match_positions_counts_against_scan(dataset, request):
+    records = request.getfixturevalue(dataset)
+    index = FacetIndex.build(records)
+    rng = random.Random(0)
+    for filters, op in itertools.product([_random_filters(rng, index) for _ in range(40)], ["and", "or"]):
+        bits = index.match(filters, op)
+        expected = _scan(records, filters, op)
+        assert list(index.positions(bits)) == expected, filters
+        assert index.count(bits) == len(expected)
+        top = len(index.bits)
+        counts = index.facet_counts(bits, top=top)
+        assert counts == {facet: {k: v for k, v in c.items() if v} for facet, c in _scan_counts(records, expected).items()}
+
+
+def test_no_filters_match_all(sorted_records):
+    index = FacetIndex.build(sorted_records)
+    assert index.count(index.match({})) == len(sorted_records)
+    assert {f: sum(c.values()) for f, c in index.facet_counts(index.match({}), top=10 ** 6).items()} == \
+        {f: sum(index.value_counts(f).values()) for f in FACETS}
+
+
+def test_region_normalization_and_unknown_facet(sorted_records):
+    index = FacetIndex.build(sorted_records)
+    assert index.count(index.bitset("region", "恩施州")) == index.count(index.bitset("region", "恩施"))
+    with pytest.raises(ValueError):
+        index.bitset("color", "红")
+
+
+def test_search_endpoint_uses_excel_backend(api, sorted_records):
+    expected = [r["name"] for r in sorted_records if r["family"] == "蔷薇科"]
+    data = api.get("/api/search", params={"family": "蔷薇科", "size": 100}).json()["data"]
+    assert expected and data["total"] == len(expected)
+    assert [p["name"] for p in data["plants"]] == expected
+    assert data["facets"]["family"] == {"蔷薇科": len(expected)}
+
+
+def test_related_endpoint_uses_excel_backend(api):
+    body = api.get("/api/related", params={"plant": "兰"}).json()
+    assert body["code"] == 200 and body["data"]
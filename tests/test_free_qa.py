@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""规则问答：多植物识别与对比（复合词不算多植物）"""
+import pytest
+
+from src.api.free_qa_system import PlantQASystem
+from src.api.knowledge_repository import CachingRepository, InMemoryRepository
+
+
+@pytest.fixture(scope="module")
+def qa(records):
+    return PlantQASystem(repository=CachingRepository(InMemoryRepository.from_records(records)))
+
+
+@pytest.mark.parametrize("question, plants", [
+    ("梅和兰的象征有什么不同", ["梅", "兰"]),
+    ("端午用的艾和菖蒲哪个药用价值高", ["艾", "菖蒲"]),
+    ("桂花、菊花、梅花分别象征什么", ["桂", "菊", "梅"]),
+    ("松与柏的分布", ["松", "柏"]),
+    ("梅兰竹菊分别属于什么科", ["梅", "兰", "竹", "菊"]),
+])
+def test_multiple_plants(qa, question, plants):
+    assert qa.resolve_plants(question) == plants
+    assert "对比" in qa.answer(question)
+
+
+@pytest.mark.parametrize("question, plant", [
+    ("菊花茶有什么功效", "菊"),
+    ("艾草泡茶有什么作用", "艾"),
+    ("桂花茶怎么泡", "桂"),
+    ("梅的象征是什么", "梅"),
+])
+def test_compound_words_are_single_plant(qa, question, plant):
+    assert qa.resolve_plants(question) == [plant]
+    assert "对比" not in qa.answer(question)
+
+
+def test_compound_then_separate_mention(qa):
+    assert qa.resolve_plants("菊花茶和梅花茶哪个好") == ["菊", "梅"]
+
+
+def test_compound_medicinal_answer_matches_single_plant(qa):
+    assert qa.answer("菊花茶有什么功效") == qa.answer_intent("菊", "medicinal")
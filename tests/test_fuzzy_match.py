@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""模糊匹配：删除变体、编辑距离索引与拼音索引"""
+from itertools import combinations
+
+import pytest
+
+from src.api import serving
+from src.api.fuzzy_match import DeleteIndex, FuzzyResolver, _deletes, levenshtein, max_edits, pinyin_max_edits
+
+
+def _brute_deletes(term, distance):
+    variants = {term}
+    for d in range(1, min(distance, len(term) - 1) + 1):
+        for positions in combinations(range(len(term)), d):
+            variants.add("".join(ch for i, ch in enumerate(term) if i not in positions))
+    return variants
+
+
+@pytest.mark.parametrize("term", ["梅", "杜鹃", "神农架细叶紫花杜鹃", "shennongjiadujuan"])
+@pytest.mark.parametrize("distance", [0, 1, 2])
+def test_deletes_match_brute_force(term, distance):
+    assert _deletes(term, distance) == _brute_deletes(term, distance)
+
+
+def test_delete_index_matches_levenshtein_scan():
+    keys = ["杜鹃", "紫花杜鹃", "白花杜鹃", "神农架紫花杜鹃", "菖蒲", "石菖蒲", "银杏", "梧桐"]
+    index = DeleteIndex(keys)
+    for term in ["紫花杜娟", "白花杜鹃花", "神农架紫杜鹃", "石昌蒲", "银否", "梧"]:
+        limit = max_edits(len(term))
+        expected = sorted(k for k in keys if levenshtein(term, k, limit) <= min(limit, max_edits(len(k))))
+        assert sorted(k for _, k in index.lookup(term)) == expected
+
+
+def test_pinyin_distance_is_capped():
+    assert pinyin_max_edits(3) == 0
+    assert pinyin_max_edits(30) == 1
+
+
+def test_resolver_pinyin_and_typos():
+    pytest.importorskip("pypinyin")
+    resolver = FuzzyResolver(["梅", "菖蒲", "神农架紫花杜鹃"], {"梅花": "梅"})
+    assert resolver.resolve("meihua") == "梅"
+    assert resolver.resolve("changpu") == "菖蒲"
+    assert resolver.resolve("cangpu") == "菖蒲"
+    assert resolver.resolve_in_text("神农架紫花杜娟有什么象征") == "神农架紫花杜鹃"
+
+
+def test_worker_uses_name_index_from_snapshot(api):
+    # 植物名与模糊匹配索引在知识快照中构建一次，问答系统直接使用，不再按仓库重建
+    snapshot = serving.get_snapshot()
+    assert serving.get_router().structured.index is snapshot.name_index
+    assert len(snapshot.name_index.plant_names) == len(snapshot.plant_names)
+
+
+def test_fuzzy_in_text_matches_window_scan():
+    # 跳过含 2 个以上未知字的窗口不改变结果：与逐窗口查索引的结果一致
+    names = ["神农架紫花杜鹃", "紫花杜鹃", "石菖蒲", "白花银杏", "垂枝梧桐"]
+    resolver = FuzzyResolver(names)
+
+    def scan(text):
+        best = None
+        for start, window in resolver._windows(text, FuzzyResolver.MIN_FUZZY_LEN_IN_TEXT - 1, extra=1):
+            for dist, key in resolver._index.lookup(window, max_distance=1):
+                if len(key) >= FuzzyResolver.MIN_FUZZY_LEN_IN_TEXT:
+                    best = min(best or (dist, -len(key), start, key), (dist, -len(key), start, key))
+                    break
+        return best and best[3]
+
+    for text in ["神农架紫花杜娟有什么象征", "请问石昌蒲的药用价值", "白花银否在哪里", "今天天气怎么样",
+                 "垂枝梧同和紫花杜娟有什么不同"]:
+        assert resolver._fuzzy_in_text(text) == scan(text)
+    assert resolver.resolve_in_text("今天天气怎么样") is None
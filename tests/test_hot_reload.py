@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""热更新：修改 Excel 后重建，快照、ETag 与缓存接口随之更新；gunicorn 下由主进程重建并重启 worker"""
+import os
+import signal
+import threading
+import time
+
+from openpyxl import load_workbook
+
+from src.api import serving
+from src.database.plant_schema import HEADER_KEY
+
+
+def _rename_plant(path: str, old: str, new: str):
+    workbook = load_workbook(path)
+    sheet = workbook.active
+    header = next(cell for row in sheet.iter_rows() for cell in row if cell.value == HEADER_KEY)
+    for (cell,) in sheet.iter_rows(min_row=header.row + 1, min_col=header.column, max_col=header.column):
+        if cell.value == old:
+            cell.value = new
+    workbook.save(path)
+    # 保证修改时间变化（部分文件系统时间精度较低）
+    mtime = time.time() + 2
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshot_built_from_excel_backend(api, records):
+    health = api.get("/api/health").json()["data"]
+    assert health["plant_count"] == len(records)
+    assert api.get("/api/plant_list").json()["data"] == sorted(r["name"] for r in records)
+
+
+def test_reload_changes_etag_and_cached_list(api, excel_copy):
+    first = api.get("/api/plant_list")
+    etag = first.headers["etag"]
+    assert "梅" in first.json()["data"]
+    assert api.get("/api/plant_list", headers={"If-None-Match": etag}).status_code == 304
+
+    _rename_plant(excel_copy, "梅", "梅新")
+    assert serving._reloader.reload(wait=True)
+    assert serving._reloader.last_error is None
+
+    changed = api.get("/api/plant_list", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    names = changed.json()["data"]
+    assert "梅新" in names and "梅" not in names
+    assert serving.get_snapshot().get_plant("梅新") is not None
+
+
+def test_master_rebuild_swaps_shared_snapshot(api, excel_copy, monkeypatch):
+    # 测试进程扮演 gunicorn 主进程：结束后还原快照与版本，不冻结测试进程的对象
+    monkeypatch.setattr(serving, "_snapshot", serving.get_snapshot())
+    monkeypatch.setattr(serving, "_shared_version", serving._shared_version)
+    monkeypatch.setattr(serving, "freeze_shared_memory", lambda: None)
+    before = serving.get_snapshot()
+    _rename_plant(excel_copy, "兰", "兰新")
+    assert serving.shared_data_version() != serving._shared_version
+    assert serving.rebuild_shared_snapshot()
+    assert serving.shared_data_version() == serving._shared_version
+    rebuilt = serving.get_snapshot()
+    assert rebuilt is not before and rebuilt.version != before.version
+    assert rebuilt.get_plant("兰新") is not None and rebuilt.get_plant("兰") is None
+
+
+def test_master_rebuild_failure_keeps_snapshot(api, monkeypatch):
+    monkeypatch.setattr(serving, "freeze_shared_memory", lambda: None)
+
+    def broken(alias_map, repo=None):
+        raise RuntimeError("数据文件损坏")
+    monkeypatch.setattr(serving, "build_snapshot", broken)
+    before, version = serving.get_snapshot(), serving._shared_version
+    assert not serving.rebuild_shared_snapshot()
+    assert serving.get_snapshot() is before and serving._shared_version == version
+
+
+def test_master_watcher_signals_once_per_version(monkeypatch):
+    versions = iter(["v1", "v2", "v2", "v2", "v3"] + ["v3"] * 100)
+    monkeypatch.setattr(serving, "_shared_version", "v1")
+    monkeypatch.setattr(serving, "shared_data_version", lambda: next(versions))
+    changes, done = [], threading.Event()
+
+    def on_change():
+        changes.append(time.perf_counter())
+        if len(changes) == 2:
+            done.set()
+    serving.start_master_watcher(on_change, interval=0.01)
+    assert done.wait(5)
+    time.sleep(0.1)
+    # v1 为当前版本不触发；v2 重建失败（版本未更新）也只通知一次，v3 再通知一次
+    assert len(changes) == 2
+
+
+def test_admin_reload_signals_master(api, monkeypatch):
+    from src.api import api_server
+    sent = []
+    monkeypatch.setattr(serving, "_master_pid", 4321)
+    monkeypatch.setattr(serving.os, "kill", lambda pid, sig: sent.append((pid, sig)))
+    monkeypatch.setattr(api_server, "ADMIN_TOKEN", "secret")
+    response = api.post("/api/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200 and response.json()["code"] == 202
+    assert response.json()["data"]["mode"] == "master"
+    assert sent == [(4321, signal.SIGHUP)]
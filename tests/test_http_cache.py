@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""响应序列化：orjson 与标准库实现对无法直接序列化的值行为一致"""
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.api import http_cache
+
+PAYLOAD = {"code": 200, "data": {"名称": "梅", "score": Decimal("1.5"), 1: "非字符串键"}, "msg": "success"}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_falls_back_to_str(monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(http_cache, "orjson", None)
+    body = json.loads(http_cache.dumps(PAYLOAD))
+    assert body["data"] == {"名称": "梅", "score": "1.5", "1": "非字符串键"}
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""仓库接口：抽象基类，漏实现接口方法的后端在实例化时即报错"""
+import inspect
+
+import pytest
+
+from src.api.knowledge_repository import (
+    CachingRepository, EmbeddedRepository, ExcelRepository, InMemoryRepository, KnowledgeRepository,
+    Neo4jRepository,
+)
+
+
+def test_interface_is_abstract():
+    assert inspect.isabstract(KnowledgeRepository)
+    with pytest.raises(TypeError):
+        KnowledgeRepository()
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NamesOnly(KnowledgeRepository):
+        def version(self):
+            return "v1"
+
+        def list_names(self):
+            return ["梅"]
+
+    with pytest.raises(TypeError, match="get_many"):
+        NamesOnly()
+
+
+@pytest.mark.parametrize("backend", [InMemoryRepository, ExcelRepository, EmbeddedRepository,
+                                     Neo4jRepository, CachingRepository])
+def test_backends_implement_interface(backend):
+    assert not inspect.isabstract(backend)
+
+
+def test_in_memory_backend(records):
+    repo = InMemoryRepository.from_records(records[:3], version="v1")
+    names = [r["name"] for r in records[:3]]
+    assert repo.version() == "v1" and sorted(repo.list_names()) == sorted(names)
+    assert repo.get_plant(names[0])["name"] == names[0] and repo.get_plant("不存在的植物") is None
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""大模型客户端：请求超时按时限收紧，且 SDK 不会在时限之外重试"""
+import time
+
+import httpx
+import pytest
+
+from src.api.deadline import Deadline, DeadlineExceeded, deadline_scope
+from src.api.llm_client import LLMClient
+
+
+def test_sdk_retries_disabled():
+    client = LLMClient(api_key="test")
+    try:
+        assert client.client.max_retries == 0
+        assert client.async_client.max_retries == 0
+    finally:
+        client.close()
+
+
+def test_failed_request_is_not_retried_past_deadline():
+    calls = []
+
+    def slow_timeout(request):
+        calls.append(request)
+        time.sleep(0.2)
+        raise httpx.ReadTimeout("timeout", request=request)
+
+    client = LLMClient(api_key="test")
+    client.client._client = httpx.Client(transport=httpx.MockTransport(slow_timeout))
+    start = time.monotonic()
+    with deadline_scope(Deadline(0.2)), pytest.raises(DeadlineExceeded):
+        client.chat("梅的文化象征")
+    assert len(calls) == 1
+    assert time.monotonic() - start < 1.0
+    client.close()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""增量同步筛选：重复主键以最后一行为准"""
+from src.database.neo4j_import import _changed_batches
+
+
+def _rows(*pairs):
+    return [{"id": key, "hash": h} for key, h in pairs]
+
+
+def _written(rows, existing, size=500):
+    seen = {}
+    batches = list(_changed_batches(rows, existing, seen, size))
+    final = {}
+    for batch in batches:
+        assert len({r["id"] for r in batch}) == len(batch)
+        final.update((r["id"], r["hash"]) for r in batch)
+    return final, seen
+
+
+def test_duplicate_key_reverting_to_existing_is_rewritten():
+    # 前一行已改动并写入，后一行与库中原有内容相同：必须再写一次，节点最终为后一行
+    final, seen = _written(_rows(("a", "new"), ("b", "b1"), ("a", "old")), {"a": "old", "b": "b1"})
+    assert final == {"a": "old"}
+    assert seen == {"a": "old", "b": "b1"}
+
+
+def test_duplicate_key_last_row_wins():
+    final, _ = _written(_rows(("a", "old"), ("a", "x"), ("a", "y")), {"a": "old"}, size=1)
+    assert final == {"a": "y"}
+    final, _ = _written(_rows(("a", "old"), ("b", "b1")), {"a": "old", "b": "b1"})
+    assert final == {}
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""离线数据包读取：同一版本重新导出后不再返回旧内容，并发读取共享缓存"""
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api import offline_bundle
+from src.api.offline_bundle import BundleStore, write_bundle
+
+
+def _bundle(answer):
+    return {"format": 1, "version": "0123456789ab", "generated_at": 0.0, "alias_map": {},
+            "intent_keywords": {}, "indexes": {}, "plant_hashes": {"梅": answer},
+            "plants": {"梅": {"name": "梅"}}, "answers": {"梅": {"symbol": answer}}}
+
+
+def test_reexport_same_version_is_reloaded(tmp_path):
+    store = BundleStore(str(tmp_path))
+    path = write_bundle(_bundle("旧"), str(tmp_path))
+    assert store.latest()["answers"]["梅"]["symbol"] == "旧"
+    write_bundle(_bundle("新"), str(tmp_path))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # 粗粒度文件系统上时间戳可能相同
+    assert store.latest()["answers"]["梅"]["symbol"] == "新"
+
+
+def test_concurrent_load(tmp_path):
+    store = BundleStore(str(tmp_path))
+    store.CACHE_SIZE = 1
+    versions = []
+    for i in range(3):
+        bundle = dict(_bundle(str(i)), version=f"{i:012x}")
+        write_bundle(bundle, str(tmp_path))
+        versions.append(bundle["version"])
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        loaded = list(pool.map(store.load, versions * 200))
+    assert [b["version"] for b in loaded] == versions * 200
+
+
+def test_default_dir_is_under_repo(tmp_path):
+    # API 从 src/api 启动、导出脚本从仓库根目录运行，默认目录必须一致
+    env = {k: v for k, v in os.environ.items() if k != "BUNDLE_DIR"}
+    env["PYTHONPATH"] = offline_bundle._REPO_ROOT
+    out = subprocess.run([sys.executable, "-c", "from src.api.offline_bundle import BUNDLE_DIR; print(BUNDLE_DIR)"],
+                         cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True, check=True).stdout.strip()
+    assert out == os.path.join(offline_bundle._REPO_ROOT, "data", "bundles")
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""紧凑二进制存储（.jcps）：写入与读取一致、按名二分查找、过期判断与损坏文件的拒绝"""
+import os
+import struct
+
+import pytest
+
+from src.database.plant_store import HEADER_SIZE, PlantStore, build_store, open_store, store_is_stale
+
+FIELDS = ["name", "family", "symbol"]
+RECORDS = [
+    {"name": "梅", "family": "蔷薇科", "symbol": "坚韧"},
+    {"name": "兰", "family": "兰科", "symbol": "高洁"},
+    {"name": "Zinnia", "family": "菊科", "symbol": None},
+    {"name": "菊", "family": "菊科", "symbol": "隐逸"},
+    {"name": "apple", "family": "蔷薇科", "symbol": ""},
+    {"name": "荷（莲）", "family": "莲科", "symbol": "清廉"},
+]
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "plants.jcps")
+    build_store(RECORDS, path, FIELDS)
+    return path
+
+
+@pytest.fixture
+def store(store_path):
+    store = PlantStore(store_path)
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    assert store.fields == FIELDS and len(store) == len(RECORDS)
+    # 记录按写入顺序保存；None 与空字符串都读作空字符串
+    assert [r.to_dict() for r in store] == [{f: r[f] or "" for f in FIELDS} for r in RECORDS]
+    assert store[-1]["name"] == "荷（莲）"
+    with pytest.raises(IndexError):
+        store[len(RECORDS)]
+    with pytest.raises(KeyError):
+        store[0]["latin"]
+
+
+def test_binary_search_by_name(store):
+    # 名称索引按 Unicode 码位排序：大写 ASCII < 小写 ASCII < 汉字
+    names = [r["name"] for r in RECORDS]
+    assert store.names() == sorted(names)
+    assert store.names()[:2] == ["Zinnia", "apple"]
+    for record in RECORDS:
+        assert store.get(record["name"])["family"] == record["family"]
+    for missing in ["", "A", "zzz", "桃", "荷", "荷（莲）花", "￿"]:
+        assert store.get(missing) is None
+
+
+def test_empty_store(tmp_path):
+    path = str(tmp_path / "empty.jcps")
+    build_store([], path, FIELDS)
+    store = PlantStore(path)
+    assert len(store) == 0 and store.names() == [] and store.get("梅") is None
+    store.close()
+
+
+def test_version_follows_content(tmp_path, store):
+    same, other = str(tmp_path / "same.jcps"), str(tmp_path / "other.jcps")
+    build_store(RECORDS, same, FIELDS)
+    build_store(RECORDS[:-1], other, FIELDS)
+    for path, equal in ((same, True), (other, False)):
+        reopened = PlantStore(path)
+        assert (reopened.version == store.version) is equal
+        reopened.close()
+
+
+def test_store_is_stale(tmp_path, store_path):
+    source = str(tmp_path / "plants.xlsx")
+    open(source, "wb").close()
+    os.utime(store_path, (1000, 1000))
+    os.utime(source, (2000, 2000))
+    assert store_is_stale(store_path, source)
+    os.utime(store_path, (3000, 3000))
+    assert not store_is_stale(store_path, source)
+    assert store_is_stale(str(tmp_path / "missing.jcps"), source)
+
+
+def _corrupt(path, mutate):
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    with open(path, "wb") as f:
+        f.write(mutate(data))
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda d: d[:HEADER_SIZE // 2],                         # 头部不完整
+    lambda d: d[:-1],                                       # 截断最后一个字节
+    lambda d: d[:len(d) // 2],                              # 截断一半
+    lambda d: d[:HEADER_SIZE + 8] + bytes([d[HEADER_SIZE + 8] ^ 0xFF]) + d[HEADER_SIZE + 9:],  # 内容损坏
+    lambda d: b"XXXX" + d[4:],                              # magic 不符
+    lambda d: d[:4] + struct.pack("<H", 1) + d[6:],         # 旧格式版本
+    lambda d: b"",                                          # 空文件
+], ids=["header", "last-byte", "half", "flipped-byte", "magic", "old-version", "empty"])
+def test_rejects_corrupt_files(store_path, mutate):
+    _corrupt(store_path, mutate)
+    with pytest.raises(ValueError):
+        PlantStore(store_path)
+
+
+def test_open_store_rebuilds_corrupt_file(tmp_path, store_path):
+    source = str(tmp_path / "plants.xlsx")
+    open(source, "wb").close()
+    os.utime(source, (1000, 1000))
+    _corrupt(store_path, lambda d: d[:-8])
+    store = open_store(store_path, source, lambda: RECORDS, FIELDS)
+    assert store.get("梅")["symbol"] == "坚韧"
+    store.close()
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""问题日志重放：一致率只统计有回答可比的记录，默认日志目录与启动目录无关"""
+import os
+import subprocess
+import sys
+
+from src.api import question_log
+from tools.replay_questions import comparable, same_answer
+
+
+def test_timeout_and_empty_answers_are_not_compared():
+    assert not comparable({"route": "timeout", "answer": "抱歉，回答超时"})
+    assert not comparable({"route": "llm_error", "answer": "抱歉，暂时无法回答你的问题"})
+    assert not comparable({"route": "error", "answer": "问答失败"})
+    assert not comparable({"route": "llm", "answer": ""})
+    assert comparable({"route": "graph", "answer": "梅"})
+    assert same_answer({"answer": "梅花"}, "梅花象征坚韧")
+    assert not same_answer({"answer": "梅花"}, None)
+
+
+def test_default_log_dir_is_under_repo(tmp_path):
+    # 在其他目录启动时默认日志目录仍指向仓库 data 目录（写入方与重放脚本一致）
+    env = {k: v for k, v in os.environ.items() if k != "QUESTION_LOG_DIR"}
+    env["PYTHONPATH"] = question_log._REPO_ROOT
+    out = subprocess.run([sys.executable, "-c", "from src.api.question_log import QUESTION_LOG_DIR; print(QUESTION_LOG_DIR)"],
+                         cwd=tmp_path, env=env, stdout=subprocess.PIPE, text=True, check=True).stdout.strip()
+    assert out == os.path.join(question_log._REPO_ROOT, "data", "question_log")
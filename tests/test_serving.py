@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""worker 初始化：并发的首个请求只初始化一次"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api import serving
+
+
+def test_concurrent_get_qa_initializes_once(monkeypatch):
+    calls = []
+
+    def fake_init(workers=None):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        serving._qa, serving._qa_pid = object(), serving.os.getpid()
+        return serving._qa
+
+    monkeypatch.setattr(serving, "_qa", None)
+    monkeypatch.setattr(serving, "_qa_pid", None)
+    monkeypatch.setattr(serving, "_init_worker", fake_init)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _: serving.get_qa(), range(8)))
+    assert len(calls) == 1
+    assert all(qa is instances[0] for qa in instances)
+
+
+def test_app_startup_initializes_worker(api):
+    # TestClient 进入时执行 lifespan：问答实例已在启动阶段创建
+    assert serving._qa is not None and serving._qa_pid == serving.os.getpid()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Streamlit 页面：回答生成结束后不再渲染轮询片段（定时重跑随之停止）"""
+import os
+
+import pytest
+
+from src.database.excel_ingest import _REPO_ROOT
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+
+class FakeJob:
+    """第一次查询未完成（问答片段渲染轮询片段），之后完成（相当于轮询片段的一次定时重跑）"""
+    question = "梅的文化象征"
+    text = "梅花"
+
+    def __init__(self, pending_checks=1):
+        self.pending_checks = pending_checks
+
+    def done(self):
+        self.pending_checks -= 1
+        return self.pending_checks < 0
+
+    def result(self):
+        return "梅花象征坚贞"
+
+
+def _polling_fragments(at):
+    # 嵌套片段只有 answer_progress（其余片段都在页面顶层）
+    return [fid for fid, parent in at._fragment_storage._parent_by_id.items() if parent is not None]
+
+
+@pytest.fixture(scope="module")
+def app():
+    at = AppTest.from_file(os.path.join(_REPO_ROOT, "streamlit_app.py"), default_timeout=120).run()
+    assert not at.exception
+    return at
+
+
+def test_polling_fragment_rendered_while_pending(app):
+    app.session_state["llm_job"] = FakeJob(pending_checks=10)
+    app.run()
+    assert not app.exception
+    assert any(m.value == "梅花 ▌" for m in app.markdown)
+    assert _polling_fragments(app)
+
+
+def test_polling_stops_after_completion(app):
+    app.session_state["llm_job"] = FakeJob(pending_checks=1)
+    app.run()
+    assert not app.exception
+    assert "llm_job" not in app.session_state
+    assert any(m.value == "梅花象征坚贞" for m in app.markdown)
+    assert not any("▌" in m.value for m in app.markdown)
+    assert not _polling_fragments(app)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出小程序 / PWA 离线数据包（植物详情、别名表、反向索引、每株植物 × 问题类型的预生成回答）
+用法：python tools/export_bundle.py [--dir 数据包目录，默认仓库下 data/bundles] [--keep 10]
+知识库每次导入后运行一次；内容未变化时版本号不变
+支持环境变量：NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, BUNDLE_DIR
+"""
+import argparse
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.api.free_qa_system import PlantQASystem
+from src.api.offline_bundle import BUNDLE_DIR, BUNDLE_KEEP, BundleStore, build_bundle, write_bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出离线数据包")
+    parser.add_argument("--dir", default=BUNDLE_DIR, help="数据包目录")
+    parser.add_argument("--keep", type=int, default=BUNDLE_KEEP, help="保留的历史版本数")
+    args = parser.parse_args()
+
+    previous = BundleStore(args.dir).latest_version()
+    start = time.perf_counter()
+    qa = PlantQASystem()
+    try:
+        bundle = build_bundle(qa)
+    finally:
+        qa.close()
+    path = write_bundle(bundle, args.dir, args.keep)
+    elapsed = time.perf_counter() - start
+
+    with gzip.open(path, "rb") as f:
+        raw_size = len(f.read())
+    n_answers = sum(len(a) for a in bundle["answers"].values())
+    print(f"✅ 离线数据包 {bundle['version']}：{len(bundle['plants'])} 种植物，{n_answers} 条预生成回答")
+    print(f"📦 {path}：{os.path.getsize(path) / 1024:.1f} KB（解压后 {raw_size / 1024:.1f} KB），耗时 {elapsed:.1f}s")
+    if previous == bundle["version"]:
+        print("ℹ️ 内容与上一版本相同")
+    elif previous:
+        print(f"ℹ️ 上一版本 {previous}，客户端可通过 /api/bundle?since={previous} 获取增量")
+
+
+if __name__ == "__main__":
+    main()
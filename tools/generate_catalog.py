@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成大规模合成植物目录（与 data/荆楚植物文化图谱植物数据.xlsx 相同的表头与版式），用于规模测试
+用法：python tools/generate_catalog.py 100000 [--out data/.cache/catalog-100000.xlsx] [--seed 0]
+- 植物名：产地 + 形态 + 花色 + 基本名组合（如“神农架细叶紫花杜鹃”），组合用尽后加编号；约一成带括号别名（“…杜鹃（…映山红）”）
+- 科属、文化象征、民俗用途、文献等文本取自真实数据文件，节日、分布为“；”分隔的多值字段
+同一 size 与 seed 生成的目录完全相同；写入使用 openpyxl 只写模式，内存占用与行数无关。
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.database.excel_ingest import DEFAULT_EXCEL_PATH, iter_excel_records
+from src.database.plant_schema import COLUMN_MAP, MISSING
+
+# 与真实数据文件一致的版式：前 5 行空白，第 6 行为表头，数据从 C 列开始
+BLANK_ROWS = 5
+BLANK_COLUMNS = 2
+
+# ========== 植物名组成 ==========
+PLACES = ["", "鄂西", "神农架", "武当", "大别山", "恩施", "宜昌", "巴东", "利川", "兴山", "房县",
+          "竹溪", "通山", "罗田", "英山", "咸丰", "鹤峰", "五峰", "长阳", "秭归", "保康", "南漳",
+          "京山", "九宫山", "幕阜山", "荆门"]
+SHAPES = ["", "细叶", "阔叶", "长叶", "圆叶", "光叶", "毛", "小", "大", "矮", "垂枝", "重瓣",
+          "山", "野", "水", "石", "岩", "多花", "单叶", "卵叶", "狭叶"]
+COLORS = ["", "紫花", "白花", "红花", "黄花", "粉花", "蓝花", "绿花", "紫", "白", "红", "金",
+          "银", "青", "乌", "赤", "丹", "雪", "墨", "碧", "翠"]
+# 基本名 -> 俗名（生成括号别名用）
+BASE_NAMES = {
+    "杜鹃": "映山红", "荷": "莲", "桂": "木犀", "水仙": "凌波仙子", "艾": "艾蒿", "菖蒲": "白菖",
+    "竹": "毛竹", "梅": "春梅", "兰": "春兰", "橘": "柑", "柳": "垂杨", "桑": "家桑", "茶": "茗",
+    "银杏": "白果", "梧桐": "青桐", "松": "青松", "柏": "侧柏", "菊": "黄华", "牡丹": "木芍药",
+    "桃": "仙桃", "芍药": "将离", "茱萸": "越椒", "蒜": "葫", "薜荔": "木莲藤", "蕙": "九节兰",
+    "芷": "白芷", "蘅": "杜衡", "椒": "花椒", "桔梗": "铃铛花", "萱草": "忘忧草", "木兰": "辛夷",
+    "女贞": "冬青", "棕榈": "棕树", "枫": "枫香", "楝": "苦楝", "檀": "青檀", "樟": "香樟",
+    "槐": "国槐", "榆": "家榆", "枣": "红枣", "栗": "板栗", "李": "嘉庆子", "杏": "甜梅",
+    "石榴": "安石榴", "海棠": "解语花", "玉兰": "望春花", "紫薇": "百日红", "山茶": "曼陀罗树",
+    "蔷薇": "野客", "月季": "月月红", "木槿": "朝开暮落花", "芙蓉": "拒霜花", "凌霄": "紫葳",
+    "葛": "葛藤", "蓼": "水蓼", "苇": "芦苇", "蒲": "香蒲", "菱": "水栗", "芡": "鸡头米",
+    "莼": "水葵", "蘋": "田字草", "荇": "莕菜", "葵": "冬葵", "韭": "起阳草", "葱": "菜伯",
+    "姜": "生姜", "茴香": "怀香", "薄荷": "银丹草", "紫苏": "赤苏", "车前": "车轮草",
+    "蒲公英": "黄花地丁", "金银花": "忍冬", "连翘": "黄寿丹", "黄连": "味连", "杜仲": "思仲",
+    "厚朴": "川朴", "天麻": "赤箭", "半夏": "地文", "百合": "强瞿", "玉竹": "葳蕤",
+    "黄精": "老虎姜", "何首乌": "夜交藤", "党参": "上党人参", "丹参": "赤参", "贝母": "川贝",
+    "银耳": "白木耳", "灵芝": "瑞草", "灯芯草": "龙须草", "蕨": "蕨菜", "苔": "青苔",
+    "樱": "山樱", "梨": "快果", "柿": "朱果", "枇杷": "卢橘", "杨梅": "树梅", "柚": "文旦",
+}
+ALIAS_RATE = 0.1
+
+# ========== 多值字段取值 ==========
+FESTIVALS = ["春节", "端午节", "重阳节", "清明节", "中秋节", "祭祀", "花朝节（春）", "赏梅节（春季）",
+             "荷花节（夏季）", "牡丹花会（春）", "元宵节", "七夕", "腊八节"]
+NO_FESTIVAL = "无特定节日"
+REGIONS = ["湖北省全省", "鄂西山区", "武陵山区", "大别山区", "幕阜山区", "江汉平原", "三峡库区", "神农架林区",
+           "恩施", "宜昌地区", "襄阳", "十堰", "随州", "荆州", "武汉", "黄冈", "咸宁", "孝感", "荆门", "鄂州",
+           "黄石", "天门", "潜江", "仙桃", "洪湖", "梁子湖", "湖北湖泊湿地", "鄂南山区", "鄂东地区"]
+
+# 从真实数据抽样的文本字段（取值池为空时用占位符）
+SAMPLED_FIELDS = ["ornamental_type", "ornamental_value", "cultural_symbol", "ecological_significance",
+                  "folk_use", "traditional_use", "literature_source", "literature_text", "literature_page",
+                  "data_source", "medicinal_value"]
+
+
+def load_pools(seed_excel: str = DEFAULT_EXCEL_PATH) -> Dict[str, List]:
+    """从真实数据文件收集各字段的取值池（科属成对保留）"""
+    pools: Dict[str, List] = {field: [] for field in SAMPLED_FIELDS}
+    pools["family_genus"] = []
+    pools["latin_genus"] = []
+    if not os.path.exists(seed_excel):
+        return pools
+    for record in iter_excel_records(seed_excel):
+        for field in SAMPLED_FIELDS:
+            if record[field] != MISSING:
+                pools[field].append(record[field])
+        if record["family"] != MISSING and record["genus"] != MISSING:
+            pools["family_genus"].append((record["family"], record["genus"]))
+        if record["latin"] != MISSING:
+            pools["latin_genus"].append(record["latin"].split()[0])
+    return pools
+
+
+def iter_names(size: int, rng: random.Random) -> Iterator[Tuple[str, str, str]]:
+    """size 个互不相同的 (植物名, 基本名, 修饰前缀)：组合随机抽取，用尽后加编号"""
+    bases = list(BASE_NAMES)
+    n_combos = len(PLACES) * len(SHAPES) * len(COLORS) * len(bases)
+    # 组合数远大于 size 时随机抽取编号，避免展开全部组合
+    picks = rng.sample(range(n_combos), min(size, n_combos))
+    for code in picks:
+        code, base = divmod(code, len(bases))
+        code, color = divmod(code, len(COLORS))
+        place, shape = divmod(code, len(SHAPES))
+        name = PLACES[place] + SHAPES[shape] + COLORS[color] + bases[base]
+        yield name, bases[base], PLACES[place] + SHAPES[shape] + COLORS[color]
+    for i in range(size - len(picks)):
+        base = bases[i % len(bases)]
+        yield f"{base}{i // len(bases) + 1}号", base, ""
+
+
+def _multi(rng: random.Random, values: List[str], low: int, high: int) -> str:
+    return "；".join(rng.sample(values, rng.randint(low, high)))
+
+
+def iter_synthetic_records(size: int, seed: int = 0, pools: Dict[str, List] = None) -> Iterator[Dict[str, str]]:
+    """逐条产出标准字段记录（与 iter_excel_records 的输出格式一致）"""
+    rng = random.Random(seed)
+    pools = pools if pools is not None else load_pools()
+    family_genus = pools.get("family_genus") or [("蔷薇科", "蔷薇属")]
+    latin_genus = pools.get("latin_genus") or ["Rosa"]
+    for i, (name, base, prefix) in enumerate(iter_names(size, rng)):
+        if rng.random() < ALIAS_RATE:
+            name = f"{name}（{prefix}{BASE_NAMES[base]}）"
+        family, genus = rng.choice(family_genus)
+        record = {
+            "id": f"JC_{i + 1:07d}",
+            "name": name,
+            "latin": f"{rng.choice(latin_genus)} synthetica{i + 1}",
+            "family": family,
+            "genus": genus,
+            "distribution": _multi(rng, REGIONS, 1, 4),
+            "festivals": NO_FESTIVAL if rng.random() < 0.5 else _multi(rng, FESTIVALS, 1, 3),
+        }
+        for field in SAMPLED_FIELDS:
+            pool = pools.get(field)
+            record[field] = rng.choice(pool) if pool else MISSING
+        yield record
+
+
+def write_catalog(records, path: str) -> int:
+    """按真实数据文件的版式写入 Excel，返回行数"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("植物数据")
+    for _ in range(BLANK_ROWS):
+        sheet.append([])
+    padding = [None] * BLANK_COLUMNS
+    sheet.append(padding + list(COLUMN_MAP))
+    count = 0
+    for record in records:
+        sheet.append(padding + [record[field] for field in COLUMN_MAP.values()])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def generate_catalog(size: int, path: str, seed: int = 0, seed_excel: str = DEFAULT_EXCEL_PATH) -> str:
+    write_catalog(iter_synthetic_records(size, seed, load_pools(seed_excel)), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成植物目录（Excel，与真实数据同一表头）")
+    parser.add_argument("size", type=int, help="植物数（如 1000、100000、1000000）")
+    parser.add_argument("--out", default=None, help="输出文件（默认 data/.cache/catalog-<size>.xlsx）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子（相同种子生成相同目录）")
+    parser.add_argument("--seed-excel", default=DEFAULT_EXCEL_PATH, help="抽样文本字段的真实数据文件")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(os.path.dirname(DEFAULT_EXCEL_PATH), ".cache", f"catalog-{args.size}.xlsx")
+    start = time.perf_counter()
+    generate_catalog(args.size, out, args.seed, args.seed_excel)
+    print(f"✅ 已生成 {args.size} 种植物 -> {out}（{os.path.getsize(out) / 1e6:.1f} MB，"
+          f"耗时 {time.perf_counter() - start:.1f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对比植物详情查询改写前后的数据库命中数（db hits）
+默认选取关联实体最多的植物；也可指定：python tools/profile_detail_query.py 艾
+支持环境变量：NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+"""
+import os
+import sys
+
+from neo4j import GraphDatabase
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.api.plant_queries import PLANT_DETAIL_QUERY
+
+# 改写前：四个链式 OPTIONAL MATCH，中间行数为各关系数量的乘积
+LEGACY_DETAIL_QUERY = """
+    MATCH (p:Plant {name: $name})
+    OPTIONAL MATCH (p)-[:HAS_SYMBOL]->(s:Symbol)
+    OPTIONAL MATCH (p)-[:HAS_MEDICINAL]->(m:Medicinal)
+    OPTIONAL MATCH (p)-[:RECORDED_IN]->(l:Literature)
+    OPTIONAL MATCH (p)-[:RELATED_TO_FESTIVAL]->(f:Festival)
+    RETURN p.name as name,
+           collect(DISTINCT s.meaning) as symbols,
+           collect(DISTINCT m.effect) as medicinal,
+           collect(DISTINCT l.name) as literature,
+           collect(DISTINCT f.name) as festivals
+"""
+
+RICHEST_PLANT_QUERY = """
+    MATCH (p:Plant)
+    RETURN p.name as name, COUNT { (p)-->() } as degree
+    ORDER BY degree DESC LIMIT 1
+"""
+
+
+def _total_db_hits(plan) -> int:
+    """递归累加 PROFILE 计划树中每个算子的 dbHits"""
+    if not plan:
+        return 0
+    hits = plan.get("dbHits", 0) or 0
+    return hits + sum(_total_db_hits(child) for child in plan.get("children", []))
+
+
+def profile(session, query: str, name: str):
+    summary = session.run("PROFILE " + query, name=name).consume()
+    plan = summary.profile or {}
+    return _total_db_hits(plan), plan.get("rows")
+
+
+def main():
+    uri = os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+    user = os.environ.get("NEO4J_USER", "neo4j")
+    password = os.environ.get("NEO4J_PASSWORD", "12345678")
+    driver = GraphDatabase.driver(uri, auth=(user, password))
+    with driver.session() as session:
+        if len(sys.argv) > 1:
+            name = sys.argv[1]
+        else:
+            record = session.run(RICHEST_PLANT_QUERY).single()
+            name, degree = record["name"], record["degree"]
+            print(f"关联最多的植物：{name}（{degree} 条关系）")
+        # 先各执行一次预热查询计划缓存
+        session.run(LEGACY_DETAIL_QUERY, name=name).consume()
+        session.run(PLANT_DETAIL_QUERY, name=name).consume()
+        legacy_hits, _ = profile(session, LEGACY_DETAIL_QUERY, name)
+        new_hits, _ = profile(session, PLANT_DETAIL_QUERY, name)
+    driver.close()
+    print(f"改写前 db hits：{legacy_hits}")
+    print(f"改写后 db hits：{new_hits}")
+    if new_hits:
+        print(f"减少：{legacy_hits / new_hits:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
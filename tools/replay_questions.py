@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重放问题日志（src/api/question_log.py 记录的 JSONL），对比新构建与记录时的延迟和回答
+用法：python tools/replay_questions.py [日志文件...] [--url http://localhost:8000] [--rate 5] [--limit 1000]
+不指定日志文件时读取 QUESTION_LOG_DIR 下全部 questions-*.jsonl。
+按 --rate（每秒请求数）匀速向 /api/answer 发送问题，统计：
+  - 记录时与重放时的延迟分布（平均 / P50 / P95），按路径（graph / llm）分别统计
+  - 回答一致率（记录时或重放时超时、大模型调用失败、请求出错、回答为空的问题没有可比的回答，不计入）、
+    路径变化（如原先走大模型的问题现在直接查知识库）
+--out 指定时把回答或路径不一致的问题逐条写入 JSONL，便于人工检查。
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.api.question_log import QUESTION_LOG_DIR
+
+# 没有可比回答的路径：超时、大模型调用失败（回答为提示文字）、请求出错
+FAILED_ROUTES = ("timeout", "llm_error", "error")
+
+
+def load_entries(paths, source=None, limit=None):
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 进程被杀时可能留下半行
+                if source and entry.get("source") != source:
+                    continue
+                entries.append(entry)
+    entries.sort(key=lambda e: e.get("ts", 0))
+    return entries[:limit] if limit else entries
+
+
+def recorded_ms(entry):
+    """记录时的总耗时：API 记录 total_ms；页面记录为检索 + 生成两段之和"""
+    stages = entry.get("stages") or {}
+    if "total_ms" in stages:
+        return stages["total_ms"]
+    return sum(v for k, v in stages.items() if k.endswith("_ms")) or None
+
+
+def comparable(entry):
+    """记录时有完整回答的问题才参与一致率统计：超时或空回答按前缀比较总会“一致”，失败提示也不是回答"""
+    return entry.get("route") not in FAILED_ROUTES and bool(entry.get("answer"))
+
+
+def same_answer(entry, answer):
+    """日志只保存回答前若干字，按前缀比较"""
+    return answer is not None and answer[:len(entry["answer"])] == entry["answer"]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 1)
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return "无数据"
+    return (f"n={len(values)} 平均 {sum(values) / len(values):.1f} ms，"
+            f"P50 {percentile(values, 0.5)} ms，P95 {percentile(values, 0.95)} ms")
+
+
+def replay(entries, url, rate, concurrency, timeout):
+    """按固定速率发送；返回与 entries 对应的 (耗时毫秒, 回答, 路径, 错误)"""
+    client = httpx.Client(base_url=url, timeout=timeout,
+                          limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency))
+    start = time.perf_counter()
+
+    def send(i, entry):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        t = time.perf_counter()
+        try:
+            body = client.post("/api/answer", json={"question": entry["question"]}).json()
+        except (httpx.HTTPError, ValueError) as e:
+            return (time.perf_counter() - t) * 1000, None, None, str(e)[:100]
+        return (time.perf_counter() - t) * 1000, body.get("data"), body.get("route"), None
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(lambda args: send(*args), enumerate(entries)))
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重放问题日志并对比延迟与回答")
+    parser.add_argument("logs", nargs="*", help="问题日志文件（默认读取 QUESTION_LOG_DIR 下全部日志）")
+    parser.add_argument("--url", default="http://localhost:8000", help="被测 API 地址")
+    parser.add_argument("--rate", type=float, default=5.0, help="每秒发送的问题数")
+    parser.add_argument("--limit", type=int, default=None, help="最多重放的问题数")
+    parser.add_argument("--source", choices=["api", "streamlit"], default=None, help="只重放某一来源的记录")
+    parser.add_argument("--concurrency", type=int, default=16, help="最大并发请求数")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单个请求超时（秒）")
+    parser.add_argument("--out", default=None, help="回答或路径不一致的问题写入该 JSONL 文件")
+    args = parser.parse_args()
+
+    paths = args.logs or sorted(glob.glob(os.path.join(QUESTION_LOG_DIR, "questions-*.jsonl")))
+    entries = load_entries(paths, args.source, args.limit)
+    if not entries:
+        print("⚠️ 没有可重放的问题记录")
+        return
+    print(f"🔁 重放 {len(entries)} 个问题 -> {args.url}，速率 {args.rate}/s")
+    results = replay(entries, args.url, args.rate, args.concurrency, args.timeout)
+
+    errors = sum(1 for r in results if r[3])
+    failed = sum(1 for r in results if r[2] in FAILED_ROUTES)
+    compared = [(e, r) for e, r in zip(entries, results) if comparable(e) and r[2] not in FAILED_ROUTES]
+    agreed = sum(1 for e, r in compared if same_answer(e, r[1]))
+    route_changes = {}
+    for e, r in zip(entries, results):
+        if r[2] and e.get("route") and r[2] != e["route"]:
+            key = f"{e['route']} -> {r[2]}"
+            route_changes[key] = route_changes.get(key, 0) + 1
+
+    print(f"📼 记录时：{summarize([recorded_ms(e) for e in entries])}")
+    print(f"⏱️ 重放时：{summarize([r[0] for r in results if not r[3]])}")
+    for route in ("graph", "llm"):
+        picked = [r[0] for r in results if r[2] == route and not r[3]]
+        if picked:
+            print(f"   {route}: {summarize(picked)}")
+    print(f"✅ 回答一致 {agreed}/{len(compared)}（不含记录时或重放时没有回答的 {len(entries) - len(compared)} 条），"
+          f"重放时超时或出错 {failed}，请求失败 {errors}")
+    for change, count in sorted(route_changes.items()):
+        print(f"🔀 路径变化 {change}：{count}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for e, r in zip(entries, results):
+                if r[3] or r[2] != e.get("route") or (comparable(e) and r[2] not in FAILED_ROUTES
+                                                      and not same_answer(e, r[1])):
+                    f.write(json.dumps({
+                        "question": e["question"], "recorded_route": e.get("route"), "replay_route": r[2],
+                        "recorded_ms": recorded_ms(e), "replay_ms": round(r[0], 1),
+                        "recorded_answer": e["answer"], "replay_answer": r[1], "error": r[3],
+                    }, ensure_ascii=False) + "\n")
+        print(f"📝 不一致的问题已写入 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
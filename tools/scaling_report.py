@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规模曲线报告：用合成目录（tools/generate_catalog.py）在不同植物数下测量各阶段耗时与内存
+用法：python tools/scaling_report.py [--sizes 1000,10000,100000,1000000] [--workdir data/.cache/scaling] [--neo4j]
+每个规模在独立子进程中测量（内存互不影响）：
+    import   Excel -> .jcps 紧凑存储（本地后端的导入）；--neo4j 时另测 neo4j_import（全量导入 NEO4J_URI 指向的库）
+    load     打开 Excel 仓库（反向索引）、问答系统植物名索引（含分词词典）、API 知识快照（相关植物表、分面位图）
+    lookup   按名称取植物（首次访问 / 缓存命中），单次平均微秒
+    answer   规则问答（单植物、别名、多植物对比、节日反查）单次平均 / P95 毫秒，以及“有哪些植物”列表问题
+内存为各阶段结束时的进程常驻内存（RSS）。结果写入 workdir 下 scaling.json 与 scaling.md，
+安装 matplotlib 时另绘制 scaling.png（耗时与内存随植物数的变化，对数坐标）。
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.database.excel_ingest import DEFAULT_EXCEL_PATH
+
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_WORKDIR = os.path.join(os.path.dirname(DEFAULT_EXCEL_PATH), ".cache", "scaling")
+# 每个规模测量的查询 / 问题数
+LOOKUPS = 1000
+QUESTIONS = 200
+
+# 报告中的耗时列（毫秒）与单位换算后的展示名
+TIME_COLUMNS = [
+    ("import_ms", "导入 ms"), ("neo4j_import_ms", "Neo4j 导入 ms"), ("load_repository_ms", "打开仓库 ms"),
+    ("load_qa_index_ms", "问答索引 ms"), ("load_snapshot_ms", "API 快照 ms"), ("lookup_us", "查询 µs"),
+    ("lookup_cached_us", "缓存查询 µs"), ("answer_ms", "问答均值 ms"), ("answer_p95_ms", "问答 P95 ms"),
+    ("answer_list_ms", "列表问题 ms"),
+]
+MEMORY_COLUMNS = [("rss_import_mb", "导入后 MB"), ("rss_load_mb", "加载后 MB"), ("rss_answer_mb", "问答后 MB"),
+                  ("peak_rss_mb", "峰值 MB")]
+
+
+# ============================================================
+# 子进程：测量一个规模
+# ============================================================
+def _rss_mb():
+    """当前常驻内存（Linux 读 /proc，其他平台退回峰值）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+
+def _questions(names, rng, count):
+    """单植物 / 括号别名 / 多植物对比 / 节日反查问题"""
+    templates = ["{}有什么文化象征？", "{}分布在哪里？", "{}的药用价值是什么", "{}在哪些文献中有记载？"]
+    questions = []
+    for i in range(count):
+        name = rng.choice(names)
+        kind = i % 5
+        if kind == 4:
+            questions.append(f"{name}和{rng.choice(names)}的分布有什么不同？")
+        elif kind == 3 and "（" in name:
+            questions.append(templates[kind].format(name[name.index("（") + 1:-1]))
+        else:
+            questions.append(templates[kind % len(templates)].format(name))
+    questions[::20] = ["端午节有哪些相关植物？"] * len(questions[::20])
+    return questions
+
+
+def measure(excel_path, workdir, neo4j=False, seed=0):
+    from src.api.free_qa_system import PlantQASystem
+    from src.api.knowledge_repository import create_repository, resolve_aliases
+    from src.api.serving import KnowledgeSnapshot
+    from src.database.excel_ingest import iter_excel_records
+    from src.database.plant_schema import FIELDS, PLANT_ALIASES, to_neo4j_properties
+    from src.database.plant_store import build_store
+
+    result = {}
+    store_path = os.path.join(workdir, os.path.splitext(os.path.basename(excel_path))[0] + ".jcps")
+
+    # ---------- import ----------
+    _, result["import_ms"] = _timed(lambda: build_store(iter_excel_records(excel_path), store_path, FIELDS))
+    if neo4j:
+        from src.database.neo4j_import import import_data
+        _, result["neo4j_import_ms"] = _timed(lambda: import_data(excel_path, full=True))
+    result["rss_import_mb"] = _rss_mb()
+
+    # ---------- load ----------
+    repo, result["load_repository_ms"] = _timed(
+        lambda: create_repository("excel", excel_path=excel_path, store_path=store_path))
+    qa, result["load_qa_index_ms"] = _timed(lambda: PlantQASystem(repository=repo))
+
+    def snapshot():
+        plants = {r["name"]: to_neo4j_properties(r.to_dict()) for r in repo.backend.store}
+        return KnowledgeSnapshot(plants, resolve_aliases(PLANT_ALIASES, plants))
+    _, result["load_snapshot_ms"] = _timed(snapshot)
+    result["rss_load_mb"] = _rss_mb()
+    names = qa.plant_names
+    result["plants"] = len(names)
+
+    # ---------- lookup ----------
+    rng = random.Random(seed)
+    sample = rng.sample(names, min(LOOKUPS, len(names)))
+    for key in ("lookup_us", "lookup_cached_us"):  # 第一遍未命中缓存，第二遍命中
+        _, ms = _timed(lambda: [repo.get_plant(name) for name in sample])
+        result[key] = round(ms * 1000 / len(sample), 1)
+
+    # ---------- answer ----------
+    timings = []
+    for question in _questions(names, rng, QUESTIONS):
+        _, ms = _timed(lambda: qa.answer(question))
+        timings.append(ms)
+    timings.sort()
+    result["answer_ms"] = round(sum(timings) / len(timings), 2)
+    result["answer_p95_ms"] = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+    _, result["answer_list_ms"] = _timed(lambda: qa.answer("知识库里有哪些植物？"))
+    result["rss_answer_mb"] = _rss_mb()
+    result["peak_rss_mb"] = _peak_rss_mb()
+    qa.close()
+    return result
+
+
+# ============================================================
+# 主进程：生成目录、逐个规模启动子进程、汇总并绘图
+# ============================================================
+def run_size(size, workdir, neo4j, seed, timeout):
+    from generate_catalog import generate_catalog
+    excel_path = os.path.join(workdir, f"catalog-{size}.xlsx")
+    if not os.path.exists(excel_path):
+        print(f"🌱 生成 {size} 种植物的合成目录 ...")
+        _, ms = _timed(lambda: generate_catalog(size, excel_path, seed))
+        print(f"   耗时 {ms / 1000:.1f} 秒")
+    cmd = [sys.executable, os.path.abspath(__file__), "--measure", excel_path, "--workdir", workdir,
+           "--seed", str(seed)] + (["--neo4j"] if neo4j else [])
+    print(f"⏱️ 测量 {size} ...")
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, timeout=timeout, text=True)
+    except subprocess.TimeoutExpired:
+        return {"size": size, "error": f"超过 {timeout} 秒"}
+    if proc.returncode != 0:
+        return {"size": size, "error": f"子进程退出码 {proc.returncode}"}
+    return dict(json.loads(proc.stdout.strip().splitlines()[-1]), size=size)
+
+
+def to_markdown(results):
+    columns = [("size", "植物数")] + TIME_COLUMNS + MEMORY_COLUMNS
+    present = [(key, title) for key, title in columns if any(key in r for r in results)]
+    lines = ["| " + " | ".join(title for _, title in present) + " |",
+             "|" + "---:|" * len(present)]
+    for r in results:
+        if "error" in r:
+            lines.append(f"| {r['size']} | 失败：{r['error']} |")
+            continue
+        lines.append("| " + " | ".join(str(r.get(key, "")) for key, _ in present) + " |")
+    return "\n".join(lines)
+
+
+def plot(results, path):
+    """耗时与内存随植物数的变化（双对数坐标）；未安装 matplotlib 时跳过"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("ℹ️ 未安装 matplotlib，跳过绘图（pip install matplotlib）")
+        return False
+    ok = [r for r in results if "error" not in r]
+    if not ok:
+        return False
+    sizes = [r["size"] for r in ok]
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(13, 5))
+    for key, _ in TIME_COLUMNS:
+        values = [r.get(key) for r in ok]
+        if all(v is not None and v > 0 for v in values):
+            ax_time.plot(sizes, values, marker="o", label=key)
+    for key, _ in MEMORY_COLUMNS:
+        values = [r.get(key) for r in ok]
+        if all(v is not None for v in values):
+            ax_mem.plot(sizes, values, marker="o", label=key)
+    for ax, ylabel in ((ax_time, "time (ms / µs per op)"), (ax_mem, "RSS (MB)")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("catalog size (plants)")
+        ax.set_ylabel(ylabel)
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成目录规模曲线：导入、加载、查询、问答的耗时与内存")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="逗号分隔的植物数（如 1000,10000,100000,1000000）")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="合成目录、存储与报告的输出目录")
+    parser.add_argument("--neo4j", action="store_true", help="同时测量导入 Neo4j（会清空 NEO4J_URI 指向的库）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--timeout", type=float, default=3600, help="单个规模的测量超时（秒）")
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)  # 子进程：测量一个目录
+    args = parser.parse_args()
+    os.makedirs(args.workdir, exist_ok=True)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.workdir, args.neo4j, args.seed), ensure_ascii=False))
+        return
+
+    results = []
+    for size in sorted(int(s) for s in args.sizes.split(",") if s.strip()):
+        results.append(run_size(size, args.workdir, args.neo4j, args.seed, args.timeout))
+        print(f"   {json.dumps(results[-1], ensure_ascii=False)}")
+
+    with open(os.path.join(args.workdir, "scaling.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    table = to_markdown(results)
+    with open(os.path.join(args.workdir, "scaling.md"), "w", encoding="utf-8") as f:
+        f.write(table + "\n")
+    print("\n" + table)
+    if plot(results, os.path.join(args.workdir, "scaling.png")):
+        print(f"📈 曲线已保存到 {os.path.join(args.workdir, 'scaling.png')}")
+
+
+if __name__ == "__main__":
+    main()